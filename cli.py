@@ -0,0 +1,185 @@
+import sys
+import os
+import json
+import argparse
+import contextlib
+
+import pandas as pd
+
+# --- Configuración de Ruta (Path) ---
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# Línea de comandos sin menú (para cron, CI o un servicio):
+#
+#   python cli.py predecir                     # = predict
+#   python cli.py entrenar -t AAPL NVDA        # = train
+#   python cli.py backtest -H 1 5              # = backtest
+#   python cli.py reporte --dias 30            # = report
+#   python cli.py demonio                      # = daemon: corre tras cada cierre de la NYSE
+#
+# La salida estructurada (JSON) va a stdout; los mensajes de progreso del
+# pipeline ([Procesador], [Gestor Modelo]...) van a stderr, así que
+# 'python cli.py predecir > resultado.json' deja un JSON limpio.
+# main.py (el menú) sigue siendo la forma interactiva.
+
+SALIDA_OK = 0
+SALIDA_ERROR = 1        # El pipeline corrió pero falló (o algún trabajo falló)
+SALIDA_USO = 2          # Argumentos inválidos (lo devuelve argparse)
+SALIDA_SIN_DATOS = 3    # No se pudieron cargar los precios
+
+
+def _a_json(objeto):
+    """DataFrames a listas de registros; fechas y tipos de NumPy a texto/números."""
+    if isinstance(objeto, pd.DataFrame):
+        return json.loads(objeto.to_json(orient="records", date_format="iso"))
+    return objeto
+
+def _emitir(datos):
+    json.dump(datos, sys.stdout, default=str, ensure_ascii=False, indent=1)
+    sys.stdout.write("\n")
+    sys.stdout.flush()
+
+@contextlib.contextmanager
+def _registro_a(destino):
+    """Los print() del pipeline van a 'destino' (stderr, o nada con --silencioso)."""
+    with contextlib.redirect_stdout(destino):
+        yield
+
+
+# --- Subcomandos ---
+
+def comando_predecir(args):
+    from datos.snapshot import cargar_snapshot
+    from predicciones.ejecutar_prediccion import ejecutar_predicciones
+    # Los precios se cargan acá (como en 'entrenar'): si fallan, el código
+    # de salida lo dice; None de ejecutar_predicciones es otra falla.
+    snapshot = cargar_snapshot()
+    if snapshot is None:
+        return SALIDA_SIN_DATOS, {"ok": False, "error": "No se pudieron cargar los precios"}
+    resultado = ejecutar_predicciones(interactivo=False, snapshot=snapshot)
+    return (SALIDA_OK if resultado is not None else SALIDA_ERROR), {"ok": resultado is not None, **(resultado or {})}
+
+def comando_entrenar(args):
+    from datos.snapshot import cargar_snapshot
+    from modelo.procesador_features import FACTOR_PREDICTOR
+    from modelo.planificador_entrenamiento import planificar_entrenamiento
+    snapshot = cargar_snapshot(sorted(set(args.tickers) | {FACTOR_PREDICTOR}))
+    if snapshot is None:
+        return SALIDA_SIN_DATOS, {"ok": False, "error": "No se pudieron cargar los precios"}
+    resultados = planificar_entrenamiento(
+        args.tickers, args.horizontes, snapshot=snapshot, procesos=args.procesos, forzar=args.forzar,
+    )
+    ok = all(r.get("ok") for r in resultados)
+    return (SALIDA_OK if ok else SALIDA_ERROR), {"ok": ok, "trabajos": resultados}
+
+def comando_backtest(args):
+    from datos.snapshot import cargar_snapshot
+    from modelo.backtest import ejecutar_backtest
+    snapshot = cargar_snapshot()
+    if snapshot is None:
+        return SALIDA_SIN_DATOS, {"ok": False, "error": "No se pudieron cargar los precios"}
+    resumen, _ = ejecutar_backtest(
+        args.horizontes, snapshot=snapshot, paso=args.paso, warm_start=not args.sin_warm_start,
+        procesos=args.procesos,
+    )
+    if resumen is None:
+        return SALIDA_ERROR, {"ok": False, "error": "El backtest no produjo resultados"}
+    return SALIDA_OK, {"ok": True, "resumen": _a_json(resumen.reset_index())}
+
+def comando_reporte(args):
+    from predicciones import almacen_predicciones, conciliacion
+    conciliadas = {} if args.sin_conciliar else conciliacion.conciliar(tickers=args.tickers)
+    desde = (pd.Timestamp.today().normalize() - pd.Timedelta(days=args.dias)) if args.dias else None
+    ultimas = pd.concat(
+        [almacen_predicciones.leer_predicciones(ticker=t, desde=desde) for t in (args.tickers or [None])],
+        ignore_index=True,
+    )
+    calidad = conciliacion.calidad_modelos()
+    movil = conciliacion.acierto_movil(args.ventana)
+    if args.tickers:
+        calidad = calidad[calidad["ticker"].isin([t.upper() for t in args.tickers])]
+        movil = movil[movil["ticker"].isin([t.upper() for t in args.tickers])]
+    return SALIDA_OK, {
+        "ok": True,
+        "conciliacion": conciliadas,
+        "calidad": _a_json(calidad),
+        "acierto_movil": _a_json(movil),
+        "predicciones": _a_json(ultimas),
+    }
+
+def comando_demonio(args):
+    from predicciones.ejecutar_prediccion import ejecutar_predicciones
+    from predicciones.demonio import ejecutar_demonio
+
+    # Una línea JSON por ejecución en stdout; el progreso de cada una, a stderr
+    destino = open(os.devnull, "w") if args.silencioso else sys.stderr
+
+    def tarea():
+        with _registro_a(destino):
+            return ejecutar_predicciones(interactivo=False)
+    try:
+        fallidas = ejecutar_demonio(
+            tarea, minutos_tras_cierre=args.minutos_tras_cierre, max_ejecuciones=args.max_ejecuciones,
+            salida=sys.stdout,
+        )
+    finally:
+        if destino is not sys.stderr:
+            destino.close()
+    return (SALIDA_OK if fallidas == 0 else SALIDA_ERROR), None
+
+
+def crear_parser():
+    parser = argparse.ArgumentParser(prog="cli.py", description="Modelo predictivo AAPL/SMH sin menú interactivo.")
+    parser.add_argument("-s", "--silencioso", action="store_true", help="Descarta los mensajes de progreso")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    p = sub.add_parser("predecir", aliases=["predict"], help="Predicciones 1d/5d/21d y registro")
+    p.set_defaults(funcion=comando_predecir)
+
+    p = sub.add_parser("entrenar", aliases=["train"], help="Entrena (o reutiliza) los modelos del registro")
+    p.add_argument("-t", "--tickers", nargs="+", default=["AAPL"])
+    p.add_argument("-H", "--horizontes", nargs="+", type=int, default=None)
+    p.add_argument("-p", "--procesos", type=int, default=None)
+    p.add_argument("--forzar", action="store_true", help="Reentrena aunque el modelo siga vigente")
+    p.set_defaults(funcion=comando_entrenar)
+
+    p = sub.add_parser("backtest", help="Backtest walk-forward")
+    p.add_argument("-H", "--horizontes", nargs="+", type=int, default=None)
+    p.add_argument("--paso", type=int, default=21, help="Filas por pliegue")
+    p.add_argument("--sin-warm-start", action="store_true")
+    p.add_argument("-p", "--procesos", type=int, default=None)
+    p.set_defaults(funcion=comando_backtest)
+
+    p = sub.add_parser("reporte", aliases=["report"], help="Concilia y reporta la calidad en vivo")
+    p.add_argument("-t", "--tickers", nargs="+", default=None)
+    p.add_argument("--dias", type=int, default=30, help="Predicciones de los últimos N días (0 = todas)")
+    p.add_argument("--ventana", type=int, default=60, help="Ventana de la tasa de acierto móvil")
+    p.add_argument("--sin-conciliar", action="store_true")
+    p.set_defaults(funcion=comando_reporte)
+
+    p = sub.add_parser("demonio", aliases=["daemon"], help="Queda residente y predice tras cada cierre")
+    p.add_argument("--minutos-tras-cierre", type=int, default=30)
+    p.add_argument("--max-ejecuciones", type=int, default=None)
+    p.set_defaults(funcion=comando_demonio)
+    return parser
+
+def main(argv=None):
+    args = crear_parser().parse_args(argv)
+    if args.funcion is comando_demonio:
+        codigo, _ = comando_demonio(args)
+        return codigo
+    destino = open(os.devnull, "w") if args.silencioso else sys.stderr
+    try:
+        with _registro_a(destino):
+            codigo, datos = args.funcion(args)
+    except Exception as e:
+        codigo, datos = SALIDA_ERROR, {"ok": False, "error": f"{type(e).__name__}: {e}"}
+    finally:
+        if destino is not sys.stderr:
+            destino.close()
+    _emitir(datos)
+    return codigo
+
+
+if __name__ == "__main__":
+    sys.exit(main())
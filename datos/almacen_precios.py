@@ -0,0 +1,109 @@
+import os
+import json
+import time
+import pandas as pd
+
+# Almacén local de precios (un archivo Parquet por ticker).
+# 'fuente_yfinance.py' lo usa para no descargar 10 años de
+# historia en cada llamada: solo se piden las barras nuevas.
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+
+# --- Configuración del Almacén ---
+DIRECTORIO_ALMACEN = os.environ.get(
+    "MODELO_DIR_ALMACEN", os.path.join(script_dir, "almacen")
+)
+MINUTOS_FRESCURA_ALMACEN = 60  # Si el archivo es más reciente que esto, no se consulta a Yahoo
+
+
+def _ruta_parquet(ticker: str):
+    return os.path.join(DIRECTORIO_ALMACEN, f"{ticker.upper()}.parquet")
+
+
+def _ruta_metadatos(ticker: str):
+    return os.path.join(DIRECTORIO_ALMACEN, f"{ticker.upper()}.json")
+
+
+def leer_precios(ticker: str):
+    """
+    Lee del disco el histórico guardado de un ticker.
+    Devuelve (DataFrame, metadatos) o (None, None) si no hay nada guardado.
+    """
+    ruta = _ruta_parquet(ticker)
+    if not os.path.exists(ruta):
+        return None, None
+    try:
+        df = pd.read_parquet(ruta)
+        metadatos = {}
+        if os.path.exists(_ruta_metadatos(ticker)):
+            with open(_ruta_metadatos(ticker), "r", encoding="utf-8") as f:
+                metadatos = json.load(f)
+        return df, metadatos
+    except Exception as e:
+        # Un archivo corrupto o sin 'pyarrow' no debe romper la descarga
+        print(f"*** [almacen_precios] No se pudo leer el almacén de {ticker}: {e} ***")
+        return None, None
+
+
+def guardar_precios(ticker: str, df: pd.DataFrame, periodo: str):
+    """
+    Guarda (sobrescribe) el histórico de un ticker junto con sus metadatos.
+    La escritura va a un archivo temporal y luego se renombra, para
+    que un lector nunca vea un Parquet a medio escribir.
+    """
+    try:
+        os.makedirs(DIRECTORIO_ALMACEN, exist_ok=True)
+        ruta = _ruta_parquet(ticker)
+        ruta_tmp = f"{ruta}.{os.getpid()}.tmp"
+        df.to_parquet(ruta_tmp)
+        os.replace(ruta_tmp, ruta)
+
+        metadatos = {
+            "periodo": periodo,
+            "primera_fecha": df.index[0].strftime("%Y-%m-%d"),
+            "ultima_fecha": df.index[-1].strftime("%Y-%m-%d"),
+            "actualizado_en": time.time(),
+        }
+        with open(_ruta_metadatos(ticker), "w", encoding="utf-8") as f:
+            json.dump(metadatos, f, indent=2)
+        return True
+    except Exception as e:
+        print(f"*** [almacen_precios] No se pudo guardar el almacén de {ticker}: {e} ***")
+        return False
+
+
+def esta_fresco(metadatos: dict):
+    """True si el almacén se actualizó hace menos de MINUTOS_FRESCURA_ALMACEN."""
+    if not metadatos or "actualizado_en" not in metadatos:
+        return False
+    return (time.time() - metadatos["actualizado_en"]) < MINUTOS_FRESCURA_ALMACEN * 60
+
+
+def borrar_precios(ticker: str):
+    """Elimina el almacén de un ticker (fuerza una descarga completa)."""
+    for ruta in (_ruta_parquet(ticker), _ruta_metadatos(ticker)):
+        if os.path.exists(ruta):
+            os.remove(ruta)
+
+
+def fecha_inicio_periodo(periodo: str, hoy=None):
+    """
+    Convierte un período de yfinance ('10y', '6mo', '5d', 'ytd', 'max')
+    en la fecha de inicio que cubre. 'max' devuelve None (sin límite).
+    """
+    hoy = pd.Timestamp(hoy) if hoy is not None else pd.Timestamp.today()
+    hoy = hoy.normalize()
+    periodo = periodo.lower()
+    if periodo == "max":
+        return None
+    if periodo == "ytd":
+        return pd.Timestamp(year=hoy.year, month=1, day=1)
+    if periodo.endswith("mo"):
+        return hoy - pd.DateOffset(months=int(periodo[:-2]))
+    if periodo.endswith("y"):
+        return hoy - pd.DateOffset(years=int(periodo[:-1]))
+    if periodo.endswith("wk"):
+        return hoy - pd.DateOffset(weeks=int(periodo[:-2]))
+    if periodo.endswith("d"):
+        return hoy - pd.DateOffset(days=int(periodo[:-1]))
+    raise ValueError(f"Período no reconocido: {periodo}")
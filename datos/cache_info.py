@@ -0,0 +1,221 @@
+import os
+import json
+import time
+import asyncio
+import threading
+from collections import OrderedDict
+
+from .fuentes import obtener_fuente, nombre_fuente
+
+# Caché del 'info' de los tickers (datos del inspector).
+# 't.info' es una consulta lenta y bloqueante; aquí se guarda en memoria
+# (LRU) y en disco (un JSON por ticker y fuente: los datos sintéticos o
+# grabados nunca se mezclan con los reales). Cada campo caduca según su
+# propio TTL: el precio cambia cada minuto, el sector casi nunca.
+
+# --- Configuración de la Caché ---
+DIRECTORIO_CACHE_INFO = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "almacen", "info"
+)
+MAX_ENTRADAS_MEMORIA = 512
+
+# Segundos de vida por campo. Los campos no listados usan TTL_POR_DEFECTO.
+TTL_POR_CAMPO = {
+    # Precios y volumen: cambian durante la sesión
+    "currentPrice": 5 * 60,
+    "regularMarketPrice": 5 * 60,
+    "previousClose": 5 * 60,
+    "volume": 5 * 60,
+    "regularMarketVolume": 5 * 60,
+    # Valuación: se mueve con el precio, pero basta con refrescar cada hora
+    "marketCap": 60 * 60,
+    "trailingPE": 60 * 60,
+    "forwardPE": 60 * 60,
+    # Descriptivos: casi nunca cambian
+    "longName": 30 * 24 * 3600,
+    "sector": 30 * 24 * 3600,
+    "industry": 30 * 24 * 3600,
+    "legalType": 30 * 24 * 3600,
+    "fundFamily": 30 * 24 * 3600,
+}
+TTL_POR_DEFECTO = 24 * 3600
+
+_memoria = OrderedDict()  # (fuente, ticker) -> {"info": {...}, "marcas": {campo: timestamp}}
+_refrescos = {}           # (fuente, ticker) -> hilo que lo está refrescando
+_lock = threading.Lock()
+
+
+def _ruta(ticker, fuente):
+    return os.path.join(DIRECTORIO_CACHE_INFO, fuente, f"{ticker.upper()}.json")
+
+def _leer_memoria(clave):
+    with _lock:
+        entrada = _memoria.get(clave)
+        if entrada is not None:
+            _memoria.move_to_end(clave)
+        return entrada
+
+def _guardar_memoria(clave, entrada):
+    with _lock:
+        _memoria[clave] = entrada
+        _memoria.move_to_end(clave)
+        while len(_memoria) > MAX_ENTRADAS_MEMORIA:
+            _memoria.popitem(last=False)
+
+def _leer_disco(ticker, fuente):
+    ruta = _ruta(ticker, fuente)
+    if not os.path.exists(ruta):
+        return None
+    try:
+        with open(ruta, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"*** [cache_info] Caché de {ticker} ilegible, se ignora: {e} ***")
+        return None
+
+def _guardar_disco(ticker, fuente, entrada):
+    try:
+        ruta = _ruta(ticker, fuente)
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        ruta_tmp = f"{ruta}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(ruta_tmp, "w", encoding="utf-8") as f:
+            json.dump(entrada, f, default=str)
+        os.replace(ruta_tmp, ruta)
+    except Exception as e:
+        print(f"*** [cache_info] No se pudo guardar la caché de {ticker}: {e} ***")
+
+def campos_vencidos(entrada, campos=None, ahora=None):
+    """Lista de campos (de 'campos', o todos) cuyo TTL ya venció."""
+    ahora = ahora if ahora is not None else time.time()
+    marcas = entrada.get("marcas", {})
+    campos = campos if campos is not None else list(entrada.get("info", {}))
+    return [
+        c for c in campos
+        if c not in marcas or ahora - marcas[c] >= TTL_POR_CAMPO.get(c, TTL_POR_DEFECTO)
+    ]
+
+def _buscar(ticker, fuente):
+    clave = (fuente, ticker)
+    entrada = _leer_memoria(clave)
+    if entrada is None:
+        entrada = _leer_disco(ticker, fuente)
+        if entrada is not None:
+            _guardar_memoria(clave, entrada)
+    return entrada
+
+def _descargar(ticker, fuente=None):
+    """
+    Pide el 'info' a la fuente y reemplaza lo que había en caché: un campo
+    que la fuente dejó de devolver no queda guardado (ni vencido para siempre).
+    """
+    fuente = fuente or obtener_fuente()
+    datos = fuente.obtener_datos_relevantes(ticker_symbol=ticker)
+    if not datos or "info" not in datos:
+        return None
+
+    ahora = time.time()
+    entrada = {"info": dict(datos["info"]), "marcas": {c: ahora for c in datos["info"]}}
+    _guardar_memoria((nombre_fuente(fuente), ticker), entrada)
+    _guardar_disco(ticker, nombre_fuente(fuente), entrada)
+    return entrada
+
+def _refrescar_en_hilo(ticker, fuente):
+    """Un solo refresco en curso por ticker y fuente; devuelve su hilo."""
+    clave = (nombre_fuente(fuente), ticker)
+
+    def refrescar():
+        try:
+            _descargar(ticker, fuente)
+        except Exception as e:
+            print(f"*** [cache_info] Falló el refresco de {ticker}: {e} ***")
+        finally:
+            with _lock:
+                if _refrescos.get(clave) is threading.current_thread():
+                    del _refrescos[clave]
+
+    with _lock:
+        hilo = _refrescos.get(clave)
+        if hilo is None or not hilo.is_alive():
+            hilo = threading.Thread(target=refrescar, name=f"refresco-info-{ticker}", daemon=True)
+            _refrescos[clave] = hilo
+            hilo.start()
+    return hilo
+
+def obtener_info(ticker: str, campos=None, forzar: bool = False):
+    """
+    Devuelve {"info": {...}} para 'ticker'.
+    - Con 'campos': desde la caché si esos campos siguen vigentes; si
+      alguno venció, se consulta la fuente una vez (la llamada espera).
+    - Sin 'campos' (la vista general del inspector): si hay algo en caché
+      se devuelve enseguida, y lo vencido se refresca en segundo plano.
+    """
+    ticker = ticker.upper()
+    fuente = obtener_fuente()
+    entrada = None if forzar else _buscar(ticker, nombre_fuente(fuente))
+
+    if entrada is not None:
+        if not campos_vencidos(entrada, campos):
+            print(f"[cache_info] 'info' de {ticker} servido desde la caché.")
+            return {"info": entrada["info"]}
+        if campos is None:
+            _refrescar_en_hilo(ticker, fuente)
+            print(f"[cache_info] 'info' de {ticker} servido desde la caché (refrescando en segundo plano).")
+            return {"info": entrada["info"]}
+
+    entrada = _descargar(ticker, fuente)
+    return {"info": entrada["info"]} if entrada is not None else None
+
+def esperar_refrescos(timeout: float = None):
+    """Espera a que terminen los refrescos de 'obtener_info' en curso."""
+    with _lock:
+        hilos = list(_refrescos.values())
+    for hilo in hilos:
+        hilo.join(timeout)
+
+def limpiar_memoria():
+    with _lock:
+        _memoria.clear()
+
+
+# --- Refresco Asíncrono ---
+
+async def refrescar_info_async(tickers, concurrencia: int = 8, solo_vencidos: bool = True):
+    """
+    Refresca el 'info' de muchos tickers en paralelo (asyncio + hilos,
+    porque la consulta de la fuente es bloqueante).
+    Devuelve {ticker: True/False} según si el refresco tuvo éxito.
+    """
+    semaforo = asyncio.Semaphore(concurrencia)
+    fuente = obtener_fuente()
+
+    async def refrescar(ticker):
+        ticker = ticker.upper()
+        if solo_vencidos:
+            entrada = _buscar(ticker, nombre_fuente(fuente))
+            if entrada is not None and not campos_vencidos(entrada):
+                return ticker, True
+        async with semaforo:
+            try:
+                entrada = await asyncio.to_thread(_descargar, ticker, fuente)
+                return ticker, entrada is not None
+            except Exception as e:
+                print(f"*** [cache_info] Falló el refresco de {ticker}: {e} ***")
+                return ticker, False
+
+    resultados = await asyncio.gather(*(refrescar(t) for t in tickers))
+    return dict(resultados)
+
+def refrescar_en_segundo_plano(tickers, concurrencia: int = 8):
+    """
+    Lanza 'refrescar_info_async' en un hilo aparte y vuelve enseguida.
+    Las siguientes llamadas a 'obtener_info' encontrarán la caché caliente.
+    Devuelve el hilo (se puede hacer .join() si hace falta esperar).
+    """
+    hilo = threading.Thread(
+        target=lambda: asyncio.run(refrescar_info_async(tickers, concurrencia)),
+        name="refresco-info",
+        daemon=True,
+    )
+    hilo.start()
+    print(f"[cache_info] Refrescando 'info' de {len(tickers)} tickers en segundo plano...")
+    return hilo
@@ -0,0 +1,61 @@
+from datetime import datetime, time as hora_del_dia, timedelta
+from zoneinfo import ZoneInfo
+
+import pandas as pd
+from pandas.tseries.holiday import (
+    AbstractHolidayCalendar, Holiday, GoodFriday, USMartinLutherKingJr, USPresidentsDay,
+    USMemorialDay, USLaborDay, USThanksgivingDay, nearest_workday, sunday_to_monday,
+)
+
+# Calendario de la bolsa de Nueva York (NYSE), para saber cuándo hay un
+# cierre nuevo que predecir. Solo feriados completos; los días de cierre
+# temprano (ej. el viernes después de Acción de Gracias) cuentan como
+# días normales: se corre igual, solo que un rato después del cierre real.
+
+ZONA_MERCADO = ZoneInfo("America/New_York")
+HORA_CIERRE = hora_del_dia(16, 0)
+MINUTOS_TRAS_CIERRE = 30  # Margen para que el proveedor publique la barra del día
+
+
+class CalendarioNYSE(AbstractHolidayCalendar):
+    rules = [
+        # Año nuevo en sábado no se compensa el viernes (cerraría el año fiscal)
+        Holiday("Año Nuevo", month=1, day=1, observance=sunday_to_monday),
+        USMartinLutherKingJr,
+        USPresidentsDay,
+        GoodFriday,
+        USMemorialDay,
+        Holiday("Juneteenth", month=6, day=19, start_date="2022-01-01", observance=nearest_workday),
+        Holiday("Día de la Independencia", month=7, day=4, observance=nearest_workday),
+        USLaborDay,
+        USThanksgivingDay,
+        Holiday("Navidad", month=12, day=25, observance=nearest_workday),
+    ]
+
+
+_FERIADOS = {}
+
+def _feriados(anio: int):
+    if anio not in _FERIADOS:
+        _FERIADOS[anio] = set(CalendarioNYSE().holidays(f"{anio}-01-01", f"{anio}-12-31").date)
+    return _FERIADOS[anio]
+
+def es_dia_de_mercado(fecha) -> bool:
+    """True si la NYSE abre ese día (lunes a viernes que no son feriado)."""
+    fecha = pd.Timestamp(fecha).date()
+    return fecha.weekday() < 5 and fecha not in _feriados(fecha.year)
+
+def proxima_ejecucion(ahora: datetime = None, minutos_tras_cierre: int = MINUTOS_TRAS_CIERRE):
+    """
+    Próximo momento (con zona horaria de Nueva York) en que hay que correr:
+    'minutos_tras_cierre' después del cierre del próximo día de mercado.
+    Si hoy es día de mercado y todavía no pasó esa hora, es hoy.
+    """
+    ahora = (ahora or datetime.now(ZONA_MERCADO)).astimezone(ZONA_MERCADO)
+    fecha = ahora.date()
+    while True:
+        if es_dia_de_mercado(fecha):
+            momento = datetime.combine(fecha, HORA_CIERRE, ZONA_MERCADO) + timedelta(minutes=minutos_tras_cierre)
+            if momento > ahora:
+                return momento
+        fecha += timedelta(days=1)
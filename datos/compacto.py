@@ -0,0 +1,140 @@
+import os
+import json
+
+import numpy as np
+import pandas as pd
+
+# Formato compacto para paneles de precios.
+# yfinance devuelve float64 con columnas que el modelo nunca lee
+# (Dividends, Stock Splits, Capital Gains). Para paneles de cientos de
+# tickers guardamos solo las columnas pedidas, en float32, con UN índice
+# de fechas int64 compartido por todos los tickers. Los arreglos pueden
+# vivir en archivos .npy abiertos como memmap: varios procesos leen las
+# mismas páginas del disco sin copiarlas ni serializarlas (pickle).
+
+DTYPE_COMPACTO = np.float32
+COLUMNAS_POR_DEFECTO = ('Close',)
+DIRECTORIO_MEMMAP = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "almacen", "memmap"
+)
+
+def compactar_precios(df: pd.DataFrame, columnas=COLUMNAS_POR_DEFECTO):
+    """
+    Devuelve solo 'columnas' de un DataFrame de precios, en float32.
+    Las columnas que no existan en 'df' se ignoran.
+    """
+    columnas = [c for c in columnas if c in df.columns]
+    return df[columnas].astype(DTYPE_COMPACTO)
+
+
+class PanelCompacto:
+    """
+    Panel de precios compacto.
+    - fechas:  int64 (nanosegundos desde 1970), forma (T,)
+    - tickers: lista de N tickers
+    - valores: {columna: float32 de forma (T, N)}; NaN donde no hubo cotización
+    """
+
+    def __init__(self, fechas, tickers, valores):
+        self.fechas = fechas
+        self.tickers = list(tickers)
+        self.valores = valores
+        self._posicion = {t: i for i, t in enumerate(self.tickers)}
+
+    @property
+    def columnas(self):
+        return list(self.valores)
+
+    @property
+    def indice(self):
+        return pd.DatetimeIndex(self.fechas.astype('datetime64[ns]'))
+
+    def nbytes(self):
+        return self.fechas.nbytes + sum(v.nbytes for v in self.valores.values())
+
+    def matriz(self, columna='Close'):
+        """Arreglo (T, N) de una columna, sin copiar."""
+        return self.valores[columna]
+
+    def serie(self, ticker, columna='Close'):
+        """Serie de pandas de un ticker (vista sobre el arreglo, sin copiar)."""
+        return pd.Series(self.valores[columna][:, self._posicion[ticker]],
+                         index=self.indice, name=ticker, copy=False)
+
+    def a_dataframe(self, columna='Close'):
+        """DataFrame (fechas x tickers) de una columna."""
+        return pd.DataFrame(self.valores[columna], index=self.indice, columns=self.tickers)
+
+
+def armar_panel_compacto(datos: dict, columnas=COLUMNAS_POR_DEFECTO):
+    """
+    Construye un PanelCompacto a partir de {ticker: DataFrame}
+    (por ejemplo, el resultado de gestor_tickers.descargar_tickers).
+    Las fechas se alinean por unión.
+    """
+    tickers = list(datos)
+    indice = pd.DatetimeIndex([])
+    for df in datos.values():
+        indice = indice.union(df.index)
+
+    valores = {}
+    for columna in columnas:
+        matriz = np.full((len(indice), len(tickers)), np.nan, dtype=DTYPE_COMPACTO)
+        for j, ticker in enumerate(tickers):
+            df = datos[ticker]
+            if columna not in df.columns:
+                continue
+            posiciones = indice.get_indexer(df.index)
+            matriz[posiciones, j] = df[columna].to_numpy(dtype=DTYPE_COMPACTO)
+        valores[columna] = matriz
+
+    fechas = indice.as_unit('ns').asi8.copy()
+    return PanelCompacto(fechas, tickers, valores)
+
+
+def guardar_panel_memmap(panel: PanelCompacto, nombre: str, directorio: str = DIRECTORIO_MEMMAP):
+    """
+    Guarda el panel como archivos .npy (uno por columna) más un JSON
+    con los tickers. Devuelve la carpeta creada.
+    """
+    carpeta = os.path.join(directorio, nombre)
+    os.makedirs(carpeta, exist_ok=True)
+    np.save(os.path.join(carpeta, "fechas.npy"), panel.fechas)
+    for columna, matriz in panel.valores.items():
+        np.save(os.path.join(carpeta, f"{columna}.npy"), np.ascontiguousarray(matriz))
+    with open(os.path.join(carpeta, "panel.json"), "w", encoding="utf-8") as f:
+        json.dump({"tickers": panel.tickers, "columnas": panel.columnas}, f)
+    print(f"[compacto] Panel guardado en {carpeta} ({panel.nbytes() / 1e6:.1f} MB)")
+    return carpeta
+
+def abrir_panel_memmap(nombre: str, directorio: str = DIRECTORIO_MEMMAP, columnas=None):
+    """
+    Abre un panel guardado con 'guardar_panel_memmap' como memmap de solo
+    lectura: no se lee nada del disco hasta que se accede a los datos.
+    Para compartirlo con otros procesos basta con pasarles 'nombre'.
+    """
+    carpeta = os.path.join(directorio, nombre)
+    with open(os.path.join(carpeta, "panel.json"), "r", encoding="utf-8") as f:
+        meta = json.load(f)
+    columnas = columnas or meta["columnas"]
+    fechas = np.load(os.path.join(carpeta, "fechas.npy"), mmap_mode='r')
+    valores = {c: np.load(os.path.join(carpeta, f"{c}.npy"), mmap_mode='r') for c in columnas}
+    return PanelCompacto(fechas, meta["tickers"], valores)
+
+def exportar_almacen_a_memmap(tickers, nombre: str, columnas=COLUMNAS_POR_DEFECTO,
+                              directorio: str = DIRECTORIO_MEMMAP):
+    """
+    Construye un panel memmap directamente desde el almacén local de
+    precios (almacen_precios), sin pasar por la red.
+    Devuelve el panel abierto como memmap, o None si faltan tickers.
+    """
+    from . import almacen_precios
+    datos = {}
+    for ticker in tickers:
+        df, _ = almacen_precios.leer_precios(ticker)
+        if df is None:
+            print(f"*** [compacto] {ticker} no está en el almacén local ***")
+            return None
+        datos[ticker] = df
+    guardar_panel_memmap(armar_panel_compacto(datos, columnas), nombre, directorio)
+    return abrir_panel_memmap(nombre, directorio)
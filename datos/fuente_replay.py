@@ -0,0 +1,86 @@
+import os
+import json
+
+import pandas as pd
+
+from . import almacen_precios
+
+# Fuente de datos "replay": sirve OHLCV e 'info' grabados en archivos locales.
+# Con ella una ejecución completa del pipeline es reproducible y no
+# depende de la red.
+#
+# Estructura del directorio:
+#   <directorio>/<TICKER>.parquet     -> precios (mismo formato que fuente_yfinance)
+#   <directorio>/<TICKER>_info.json   -> diccionario 'info'
+
+DIRECTORIO_REPLAY = os.environ.get(
+    "MODELO_DIR_REPLAY",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "replay"),
+)
+
+class FuenteReplay:
+    """Fuente que lee datos grabados en 'directorio'."""
+
+    def __init__(self, directorio: str = DIRECTORIO_REPLAY):
+        self.directorio = directorio
+
+    def _ruta_precios(self, ticker):
+        return os.path.join(self.directorio, f"{ticker.upper()}.parquet")
+
+    def _ruta_info(self, ticker):
+        return os.path.join(self.directorio, f"{ticker.upper()}_info.json")
+
+    def obtener_datos_precios(self, ticker: str, periodo: str = "10y"):
+        """
+        Devuelve los precios grabados de 'ticker'. El período se mide
+        hacia atrás desde la ÚLTIMA barra grabada (no desde hoy), para que
+        el resultado sea el mismo sin importar cuándo se ejecute.
+        """
+        ruta = self._ruta_precios(ticker)
+        if not os.path.exists(ruta):
+            print(f"*** [fuente_replay] No hay precios grabados para {ticker} en {self.directorio} ***")
+            return None
+        df = pd.read_parquet(ruta)
+        inicio = almacen_precios.fecha_inicio_periodo(periodo, hoy=df.index[-1])
+        if inicio is not None:
+            df = df[df.index >= inicio]
+        print(f"[fuente_replay] Datos de precios para {ticker} leídos ({len(df)} filas).")
+        return df
+
+    def obtener_datos_relevantes(self, ticker_symbol: str):
+        ruta = self._ruta_info(ticker_symbol)
+        if not os.path.exists(ruta):
+            print(f"*** [fuente_replay] No hay 'info' grabada para {ticker_symbol} ***")
+            return None
+        with open(ruta, "r", encoding="utf-8") as f:
+            return {"info": json.load(f)}
+
+
+def grabar_replay(tickers, directorio: str = DIRECTORIO_REPLAY, fuente=None,
+                  periodo: str = "10y", incluir_info: bool = True):
+    """
+    Graba precios (y opcionalmente 'info') de la fuente dada (por defecto
+    la activa) en 'directorio', listos para reproducirse con FuenteReplay.
+    Devuelve la lista de tickers grabados.
+    """
+    from .fuentes import obtener_fuente
+    fuente = fuente or obtener_fuente()
+    os.makedirs(directorio, exist_ok=True)
+
+    grabados = []
+    for ticker in tickers:
+        df = fuente.obtener_datos_precios(ticker=ticker, periodo=periodo)
+        if df is None:
+            print(f"*** [fuente_replay] No se pudo grabar {ticker} ***")
+            continue
+        df.to_parquet(os.path.join(directorio, f"{ticker.upper()}.parquet"))
+
+        if incluir_info:
+            datos = fuente.obtener_datos_relevantes(ticker_symbol=ticker)
+            if datos and "info" in datos:
+                with open(os.path.join(directorio, f"{ticker.upper()}_info.json"), "w", encoding="utf-8") as f:
+                    json.dump(datos["info"], f, indent=2, default=str)
+        grabados.append(ticker)
+
+    print(f"[fuente_replay] Grabados {len(grabados)} tickers en {directorio}")
+    return grabados
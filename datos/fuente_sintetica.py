@@ -0,0 +1,146 @@
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from . import almacen_precios
+
+# Fuente de datos sintética: genera OHLCV deterministas (misma semilla ->
+# mismas barras) para pruebas, perfiles y benchmarks sin red.
+# Todos los tickers comparten un factor de "mercado", así que la
+# correlación entre ellos (ej. AAPL vs SMH) no es cero, como en la realidad.
+
+FECHA_FIN_SINTETICA = "2025-01-01"
+ANIOS_HISTORIA_SINTETICA = 20  # Historia total generada (luego se recorta al período)
+
+class FuenteSintetica:
+    """Fuente que genera precios con un paseo aleatorio geométrico."""
+
+    def __init__(self, semilla: int = 42, fecha_fin: str = FECHA_FIN_SINTETICA,
+                 volatilidad_diaria: float = 0.015, beta: float = 0.8):
+        self.semilla = semilla
+        self.fecha_fin = pd.Timestamp(fecha_fin)
+        self.volatilidad_diaria = volatilidad_diaria
+        self.beta = beta
+        self._fechas = pd.bdate_range(
+            end=self.fecha_fin,
+            start=self.fecha_fin - pd.DateOffset(years=ANIOS_HISTORIA_SINTETICA),
+        )
+        # Factor común de mercado (depende solo de la semilla)
+        rng = np.random.default_rng(semilla)
+        self._mercado = rng.normal(0.0003, self.volatilidad_diaria, len(self._fechas))
+
+    def _rng_ticker(self, ticker):
+        # crc32 es estable entre ejecuciones (hash() de Python no lo es)
+        return np.random.default_rng([self.semilla, zlib.crc32(ticker.upper().encode())])
+
+    def generar_ohlcv(self, ticker: str):
+        """Devuelve la historia sintética completa de un ticker."""
+        rng = self._rng_ticker(ticker)
+        n = len(self._fechas)
+        idio = rng.normal(0, self.volatilidad_diaria * 0.6, n)
+        retornos = self.beta * self._mercado + idio
+
+        precio_inicial = rng.uniform(20, 200)
+        close = precio_inicial * np.exp(np.cumsum(retornos))
+        open_ = np.empty(n)
+        open_[0] = precio_inicial
+        open_[1:] = close[:-1] * np.exp(rng.normal(0, self.volatilidad_diaria * 0.2, n - 1))
+        rango = np.abs(rng.normal(0, self.volatilidad_diaria * 0.5, n))
+        high = np.maximum(open_, close) * (1 + rango)
+        low = np.minimum(open_, close) * (1 - rango)
+        volumen = rng.lognormal(16, 0.4, n).round()
+
+        return pd.DataFrame({
+            'Open': open_,
+            'High': high,
+            'Low': low,
+            'Close': close,
+            'Volume': volumen,
+            'Dividends': 0.0,
+            'Stock Splits': 0.0,
+        }, index=self._fechas.copy())
+
+    def obtener_datos_precios(self, ticker: str, periodo: str = "10y"):
+        df = self.generar_ohlcv(ticker)
+        inicio = almacen_precios.fecha_inicio_periodo(periodo, hoy=self.fecha_fin)
+        if inicio is not None:
+            df = df[df.index >= inicio]
+        print(f"[fuente_sintetica] Datos sintéticos para {ticker} generados ({len(df)} filas).")
+        return df
+
+    def obtener_datos_relevantes(self, ticker_symbol: str):
+        rng = self._rng_ticker(ticker_symbol)
+        return {
+            "info": {
+                "symbol": ticker_symbol.upper(),
+                "longName": f"{ticker_symbol.upper()} (sintético)",
+                "sector": "Technology",
+                "trailingPE": float(rng.uniform(10, 40)),
+                "marketCap": int(rng.uniform(1e9, 3e12)),
+            }
+        }
+
+
+# --- Paneles sintéticos para benchmarks ---
+# FuenteSintetica genera un ticker por llamada y siempre en barras diarias.
+# Para medir cómo escala el pipeline hace falta más: años de barras de
+# 1 minuto o cientos de tickers a la vez. generar_panel_sintetico arma
+# todo el panel de una sola vez (una matriz de retornos fechas x tickers).
+
+BARRAS_POR_DIA_INTRADIA = 390  # 09:30 a 16:00, en minutos
+
+def fechas_sinteticas(anios: float, frecuencia: str = "1D", fecha_fin: str = FECHA_FIN_SINTETICA):
+    """Días hábiles de 'anios' años; con frecuencia intradía (ej. '1min'), sus barras de 09:30 a 16:00."""
+    fin = pd.Timestamp(fecha_fin)
+    dias = pd.bdate_range(end=fin, start=fin - pd.DateOffset(days=round(anios * 365.25)))
+    if pd.Timedelta(frecuencia) >= pd.Timedelta("1D"):
+        return dias
+    barras = pd.timedelta_range(start="09:30:00", end="15:59:59", freq=frecuencia)
+    return pd.DatetimeIndex((dias.values[:, None] + barras.values[None, :]).ravel())
+
+def nombres_tickers(n: int):
+    """AAPL y SMH (el par del modelo) y después T0002, T0003..."""
+    return (["AAPL", "SMH"] + [f"T{i:04d}" for i in range(2, n)])[:n]
+
+def generar_panel_sintetico(tickers=2, anios: float = 10, frecuencia: str = "1D", semilla: int = 42,
+                            volatilidad_diaria: float = 0.015, beta: float = 0.8):
+    """
+    Genera OHLCV deterministas para muchos tickers (mismo factor de mercado).
+
+    Args:
+        tickers: Cantidad de tickers (int) o lista de nombres.
+        anios: Largo de la historia.
+        frecuencia: '1D' (diario) o intradía ('1min', '5min'...).
+
+    Returns:
+        Snapshot {ticker: DataFrame OHLCV}, listo para pasarle a
+        crear_features_multihorizonte(snapshot=...).
+    """
+    tickers = nombres_tickers(tickers) if isinstance(tickers, int) else list(tickers)
+    fechas = fechas_sinteticas(anios, frecuencia)
+    T, K = len(fechas), len(tickers)
+    # La volatilidad por barra escala con la raíz de la fracción del día que cubre
+    if pd.Timedelta(frecuencia) >= pd.Timedelta("1D"):
+        volatilidad = volatilidad_diaria
+    else:
+        volatilidad = volatilidad_diaria * np.sqrt(pd.Timedelta(frecuencia) / pd.Timedelta(minutes=BARRAS_POR_DIA_INTRADIA))
+
+    rng = np.random.default_rng(semilla)
+    mercado = rng.normal(0, volatilidad, (T, 1)).astype(np.float32)
+    retornos = beta * mercado + rng.normal(0, volatilidad * 0.6, (T, K)).astype(np.float32)
+    close = rng.uniform(20, 200, K) * np.exp(np.cumsum(retornos, axis=0, dtype=np.float64))
+    open_ = np.vstack([close[:1], close[:-1]]) * np.exp(rng.normal(0, volatilidad * 0.2, (T, K)))
+    rango = np.abs(rng.normal(0, volatilidad * 0.5, (T, K)))
+    high = np.maximum(open_, close) * (1 + rango)
+    low = np.minimum(open_, close) * (1 - rango)
+    volumen = rng.lognormal(16, 0.4, (T, K)).round()
+
+    print(f"[fuente_sintetica] Panel sintético: {K} tickers x {T} barras ({frecuencia}).")
+    return {
+        ticker: pd.DataFrame({
+            'Open': open_[:, k], 'High': high[:, k], 'Low': low[:, k],
+            'Close': close[:, k], 'Volume': volumen[:, k],
+        }, index=fechas)
+        for k, ticker in enumerate(tickers)
+    }
@@ -1,29 +1,139 @@
 import yfinance as yf
 import pandas as pd
+import numpy as np
 import sys
 
+from . import almacen_precios
+
 # Este es el archivo que se conecta a Yahoo Finance
 # para descargar los datos.
 
-def obtener_datos_precios(ticker: str, periodo: str = "10y"):
+# Columnas que cambian cuando Yahoo re-ajusta la historia (splits/dividendos)
+COLUMNAS_AJUSTE = ['Dividends', 'Stock Splits']
+TOLERANCIA_REAJUSTE = 1e-6  # Diferencia relativa máxima aceptada en barras ya guardadas
+
+def _descargar_historia(ticker: str, **kwargs):
+    """
+    Llamada cruda a yfinance. Acepta 'period=' o 'start='.
+    Devuelve el DataFrame con índice de fechas (sin hora) o None.
+    """
+    t = yf.Ticker(ticker)
+    df = t.history(**kwargs)
+
+    if df.empty:
+        return None
+
+    # Asegurarse de que el índice es solo Fecha (sin hora)
+    df.index = df.index.tz_convert(None).normalize()
+    return df
+
+def _recortar_a_periodo(df: pd.DataFrame, periodo: str):
+    inicio = almacen_precios.fecha_inicio_periodo(periodo)
+    if inicio is None:
+        return df
+    return df[df.index >= inicio]
+
+def _almacen_cubre_periodo(metadatos: dict, periodo: str):
+    """¿El histórico guardado empieza al menos tan atrás como pide 'periodo'?"""
+    periodo_guardado = metadatos.get('periodo')
+    if periodo_guardado is None:
+        return False
+    if periodo_guardado.lower() == 'max':
+        return True
+    inicio_pedido = almacen_precios.fecha_inicio_periodo(periodo)
+    if inicio_pedido is None:
+        return False
+    return almacen_precios.fecha_inicio_periodo(periodo_guardado) <= inicio_pedido
+
+def _requiere_reajuste(df_guardado: pd.DataFrame, df_nuevo: pd.DataFrame):
+    """
+    Yahoo entrega precios ajustados: tras un split o un dividendo TODA la
+    historia anterior cambia. Lo detectamos de dos formas:
+    a) Las barras solapadas (ya guardadas) ya no coinciden con las nuevas.
+    b) Las barras nuevas traen un evento de dividendo o split.
+    La última barra guardada se excluye de (a) porque pudo ser una barra
+    parcial (descargada con el mercado abierto).
+    """
+    solape = df_guardado.index[:-1].intersection(df_nuevo.index)
+    if len(solape) > 0:
+        viejo = df_guardado.loc[solape, 'Close'].to_numpy()
+        nuevo = df_nuevo.loc[solape, 'Close'].to_numpy()
+        if not np.allclose(viejo, nuevo, rtol=TOLERANCIA_REAJUSTE, atol=0):
+            return True
+
+    posteriores = df_nuevo[df_nuevo.index > df_guardado.index[-2]]
+    for col in COLUMNAS_AJUSTE:
+        if col not in posteriores.columns:
+            continue
+        # Un evento que ya estaba guardado en la última barra no cuenta como nuevo
+        ya_visto = df_guardado[col].reindex(posteriores.index).fillna(0) if col in df_guardado.columns else 0
+        eventos_nuevos = (posteriores[col].fillna(0) != 0) & (ya_visto == 0)
+        if eventos_nuevos.any():
+            return True
+    return False
+
+def _descarga_completa(ticker: str, periodo: str, usar_almacen: bool):
+    df = _descargar_historia(ticker, period=periodo)
+    if df is None:
+        print(f"*** [fuente_yfinance] No se encontraron datos de precios para {ticker} ***")
+        return None
+    if usar_almacen:
+        almacen_precios.guardar_precios(ticker, df, periodo)
+    print(f"[fuente_yfinance] Datos de precios para {ticker} cargados.")
+    return df
+
+def obtener_datos_precios(ticker: str, periodo: str = "10y", usar_almacen: bool = True):
     """
     Descarga datos históricos de precios (OHLCV) para un ticker.
     Llamado por los gestores (ej. gestor_aapl.py).
+
+    Si 'usar_almacen' es True, se usa el almacén local (Parquet):
+    - Si el almacén es reciente, se lee del disco sin tocar la red.
+    - Si no, solo se descargan las barras posteriores a la última guardada.
+    - Si Yahoo re-ajustó la historia (split/dividendo), se descarga todo de nuevo.
     """
-    print(f"[fuente_yfinance] Descargando datos de precios para {ticker} ({periodo})...")
     try:
-        t = yf.Ticker(ticker)
-        df = t.history(period=periodo)
-        
-        if df.empty:
-            print(f"*** [fuente_yfinance] No se encontraron datos de precios para {ticker} ***")
-            return None
-            
-        # Asegurarse de que el índice es solo Fecha (sin hora)
-        df.index = df.index.tz_convert(None).normalize()
-        
-        print(f"[fuente_yfinance] Datos de precios para {ticker} cargados.")
-        return df
+        if not usar_almacen:
+            print(f"[fuente_yfinance] Descargando datos de precios para {ticker} ({periodo})...")
+            return _descarga_completa(ticker, periodo, usar_almacen=False)
+
+        df_guardado, metadatos = almacen_precios.leer_precios(ticker)
+
+        if df_guardado is None or len(df_guardado) < 2 or not _almacen_cubre_periodo(metadatos, periodo):
+            print(f"[fuente_yfinance] Descargando datos de precios para {ticker} ({periodo})...")
+            df = _descarga_completa(ticker, periodo, usar_almacen=True)
+            return _recortar_a_periodo(df, periodo) if df is not None else None
+
+        if almacen_precios.esta_fresco(metadatos):
+            print(f"[fuente_yfinance] Datos de precios para {ticker} leídos del almacén local.")
+            return _recortar_a_periodo(df_guardado, periodo)
+
+        # --- Descarga incremental (solo barras nuevas) ---
+        desde = df_guardado.index[-2]
+        print(f"[fuente_yfinance] Actualizando {ticker} desde {desde.strftime('%Y-%m-%d')}...")
+        try:
+            df_nuevo = _descargar_historia(ticker, start=desde)
+        except Exception as e:
+            # Sin red: mejor devolver lo guardado que nada
+            print(f"*** [fuente_yfinance] Falló la actualización de {ticker} ({e}). Usando el almacén local. ***")
+            return _recortar_a_periodo(df_guardado, periodo)
+
+        if df_nuevo is None:
+            print(f"*** [fuente_yfinance] No llegaron barras nuevas para {ticker}. Usando el almacén local. ***")
+            return _recortar_a_periodo(df_guardado, periodo)
+
+        if _requiere_reajuste(df_guardado, df_nuevo):
+            print(f"[fuente_yfinance] {ticker} fue re-ajustado (split/dividendo). Descargando historia completa...")
+            periodo_completo = metadatos.get('periodo', periodo)
+            df = _descarga_completa(ticker, periodo_completo, usar_almacen=True)
+            return _recortar_a_periodo(df, periodo) if df is not None else None
+
+        df = pd.concat([df_guardado[df_guardado.index < df_nuevo.index[0]], df_nuevo])
+        df = df[~df.index.duplicated(keep='last')]
+        almacen_precios.guardar_precios(ticker, df, metadatos.get('periodo', periodo))
+
+        print(f"[fuente_yfinance] Datos de precios para {ticker} cargados ({len(df_nuevo)} barras actualizadas).")
+        return _recortar_a_periodo(df, periodo)
         
     except Exception as e:
         print(f"*** [fuente_yfinance] Error fatal al descargar precios para {ticker}: {e} ***")
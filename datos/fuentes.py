@@ -0,0 +1,84 @@
+import os
+from typing import Protocol, runtime_checkable
+
+import pandas as pd
+
+# Interfaz común de las fuentes de datos.
+# Los gestores nunca hablan con yfinance directamente: piden la fuente
+# activa con 'obtener_fuente()'. Así una ejecución, una prueba o un
+# benchmark pueden usar datos grabados o sintéticos sin tocar la red.
+
+@runtime_checkable
+class FuenteDatos(Protocol):
+    """
+    Lo que debe ofrecer cualquier fuente de datos.
+    El propio módulo 'fuente_yfinance' cumple esta interfaz.
+    """
+
+    def obtener_datos_precios(self, ticker: str, periodo: str = "10y") -> pd.DataFrame:
+        """OHLCV con índice de fechas (sin hora). None si no hay datos."""
+        ...
+
+    def obtener_datos_relevantes(self, ticker_symbol: str) -> dict:
+        """Diccionario con al menos la clave 'info'. None si no hay datos."""
+        ...
+
+
+def _crear_yfinance(**kwargs):
+    from . import fuente_yfinance
+    return fuente_yfinance
+
+def _crear_replay(**kwargs):
+    from .fuente_replay import FuenteReplay
+    return FuenteReplay(**kwargs)
+
+def _crear_sintetica(**kwargs):
+    from .fuente_sintetica import FuenteSintetica
+    return FuenteSintetica(**kwargs)
+
+# Nombre -> constructor de la fuente
+FUENTES_DISPONIBLES = {
+    "yfinance": _crear_yfinance,
+    "replay": _crear_replay,
+    "sintetica": _crear_sintetica,
+}
+
+# La fuente por defecto se puede elegir con una variable de entorno
+# (ej. MODELO_FUENTE_DATOS=sintetica python main.py)
+FUENTE_POR_DEFECTO = os.environ.get("MODELO_FUENTE_DATOS", "yfinance")
+
+_fuente_activa = None
+
+def crear_fuente(nombre: str, **kwargs):
+    """Construye una fuente por su nombre ('yfinance', 'replay', 'sintetica')."""
+    if nombre not in FUENTES_DISPONIBLES:
+        raise ValueError(f"Fuente de datos desconocida: {nombre}. Opciones: {list(FUENTES_DISPONIBLES)}")
+    return FUENTES_DISPONIBLES[nombre](**kwargs)
+
+def establecer_fuente(fuente, **kwargs):
+    """
+    Cambia la fuente activa. Acepta un nombre registrado (con sus
+    argumentos) o directamente un objeto que cumpla 'FuenteDatos'.
+    Devuelve la fuente anterior, para poder restaurarla.
+    """
+    global _fuente_activa
+    anterior = _fuente_activa
+    if isinstance(fuente, str):
+        fuente = crear_fuente(fuente, **kwargs)
+    if not isinstance(fuente, FuenteDatos):
+        raise TypeError(f"{fuente!r} no cumple la interfaz FuenteDatos.")
+    _fuente_activa = fuente
+    print(f"[fuentes] Fuente de datos activa: {nombre_fuente(fuente)}")
+    return anterior
+
+def obtener_fuente():
+    """Devuelve la fuente activa (la crea la primera vez)."""
+    global _fuente_activa
+    if _fuente_activa is None:
+        _fuente_activa = crear_fuente(FUENTE_POR_DEFECTO)
+    return _fuente_activa
+
+def nombre_fuente(fuente=None):
+    """Nombre corto de la fuente (la activa por defecto), ej. para separar cachés."""
+    fuente = fuente or obtener_fuente()
+    return getattr(fuente, "__name__", type(fuente).__name__).rsplit(".", 1)[-1]
@@ -1,7 +1,5 @@
-# --- ¡CAMBIO AQUÍ! ---
-# Antes decía: from datos.fuente_yfinance import ...
-# Ahora dice (con un . al inicio):
-from .fuente_yfinance import obtener_datos_precios, obtener_datos_relevantes
+# Gestor de compatibilidad: toda la lógica vive ahora en 'gestor_tickers.py'.
+from . import gestor_tickers
 
 # Ticker específico para este gestor
 TICKER_GESTOR = "SMH"
@@ -11,13 +9,11 @@ def cargar_datos_modelo():
     Función que llamará 'gestor_modelo.py'.
     Obtiene los datos de precios para el Ticker de ESTE gestor (SMH).
     """
-    print(f"[gestor_smh] Pidiendo datos del modelo para {TICKER_GESTOR}")
-    return obtener_datos_precios(ticker=TICKER_GESTOR, periodo="10y")
+    return gestor_tickers.cargar_datos_modelo(TICKER_GESTOR)
 
 def cargar_datos_inspector():
     """
     Función que llamará 'main.py' para el menú.
     Obtiene TODOS los datos relevantes de ESTE gestor (SMH).
     """
-    print(f"[gestor_smh] Pidiendo datos del inspector para {TICKER_GESTOR}")
-    return obtener_datos_relevantes(ticker_symbol=TICKER_GESTOR)
\ No newline at end of file
+    return gestor_tickers.cargar_datos_inspector(TICKER_GESTOR)
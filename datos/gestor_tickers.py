@@ -0,0 +1,155 @@
+import time
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import pandas as pd
+
+from .fuentes import obtener_fuente
+from .compacto import armar_panel_compacto, COLUMNAS_POR_DEFECTO
+from . import cache_info
+
+# Gestor genérico basado en un registro de tickers.
+# Reemplaza a un módulo por ticker (gestor_aapl.py, gestor_smh.py...):
+# basta con registrar el ticker y pedirlo por nombre.
+# Los datos salen de la fuente activa (ver 'fuentes.py').
+
+# --- Registro de Tickers ---
+# Ticker -> configuración de descarga
+REGISTRO_TICKERS = {
+    "AAPL": {"periodo": "10y"},
+    "SMH": {"periodo": "10y"},
+}
+
+# --- Configuración de la Descarga Concurrente ---
+MAX_HILOS = 8                 # Descargas simultáneas como máximo
+SOLICITUDES_POR_SEGUNDO = 4   # Límite de tasa hacia Yahoo (entre todos los hilos)
+REINTENTOS = 3                # Intentos extra por ticker antes de darlo por fallido
+BACKOFF_SEGUNDOS = 1.0        # Espera base del backoff exponencial
+
+def registrar_ticker(ticker: str, periodo: str = "10y"):
+    """Añade (o actualiza) un ticker en el registro."""
+    REGISTRO_TICKERS[ticker.upper()] = {"periodo": periodo}
+
+def periodo_de(ticker: str):
+    return REGISTRO_TICKERS.get(ticker.upper(), {}).get("periodo", "10y")
+
+def cargar_datos_modelo(ticker: str, periodo: str = None):
+    """
+    Obtiene los datos de precios de un ticker del registro.
+    Equivale al 'cargar_datos_modelo()' de los gestores antiguos.
+    """
+    print(f"[gestor_tickers] Pidiendo datos del modelo para {ticker}")
+    return obtener_fuente().obtener_datos_precios(ticker=ticker, periodo=periodo or periodo_de(ticker))
+
+def cargar_datos_inspector(ticker: str):
+    """Obtiene los datos del inspector (info) de un ticker, vía la caché de 'info'."""
+    print(f"[gestor_tickers] Pidiendo datos del inspector para {ticker}")
+    return cache_info.obtener_info(ticker)
+
+
+class LimitadorTasa:
+    """
+    Limitador de tasa compartido entre hilos: reparte los inicios de
+    descarga a intervalos de 1/tasa segundos como mínimo.
+    """
+
+    def __init__(self, solicitudes_por_segundo: float):
+        self.intervalo = 1.0 / solicitudes_por_segundo if solicitudes_por_segundo else 0.0
+        self._siguiente = 0.0
+        self._lock = threading.Lock()
+
+    def esperar_turno(self):
+        with self._lock:
+            ahora = time.monotonic()
+            turno = max(ahora, self._siguiente)
+            self._siguiente = turno + self.intervalo
+        espera = turno - ahora
+        if espera > 0:
+            time.sleep(espera)
+
+
+def _descargar_con_reintentos(fuente, ticker, periodo, limitador, reintentos, backoff):
+    """
+    Descarga un ticker reintentando con backoff exponencial (+ jitter).
+    Lanza una excepción si todos los intentos fallan, para que
+    'descargar_tickers' la registre sin afectar al resto.
+    """
+    ultimo_error = None
+    for intento in range(reintentos + 1):
+        limitador.esperar_turno()
+        try:
+            df = fuente.obtener_datos_precios(ticker=ticker, periodo=periodo)
+            if df is not None and not df.empty:
+                return df
+            ultimo_error = "sin datos"
+        except Exception as e:
+            ultimo_error = str(e)
+        if intento < reintentos:
+            time.sleep(backoff * (2 ** intento) * (1 + random.random() * 0.25))
+    raise RuntimeError(f"{ticker}: {ultimo_error} (tras {reintentos + 1} intentos)")
+
+def descargar_tickers(tickers, periodo: str = None, max_hilos: int = MAX_HILOS,
+                      solicitudes_por_segundo: float = SOLICITUDES_POR_SEGUNDO,
+                      reintentos: int = REINTENTOS, backoff: float = BACKOFF_SEGUNDOS):
+    """
+    Descarga varios tickers en paralelo con un pool de hilos acotado.
+    Un ticker que falla no detiene a los demás.
+
+    Returns:
+        (datos, fallidos): {ticker: DataFrame} y {ticker: mensaje de error}.
+    """
+    tickers = [t.upper() for t in tickers]
+    limitador = LimitadorTasa(solicitudes_por_segundo)
+    fuente = obtener_fuente()
+    datos, fallidos = {}, {}
+
+    print(f"[gestor_tickers] Descargando {len(tickers)} tickers (hasta {max_hilos} en paralelo)...")
+    with ThreadPoolExecutor(max_workers=max(1, min(max_hilos, len(tickers)))) as pool:
+        futuros = {
+            pool.submit(_descargar_con_reintentos, fuente, t, periodo or periodo_de(t),
+                        limitador, reintentos, backoff): t
+            for t in tickers
+        }
+        for futuro in as_completed(futuros):
+            ticker = futuros[futuro]
+            try:
+                datos[ticker] = futuro.result()
+            except Exception as e:
+                fallidos[ticker] = str(e)
+                print(f"*** [gestor_tickers] Falló la descarga de {ticker}: {e} ***")
+
+    # Devolvemos en el mismo orden en que se pidieron
+    datos = {t: datos[t] for t in tickers if t in datos}
+    print(f"[gestor_tickers] Descarga terminada: {len(datos)} correctos, {len(fallidos)} fallidos.")
+    return datos, fallidos
+
+def armar_panel(datos: dict, alineacion: str = "outer"):
+    """
+    Une los DataFrames de cada ticker en un único panel alineado por fecha.
+    Las columnas quedan como MultiIndex (ticker, campo), ej. ('AAPL', 'Close').
+    'alineacion' = 'outer' conserva todas las fechas; 'inner' solo las comunes.
+    """
+    if not datos:
+        return None
+    return pd.concat(datos, axis=1, join=alineacion).sort_index()
+
+def cargar_panel(tickers, periodo: str = None, alineacion: str = "outer",
+                 columnas=None, compacto: bool = False, **kwargs):
+    """
+    Descarga concurrente + panel alineado en una sola llamada.
+
+    Args:
+        columnas: Si se indica, solo se conservan esas columnas (ej. ['Close']).
+        compacto: Si es True, devuelve un PanelCompacto (float32, índice
+            int64 compartido) en lugar de un DataFrame MultiIndex.
+
+    Returns:
+        (panel, fallidos)
+    """
+    datos, fallidos = descargar_tickers(tickers, periodo=periodo, **kwargs)
+    if compacto:
+        return armar_panel_compacto(datos, columnas or COLUMNAS_POR_DEFECTO), fallidos
+    if columnas is not None:
+        datos = {t: df[[c for c in columnas if c in df.columns]] for t, df in datos.items()}
+    return armar_panel(datos, alineacion=alineacion), fallidos
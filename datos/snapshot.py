@@ -0,0 +1,44 @@
+# Snapshot de datos de una ejecución.
+# Carga cada ticker UNA sola vez y se pasa a features, entrenamiento,
+# predicción y gráficos, para que todas las etapas vean las mismas barras.
+
+from . import gestor_tickers
+from .compacto import compactar_precios
+
+# Tickers que usa el modelo (objetivo y factor)
+TICKERS_SNAPSHOT = ["AAPL", "SMH"]
+
+def cargar_snapshot(tickers=None, columnas=None, periodo: str = None):
+    """
+    Carga en paralelo los precios de cada ticker pedido (por defecto,
+    TICKERS_SNAPSHOT) y devuelve un diccionario {ticker: DataFrame}.
+    Devuelve None si alguno de los tickers no pudo cargarse.
+
+    Si se indican 'columnas' (ej. ['Close']), el snapshot queda en modo
+    compacto: solo esas columnas y en float32 (ver datos/compacto.py).
+
+    'periodo' (ej. '3mo') carga solo esa historia en vez de la del registro
+    de tickers; ver registro_features.periodo_minimo.
+    """
+    tickers = list(tickers) if tickers is not None else list(TICKERS_SNAPSHOT)
+    print(f"[snapshot] Cargando snapshot de datos para: {', '.join(tickers)}")
+
+    snapshot, fallidos = gestor_tickers.descargar_tickers(tickers, periodo=periodo)
+    if fallidos:
+        print(f"*** [snapshot] No se pudieron cargar los datos de: {', '.join(fallidos)} ***")
+        return None
+
+    if columnas is not None:
+        snapshot = {t: compactar_precios(df, columnas) for t, df in snapshot.items()}
+
+    print("[snapshot] Snapshot listo.")
+    return snapshot
+
+def precios_de(snapshot, ticker):
+    """
+    Devuelve el DataFrame de 'ticker' guardado en el snapshot.
+    Si no hay snapshot (None), lo carga del gestor como antes.
+    """
+    if snapshot is not None and ticker in snapshot:
+        return snapshot[ticker]
+    return gestor_tickers.cargar_datos_modelo(ticker)
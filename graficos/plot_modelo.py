@@ -17,6 +17,7 @@ if parent_dir not in sys.path:
 try:
     from modelo.procesador_features import crear_features_y_target
     from modelo.gestor_modelo import entrenar_nuevo_modelo
+    from datos.snapshot import cargar_snapshot
 except ImportError as e:
     print("Error: No se pudieron importar los módulos de 'modelo/'.")
     print(f"Detalle: {e}")
@@ -79,7 +80,8 @@ if __name__ == "__main__":
     print("--- INICIANDO PRUEBA RÁPIDA DE plot_modelo.py ---")
     
     print("[Paso 1] Entrenando modelo para obtener resultados...")
-    modelo = entrenar_nuevo_modelo()
+    snapshot = cargar_snapshot()
+    modelo = entrenar_nuevo_modelo(snapshot=snapshot)
     
     if modelo is None:
         print("El entrenamiento falló. No se pueden generar gráficos.")
@@ -90,7 +92,7 @@ if __name__ == "__main__":
         graficar_importancia_features(modelo)
         
         print("\n[Paso 3] Recalculando datos de prueba para Matriz de Confusión...")
-        X, y = crear_features_y_target()
+        X, y = crear_features_y_target(snapshot=snapshot)
         
         if X is not None and not X.empty:
             _, X_test, _, y_test = train_test_split(
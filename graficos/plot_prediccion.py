@@ -13,7 +13,7 @@ if parent_dir not in sys.path:
 # --- Fin de Configuración ---
 
 try:
-    from datos import gestor_aapl
+    from datos import snapshot as snapshot_datos
     from modelo.procesador_features import crear_features_y_target
     from modelo.gestor_modelo import entrenar_nuevo_modelo
 except ImportError as e:
@@ -21,17 +21,19 @@ except ImportError as e:
     print(f"Detalle: {e}")
     sys.exit(1)
 
-def graficar_predicciones_vs_realidad(modelo, X_test, y_test, y_pred):
+def graficar_predicciones_vs_realidad(modelo, X_test, y_test, y_pred, snapshot=None):
     """
     Grafica el precio real de AAPL y superpone los aciertos y 
     errores de las predicciones del modelo.
+    Si se pasa el 'snapshot' de la ejecución, se usan esos precios
+    en lugar de volver a cargarlos.
     """
     print("[Graficador] Creando gráfico de Predicción vs. Realidad...")
     
     # --- 1. Obtener el DataFrame de precios original ---
     # Necesitamos los precios crudos para graficarlos en el eje Y
     try:
-        df_aapl_raw = gestor_aapl.cargar_datos_modelo()
+        df_aapl_raw = snapshot_datos.precios_de(snapshot, "AAPL")
         if df_aapl_raw is None:
             raise Exception("No se cargaron datos de gestor_aapl")
             
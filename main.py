@@ -7,9 +7,9 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 # --- Imports de Módulos del Proyecto ---
 try:
-    from datos import gestor_aapl, gestor_smh
+    from datos.snapshot import cargar_snapshot, precios_de
     from graficos.plot_velas import graficar_velas_ventana
-    from modelo.gestor_modelo import entrenar_nuevo_modelo
+    from modelo.registro_modelos import obtener_o_entrenar
     from modelo.procesador_features import crear_features_y_target
     from graficos.plot_modelo import graficar_importancia_features, graficar_matriz_confusion
     from graficos.plot_prediccion import graficar_predicciones_vs_realidad
@@ -30,6 +30,7 @@ modelo_entrenado_5d = None # Lo haremos específico para 5 días
 X_test_cache = None
 y_test_cache = None
 y_pred_cache = None
+snapshot_cache = None # Datos con los que se entrenó el modelo de evaluación
 
 def limpiar_pantalla():
     os.system('cls' if os.name == 'nt' else 'clear')
@@ -50,7 +51,7 @@ def menu_graficos_velas():
     if opcion == '1':
         try:
             print("Cargando datos de AAPL...")
-            datos_aapl = gestor_aapl.cargar_datos_modelo()
+            datos_aapl = precios_de(snapshot_cache, "AAPL")
             graficar_velas_ventana(datos_aapl, "AAPL")
             print("Gráfico de AAPL cerrado.")
         except Exception as e:
@@ -59,7 +60,7 @@ def menu_graficos_velas():
     elif opcion == '2':
         try:
             print("Cargando datos de SMH...")
-            datos_smh = gestor_smh.cargar_datos_modelo()
+            datos_smh = precios_de(snapshot_cache, "SMH")
             graficar_velas_ventana(datos_smh, "SMH")
             print("Gráfico de SMH cerrado.")
         except Exception as e:
@@ -83,7 +84,7 @@ def menu_graficos_modelo():
     if X_test_cache is None:
         print("\nPreparando datos de prueba (X_test, y_test) para los gráficos (para 5 días)...")
         # ¡CAMBIO! Especificamos 5 días
-        X, y = crear_features_y_target(dias_a_predecir=5)
+        X, y = crear_features_y_target(dias_a_predecir=5, snapshot=snapshot_cache)
         if X is None or X.empty:
             print("Error al crear features.")
             pausar()
@@ -106,7 +107,7 @@ def menu_graficos_modelo():
         graficar_matriz_confusion(y_test_cache, y_pred_cache)
         pausar()
     elif opcion == '3':
-        graficar_predicciones_vs_realidad(modelo_entrenado_5d, X_test_cache, y_test_cache, y_pred_cache)
+        graficar_predicciones_vs_realidad(modelo_entrenado_5d, X_test_cache, y_test_cache, y_pred_cache, snapshot=snapshot_cache)
         pausar()
     elif opcion == '0':
         return
@@ -135,14 +136,21 @@ def menu_graficos_principal():
 # --- Funciones del Menú Principal (Actualizadas) ---
 
 def ejecutar_entrenamiento_menu():
-    global modelo_entrenado_5d, X_test_cache, y_test_cache, y_pred_cache
+    global modelo_entrenado_5d, X_test_cache, y_test_cache, y_pred_cache, snapshot_cache
     
     limpiar_pantalla()
     print("--- Entrenando Modelo de 5 Días (para Gráficos) ---")
     print("Esto es solo para evaluar el modelo de 5 días...")
     try:
-        # ¡CAMBIO! Entrenamos solo el de 5 días para esta opción
-        modelo_entrenado_5d = entrenar_nuevo_modelo(dias_a_predecir=5)
+        # Cargamos los datos una vez; los gráficos reutilizan este snapshot
+        snapshot_cache = cargar_snapshot()
+        
+        # ¡CAMBIO! Entrenamos solo el de 5 días para esta opción.
+        # El usuario pidió entrenar: se reentrena siempre (y se guarda en el registro).
+        X, y = crear_features_y_target(dias_a_predecir=5, snapshot=snapshot_cache)
+        modelo_entrenado_5d = None
+        if X is not None and not X.empty:
+            modelo_entrenado_5d, _ = obtener_o_entrenar(5, X, y, forzar=True)
         
         # Reseteamos el caché
         X_test_cache, y_test_cache, y_pred_cache = None, None, None
@@ -167,7 +175,7 @@ def ejecutar_prediccion_en_vivo_menu():
     
     limpiar_pantalla()
     print("--- Ejecutando Script de Predicción Completo ---")
-    print("Esto entrenará los 3 modelos (1d, 5d, 21d) y guardará un registro.")
+    print("Esto entrenará o reutilizará los 3 modelos (1d, 5d, 21d) y guardará un registro.")
     print("Puede tardar varios segundos...")
     pausar()
     
@@ -0,0 +1,152 @@
+import os
+import json
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+# Almacén de matrices de features direccionado por contenido.
+# La clave de cada matriz es la huella (hash) de las barras de entrada
+# más la huella de la configuración de features (lista + definiciones +
+# VERSION_FEATURES). Si los datos no cambiaron, la ingeniería de
+# features se salta por completo. Si solo se añadieron barras al final,
+# se reutiliza la matriz guardada y se calculan únicamente las filas nuevas.
+
+DIRECTORIO_ALMACEN_FEATURES = os.environ.get(
+    "MODELO_DIR_FEATURES",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache_features"),
+)
+MAX_MB_ALMACEN_FEATURES = 512  # Tamaño máximo en disco antes de expulsar (LRU)
+
+
+def huella_datos(df_precios: pd.DataFrame):
+    """Hash de las fechas y valores de un DataFrame de precios."""
+    h = hashlib.sha256()
+    h.update(np.ascontiguousarray(df_precios.index.as_unit('ns').asi8).tobytes())
+    h.update("|".join(map(str, df_precios.columns)).encode())
+    h.update(np.ascontiguousarray(df_precios.to_numpy(dtype=np.float64)).tobytes())
+    return h.hexdigest()
+
+def huella_config(features, definiciones, version):
+    """
+    Hash de la configuración de features. 'definiciones' es un dict
+    {nombre: DefinicionFeature}; se usa su repr y sus parámetros, así que
+    cambiar un lookback o una ventana invalida la caché.
+    """
+    h = hashlib.sha256()
+    h.update(str(version).encode())
+    h.update("|".join(features).encode())
+    for nombre in sorted(definiciones):
+        d = definiciones[nombre]
+        h.update(f"{d!r}{sorted(d.parametros.items())}{getattr(d.funcion, '__name__', '')}".encode())
+    return h.hexdigest()
+
+
+def _rutas(config, datos):
+    base = os.path.join(DIRECTORIO_ALMACEN_FEATURES, f"{config[:12]}_{datos[:16]}")
+    return f"{base}.parquet", f"{base}.json"
+
+def _entradas_de_config(config):
+    """Metadatos de todas las matrices guardadas con la misma configuración."""
+    if not os.path.isdir(DIRECTORIO_ALMACEN_FEATURES):
+        return []
+    entradas = []
+    for archivo in os.listdir(DIRECTORIO_ALMACEN_FEATURES):
+        if archivo.startswith(config[:12]) and archivo.endswith(".json"):
+            try:
+                with open(os.path.join(DIRECTORIO_ALMACEN_FEATURES, archivo), "r", encoding="utf-8") as f:
+                    meta = json.load(f)
+                if meta.get("config") == config:
+                    entradas.append(meta)
+            except Exception:
+                continue
+    return entradas
+
+def _leer(config, datos):
+    ruta, ruta_meta = _rutas(config, datos)
+    if not os.path.exists(ruta):
+        return None
+    try:
+        tabla = pd.read_parquet(ruta)
+        os.utime(ruta)  # Marca de uso para la expulsión LRU
+        return tabla
+    except Exception as e:
+        print(f"*** [almacen_features] Entrada ilegible, se recalcula: {e} ***")
+        return None
+
+def _guardar(config, datos, tabla, n_filas):
+    try:
+        os.makedirs(DIRECTORIO_ALMACEN_FEATURES, exist_ok=True)
+        ruta, ruta_meta = _rutas(config, datos)
+        ruta_tmp = f"{ruta}.{os.getpid()}.tmp"
+        tabla.to_parquet(ruta_tmp)
+        os.replace(ruta_tmp, ruta)
+        with open(ruta_meta, "w", encoding="utf-8") as f:
+            json.dump({"config": config, "datos": datos, "filas": n_filas}, f)
+        expulsar_lru()
+    except Exception as e:
+        print(f"*** [almacen_features] No se pudo guardar la matriz: {e} ***")
+
+def expulsar_lru(max_mb: float = None):
+    """Borra las matrices usadas hace más tiempo hasta quedar bajo el límite."""
+    max_bytes = (max_mb if max_mb is not None else MAX_MB_ALMACEN_FEATURES) * 1024 * 1024
+    if not os.path.isdir(DIRECTORIO_ALMACEN_FEATURES):
+        return 0
+    archivos = [
+        os.path.join(DIRECTORIO_ALMACEN_FEATURES, a)
+        for a in os.listdir(DIRECTORIO_ALMACEN_FEATURES) if a.endswith(".parquet")
+    ]
+    archivos.sort(key=os.path.getmtime)  # Los menos usados primero
+    total = sum(os.path.getsize(a) for a in archivos)
+    borrados = 0
+    while archivos and total > max_bytes:
+        ruta = archivos.pop(0)
+        total -= os.path.getsize(ruta)
+        for r in (ruta, ruta[:-len(".parquet")] + ".json"):
+            if os.path.exists(r):
+                os.remove(r)
+        borrados += 1
+    return borrados
+
+
+def obtener_features(df_precios: pd.DataFrame, features, calcular, definiciones, version, calentamiento):
+    """
+    Devuelve la matriz de features de 'df_precios' (alineada con sus filas,
+    con NaN en el calentamiento), usando el almacén cuando es posible.
+
+    Args:
+        calcular: función (df_precios, features) -> DataFrame.
+        definiciones: {nombre: DefinicionFeature} de los nodos involucrados.
+        version: VERSION_FEATURES de 'procesador_features'.
+        calentamiento: barras previas que necesita la primera fila completa.
+    """
+    config = huella_config(features, definiciones, version)
+    datos = huella_datos(df_precios)
+
+    # 1) Acierto exacto: mismos datos y misma configuración
+    tabla = _leer(config, datos)
+    if tabla is not None and len(tabla) == len(df_precios):
+        print("[almacen_features] Features leídas del almacén (sin recalcular).")
+        return tabla
+
+    # 2) Acierto parcial: una matriz guardada cubre un prefijo de los datos actuales
+    for meta in sorted(_entradas_de_config(config), key=lambda m: -m["filas"]):
+        n = meta["filas"]
+        if n > len(df_precios) or n <= calentamiento:
+            continue
+        if huella_datos(df_precios.iloc[:n]) != meta["datos"]:
+            continue
+        previa = _leer(config, meta["datos"])
+        if previa is None:
+            continue
+        # Solo recalculamos las filas nuevas (más su calentamiento)
+        cola = calcular(df_precios.iloc[n - calentamiento:], features).iloc[calentamiento:]
+        tabla = pd.concat([previa, cola])
+        print(f"[almacen_features] Reutilizadas {n} filas; calculadas {len(cola)} nuevas.")
+        _guardar(config, datos, tabla, len(df_precios))
+        return tabla
+
+    # 3) Sin acierto: cálculo completo
+    tabla = calcular(df_precios, features)
+    _guardar(config, datos, tabla, len(df_precios))
+    return tabla
@@ -0,0 +1,201 @@
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+from sklearn.metrics import accuracy_score, precision_score, recall_score
+
+# --- Configuración de Ruta (Path) ---
+script_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.abspath(os.path.join(script_dir, os.pardir))
+if parent_dir not in sys.path:
+    sys.path.append(parent_dir)
+# --- Fin de Configuración ---
+
+from modelo.gestor_modelo import HIPERPARAMETROS_MODELO, parametros_nativos
+from modelo.procesador_features import crear_features_multihorizonte
+from modelo.planificador_entrenamiento import _publicar_matriz, _leer_etiquetas, _matriz_del_bloque, _repartir_nucleos
+
+# Backtest walk-forward (ventana creciente).
+# Para cada pliegue se entrena con todo lo anterior y se predice el bloque
+# siguiente de 'paso' filas. Entre el fin del entrenamiento y el inicio de
+# la prueba se dejan 'horizonte' filas fuera: el target de esas filas mira
+# precios que todavía no se conocían al predecir (fuga de información).
+#
+# Con warm_start=True cada pliegue NO entrena desde cero: continúa el
+# booster del pliegue anterior agregando ARBOLES_POR_PLIEGUE
+# árboles sobre la ventana ampliada. Así cientos de pliegues cuestan poco
+# más que un entrenamiento. Los pliegues de un horizonte forman una cadena
+# (secuencial), pero cada horizonte corre en su propio proceso. Sin
+# warm_start los pliegues son independientes y van todos al pool.
+
+MIN_FILAS_ENTRENAMIENTO = 500  # Filas del primer pliegue
+PASO_PLIEGUE = 21               # Filas de prueba por pliegue (~1 mes)
+ARBOLES_POR_PLIEGUE = 10        # Árboles que agrega cada pliegue con warm_start
+HORIZONTES_BACKTEST = [1, 5, 21]
+
+
+def generar_pliegues(n_filas: int, horizonte: int, min_entrenamiento: int = MIN_FILAS_ENTRENAMIENTO,
+                     paso: int = PASO_PLIEGUE):
+    """
+    Lista de pliegues (fin_entrenamiento, inicio_prueba, fin_prueba), en
+    posiciones de fila. Se entrena con [0, fin_entrenamiento) y se prueba
+    con [inicio_prueba, fin_prueba).
+    """
+    pliegues = []
+    for inicio_prueba in range(min_entrenamiento + horizonte, n_filas, paso):
+        pliegues.append((inicio_prueba - horizonte, inicio_prueba, min(inicio_prueba + paso, n_filas)))
+    return pliegues
+
+def _cadena_pliegues(descriptor, horizonte, pliegues, hiperparametros, arboles_por_pliegue, warm_start, hilos,
+                     fin_cortes):
+    """
+    Recorre 'pliegues' en orden. Con warm_start el booster de cada
+    pliegue parte del anterior. Devuelve (posiciones, probabilidades,
+    número de pliegue) de todas las filas de prueba.
+
+    La continuación se hace con 'base_margin' en vez de xgb_model=booster:
+    es lo mismo (los árboles nuevos se ajustan al gradiente del margen del
+    ensamble), pero xgb_model vuelve a evaluar TODO el ensamble, cada vez
+    más grande, sobre cada DMatrix nueva. Acá el margen acumulado de cada
+    fila se guarda y cada pliegue solo suma el de sus árboles nuevos.
+    """
+    etiquetas = _leer_etiquetas(descriptor, horizonte)
+    # Cortes de cuantiles del primer bloque de entrenamiento (el mismo para
+    # todos los horizontes): ningún pliegue ve valores de features futuros.
+    # Cada vista de pliegue se usa una vez y no se guarda.
+    matriz = _matriz_del_bloque(descriptor, fin_cortes=fin_cortes)
+    parametros, arboles_iniciales = parametros_nativos(hiperparametros, hilos)
+    sin_base = np.zeros(len(matriz), dtype=np.float32)
+
+    margen = None  # Margen (logit) del ensamble para todas las filas
+    posiciones, probabilidades, numeros = [], [], []
+    for numero, (fin_entrenamiento, inicio_prueba, fin_prueba) in pliegues:
+        if warm_start and margen is not None:
+            dtrain = matriz.vista(fin_entrenamiento, etiquetas=etiquetas[:fin_entrenamiento],
+                                  base_margin=margen[:fin_entrenamiento], guardar=False)
+            etapa = xgb.train(parametros, dtrain, num_boost_round=arboles_por_pliegue)
+            margen = margen + etapa.inplace_predict(matriz.datos, predict_type="margin", base_margin=sin_base)
+        else:
+            dtrain = matriz.vista(fin_entrenamiento, etiquetas=etiquetas[:fin_entrenamiento], guardar=False)
+            booster = xgb.train(parametros, dtrain, num_boost_round=arboles_iniciales)
+            margen = booster.inplace_predict(matriz.datos, predict_type="margin")
+        prob = 1.0 / (1.0 + np.exp(-margen[inicio_prueba:fin_prueba]))
+        posiciones.append(np.arange(inicio_prueba, fin_prueba))
+        probabilidades.append(prob)
+        numeros.append(np.full(len(prob), numero))
+    return horizonte, np.concatenate(posiciones), np.concatenate(probabilidades), np.concatenate(numeros)
+
+def _metricas(real, prediccion):
+    return {
+        "accuracy": float(accuracy_score(real, prediccion)),
+        "precision": float(precision_score(real, prediccion, zero_division=0)),
+        "recall": float(recall_score(real, prediccion, zero_division=0)),
+    }
+
+def ejecutar_backtest(horizontes=None, snapshot=None, X=None, targets=None,
+                      min_entrenamiento: int = MIN_FILAS_ENTRENAMIENTO, paso: int = PASO_PLIEGUE,
+                      hiperparametros=None, arboles_por_pliegue: int = ARBOLES_POR_PLIEGUE,
+                      warm_start: bool = True, procesos: int = None, nucleos: int = None):
+    """
+    Backtest walk-forward de todos los horizontes.
+
+    Args:
+        horizontes (list): Días a predecir (por defecto HORIZONTES_BACKTEST).
+        snapshot (dict): Snapshot de datos de la ejecución (opcional).
+        X, targets: Salida de crear_features_multihorizonte (si ya se tiene).
+        min_entrenamiento, paso: Tamaño del primer pliegue y de cada bloque de prueba.
+        hiperparametros (dict): Reemplazan a HIPERPARAMETROS_MODELO.
+        arboles_por_pliegue: Árboles nuevos por pliegue con warm_start.
+        warm_start: Continuar el booster del pliegue anterior.
+        procesos, nucleos: Ver planificador_entrenamiento.
+
+    Returns:
+        (resumen, predicciones):
+        - resumen: DataFrame indexado por horizonte con accuracy,
+          precision y recall agregados (todas las filas de prueba), la
+          media y el desvío de accuracy por pliegue, y los segundos.
+        - predicciones: DataFrame (fecha, horizonte, pliegue, probabilidad,
+          prediccion, real).
+        (None, None) si no hay datos.
+    """
+    horizontes = list(horizontes or HORIZONTES_BACKTEST)
+    hiperparametros = {**HIPERPARAMETROS_MODELO, **(hiperparametros or {})}
+    if X is None or targets is None:
+        X, targets = crear_features_multihorizonte(horizontes, snapshot=snapshot)
+    if X is None or X.empty:
+        print("[Backtest] Falló la obtención de datos. Abortando.")
+        return None, None
+
+    inicio = time.perf_counter()
+    shm, descriptor = _publicar_matriz(X, {h: targets[h] for h in horizontes})
+    try:
+        # --- 1. Tareas: una cadena por horizonte, o un pliegue por tarea ---
+        tareas = []
+        for h in horizontes:
+            pliegues = list(enumerate(generar_pliegues(int(targets[h][1].sum()), h, min_entrenamiento, paso)))
+            if not pliegues:
+                print(f"*** [Backtest] No hay filas suficientes para el horizonte {h}d. ***")
+            elif warm_start:
+                tareas.append((h, pliegues))
+            else:
+                tareas.extend((h, [p]) for p in pliegues)
+        total_pliegues = sum(len(p) for _, p in tareas)
+        procesos, hilos = _repartir_nucleos(len(tareas) or 1, procesos, nucleos)
+        print(f"[Backtest] {total_pliegues} pliegues ({'warm start' if warm_start else 'desde cero'}) "
+              f"en {procesos} procesos x {hilos} hilos...")
+
+        # --- 2. Entrenar y predecir ---
+        argumentos = [(descriptor, h, p, hiperparametros, arboles_por_pliegue, warm_start, hilos, min_entrenamiento)
+                      for h, p in tareas]
+        if procesos == 1:
+            salidas = [_cadena_pliegues(*a) for a in argumentos]
+        else:
+            with ProcessPoolExecutor(max_workers=procesos) as pool:
+                salidas = list(pool.map(_cadena_pliegues, *zip(*argumentos)))
+    finally:
+        shm.close()
+        shm.unlink()
+
+    # --- 3. Agregar por horizonte ---
+    partes = []
+    for h, posiciones, probabilidades, numeros in salidas:
+        y = targets[h][0][targets[h][1]]
+        partes.append(pd.DataFrame({
+            "horizonte": h,
+            "pliegue": numeros,
+            "probabilidad": probabilidades,
+            "prediccion": (probabilidades > 0.5).astype(int),
+            "real": y.to_numpy()[posiciones],
+        }, index=y.index[posiciones]))
+    if not partes:
+        return None, None
+    predicciones = pd.concat(partes).rename_axis("fecha").sort_values(["horizonte", "fecha"])
+
+    segundos = time.perf_counter() - inicio
+    filas = []
+    for h, grupo in predicciones.groupby("horizonte"):
+        por_pliegue = (grupo["real"] == grupo["prediccion"]).groupby(grupo["pliegue"]).mean()
+        filas.append({
+            "horizonte": h,
+            **_metricas(grupo["real"], grupo["prediccion"]),
+            "accuracy_media_pliegue": float(por_pliegue.mean()),
+            "accuracy_std_pliegue": float(por_pliegue.std(ddof=0)),
+            "pliegues": int(grupo["pliegue"].nunique()),
+            "filas_prueba": int(len(grupo)),
+        })
+    resumen = pd.DataFrame(filas).set_index("horizonte")
+    resumen["segundos"] = round(segundos, 3)
+
+    print(f"\n--- Backtest walk-forward ({segundos:.2f}s) ---")
+    print(resumen.round(4).to_string())
+    return resumen, predicciones
+
+
+if __name__ == "__main__":
+    from datos.snapshot import cargar_snapshot
+    snapshot = cargar_snapshot()
+    ejecutar_backtest(snapshot=snapshot)
@@ -0,0 +1,238 @@
+import os
+import sys
+import time
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+from sklearn.metrics import log_loss
+
+# --- Configuración de Ruta (Path) ---
+script_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.abspath(os.path.join(script_dir, os.pardir))
+if parent_dir not in sys.path:
+    sys.path.append(parent_dir)
+# --- Fin de Configuración ---
+
+from modelo.procesador_features import crear_features_multihorizonte, TARGET_PREDICCION, FACTOR_PREDICTOR
+from modelo.planificador_entrenamiento import _publicar_matriz, _leer_etiquetas, _matriz_del_bloque, _repartir_nucleos
+from modelo.gestor_modelo import parametros_nativos
+from modelo import registro_modelos
+
+# Búsqueda de hiperparámetros con "successive halving":
+# 1. Se sortean N configuraciones del espacio de búsqueda.
+# 2. Todas se evalúan con pocos árboles (MIN_ARBOLES_BUSQUEDA).
+# 3. Solo el mejor 1/ETA pasa a la ronda siguiente, con ETA veces más
+#    árboles. Así hasta que queda una o se llega a MAX_ARBOLES_BUSQUEDA.
+# Cada evaluación usa pliegues de validación temporales (el bloque de
+# validación siempre es posterior al de entrenamiento, con un hueco de
+# 'horizonte' filas). El early stopping NO mira ese bloque: usa la cola
+# del bloque de entrenamiento (FRACCION_PARADA, con su propio hueco), y
+# el bloque de validación solo puntúa el booster ya cortado. Si no, el
+# número de árboles se ajustaría sobre los mismos datos que ordenan las
+# configuraciones. El costo total queda acotado de antemano: ver
+# presupuesto_arboles().
+# El resultado se guarda en los metadatos del registro de modelos
+# ('mejores_hiperparametros'); el próximo obtener_o_entrenar lo usa.
+
+ESPACIO_BUSQUEDA = {
+    "max_depth": [2, 3, 4, 5, 6, 8],
+    "learning_rate": [0.02, 0.05, 0.1, 0.2],
+    "min_child_weight": [1, 3, 5, 10],
+    "subsample": [0.6, 0.8, 1.0],
+    "colsample_bytree": [0.6, 0.8, 1.0],
+    "reg_lambda": [0.5, 1.0, 5.0],
+}
+CONFIGURACIONES_BUSQUEDA = 27
+ETA_HALVING = 3
+MIN_ARBOLES_BUSQUEDA = 30
+MAX_ARBOLES_BUSQUEDA = 810
+ESPERA_EARLY_STOPPING = 20     # Rondas sin mejora antes de cortar
+PLIEGUES_VALIDACION = 3
+FRACCION_VALIDACION = 0.1      # Tamaño de cada bloque de validación (fracción de las filas)
+FRACCION_PARADA = 0.1          # Cola del bloque de entrenamiento que decide el early stopping
+
+
+def muestrear_configuraciones(n: int, semilla: int = 42, espacio=None):
+    """Hasta 'n' configuraciones distintas sorteadas del espacio de búsqueda."""
+    espacio = espacio or ESPACIO_BUSQUEDA
+    rng = np.random.default_rng(semilla)
+    configuraciones, vistas = [], set()
+    for _ in range(n * 20):
+        configuracion = {k: v[rng.integers(len(v))] for k, v in espacio.items()}
+        # Tipos nativos: la configuración termina en un JSON
+        configuracion = {k: (int(v) if isinstance(v, (int, np.integer)) else float(v)) for k, v in configuracion.items()}
+        clave = tuple(sorted(configuracion.items()))
+        if clave not in vistas:
+            vistas.add(clave)
+            configuraciones.append(configuracion)
+        if len(configuraciones) == n:
+            break
+    return configuraciones
+
+def pliegues_validacion(n_filas: int, horizonte: int, pliegues: int = PLIEGUES_VALIDACION,
+                        fraccion: float = FRACCION_VALIDACION):
+    """
+    Los últimos 'pliegues' bloques de validación, cada uno de 'fraccion'
+    de las filas: [(fin_entrenamiento, inicio_val, fin_val), ...].
+    """
+    tamano = max(1, int(n_filas * fraccion))
+    resultado = []
+    for k in range(pliegues, 0, -1):
+        inicio_val = n_filas - k * tamano
+        if inicio_val - horizonte <= 0:
+            continue
+        resultado.append((inicio_val - horizonte, inicio_val, inicio_val + tamano))
+    return resultado
+
+def division_parada(fin_entrenamiento: int, horizonte: int, fraccion: float = FRACCION_PARADA):
+    """
+    Divide [0, fin_entrenamiento) en ajuste y parada (early stopping):
+    (fin_ajuste, inicio_parada). Entre ambos quedan 'horizonte' filas, cuyo
+    target ya mira dentro del bloque de parada.
+    """
+    inicio_parada = fin_entrenamiento - max(1, int(fin_entrenamiento * fraccion))
+    return inicio_parada - horizonte, inicio_parada
+
+def presupuesto_arboles(configuraciones: int, eta: int = ETA_HALVING, min_arboles: int = MIN_ARBOLES_BUSQUEDA,
+                        max_arboles: int = MAX_ARBOLES_BUSQUEDA, pliegues: int = PLIEGUES_VALIDACION):
+    """Máximo de árboles que entrenará la búsqueda (sin contar el early stopping)."""
+    total, vivas, arboles = 0, configuraciones, min_arboles
+    while True:
+        total += vivas * arboles * pliegues
+        if vivas == 1 or arboles >= max_arboles:
+            return total
+        vivas, arboles = max(1, vivas // eta), min(arboles * eta, max_arboles)
+
+def _evaluar_configuracion(descriptor, horizonte, configuracion, arboles, pliegues, hilos):
+    """
+    Entrena 'configuracion' con hasta 'arboles' árboles en cada pliegue
+    (early stopping sobre la cola del entrenamiento, ver division_parada).
+    Devuelve (logloss medio de validación, mejor iteración media, árboles entrenados).
+    """
+    etiquetas = _leer_etiquetas(descriptor, horizonte)
+    divisiones = [division_parada(fin_entrenamiento, horizonte) for fin_entrenamiento, _, _ in pliegues]
+    # Los mismos pliegues para todas las configuraciones y rondas: cada
+    # proceso cuantiza sus vistas una vez y las reutiliza. Los cortes salen
+    # del bloque de ajuste más corto (sin valores de parada ni de validación)
+    matriz = _matriz_del_bloque(descriptor, fin_cortes=min(fin_ajuste for fin_ajuste, _ in divisiones))
+    parametros, _ = parametros_nativos({**configuracion, "n_estimators": arboles}, hilos)
+
+    puntajes, iteraciones, entrenados = [], [], 0
+    for (fin_entrenamiento, inicio_val, fin_val), (fin_ajuste, inicio_parada) in zip(pliegues, divisiones):
+        dtrain = matriz.vista(fin_ajuste, etiquetas=etiquetas[:fin_ajuste])
+        dparada = matriz.vista_evaluacion(fin_entrenamiento, inicio_parada, fin_ajuste,
+                                          etiquetas=etiquetas[inicio_parada:fin_entrenamiento])
+        booster = xgb.train(
+            parametros, dtrain, num_boost_round=arboles, evals=[(dparada, "parada")],
+            early_stopping_rounds=ESPERA_EARLY_STOPPING, verbose_eval=False,
+        )
+        prob = booster.inplace_predict(matriz.datos[inicio_val:fin_val],
+                                       iteration_range=(0, booster.best_iteration + 1))
+        puntajes.append(log_loss(etiquetas[inicio_val:fin_val], prob, labels=[0, 1]))
+        iteraciones.append(booster.best_iteration)
+        entrenados += booster.num_boosted_rounds()
+    return float(np.mean(puntajes)), float(np.mean(iteraciones)), entrenados
+
+def buscar_hiperparametros(dias_a_predecir, X, y, ticker=TARGET_PREDICCION,
+                           configuraciones: int = CONFIGURACIONES_BUSQUEDA, eta: int = ETA_HALVING,
+                           min_arboles: int = MIN_ARBOLES_BUSQUEDA, max_arboles: int = MAX_ARBOLES_BUSQUEDA,
+                           semilla: int = 42, procesos: int = None, nucleos: int = None, guardar: bool = True):
+    """
+    Busca los mejores hiperparámetros para (ticker, horizonte).
+
+    Args:
+        X, y: Filas de entrenamiento (con target válido).
+        configuraciones, eta, min_arboles, max_arboles: Parámetros del halving.
+        procesos, nucleos: Ver planificador_entrenamiento.
+        guardar: Escribir el resultado en los metadatos del registro.
+
+    Returns:
+        dict {'mejores_hiperparametros', 'busqueda'} o None si no hay datos.
+    """
+    pliegues = pliegues_validacion(len(X), dias_a_predecir) if X is not None else []
+    if not pliegues:
+        print("[Búsqueda] No hay datos suficientes para validar. Abortando.")
+        return None
+
+    inicio = time.perf_counter()
+    candidatas = muestrear_configuraciones(configuraciones, semilla)
+    procesos, hilos = _repartir_nucleos(len(candidatas), procesos, nucleos)
+    print(f"[Búsqueda] {ticker} {dias_a_predecir}d: {len(candidatas)} configuraciones, "
+          f"presupuesto <= {presupuesto_arboles(len(candidatas), eta, min_arboles, max_arboles, len(pliegues))} "
+          f"árboles, {procesos} procesos x {hilos} hilos...")
+
+    shm, descriptor = _publicar_matriz(X, {dias_a_predecir: (y, pd.Series(True, index=X.index))})
+    pool = ProcessPoolExecutor(max_workers=procesos) if procesos > 1 else None
+    rondas, arboles_entrenados = [], 0
+    try:
+        arboles = min_arboles
+        while True:
+            argumentos = [(descriptor, dias_a_predecir, c, arboles, pliegues, hilos) for c in candidatas]
+            if pool is None:
+                salidas = [_evaluar_configuracion(*a) for a in argumentos]
+            else:
+                salidas = list(pool.map(_evaluar_configuracion, *zip(*argumentos)))
+            arboles_entrenados += sum(s[2] for s in salidas)
+
+            orden = sorted(range(len(candidatas)), key=lambda i: salidas[i][0])
+            candidatas = [candidatas[i] for i in orden]
+            salidas = [salidas[i] for i in orden]
+            rondas.append({"arboles": arboles, "configuraciones": len(candidatas),
+                           "mejor_logloss": round(salidas[0][0], 6)})
+            print(f"[Búsqueda] Ronda {len(rondas)}: {len(candidatas)} configuraciones x {arboles} árboles, "
+                  f"mejor logloss {salidas[0][0]:.5f}")
+
+            if len(candidatas) == 1 or arboles >= max_arboles:
+                break
+            sobreviven = max(1, len(candidatas) // eta)
+            candidatas, arboles = candidatas[:sobreviven], min(arboles * eta, max_arboles)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        shm.close()
+        shm.unlink()
+
+    logloss, mejor_iteracion, _ = salidas[0]
+    mejores = {**candidatas[0], "n_estimators": int(round(mejor_iteracion)) + 1}
+    busqueda = {
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "logloss_validacion": round(logloss, 6),
+        "configuraciones": configuraciones,
+        "eta": eta,
+        "pliegues": len(pliegues),
+        "rondas": rondas,
+        "arboles_entrenados": int(arboles_entrenados),
+        "segundos": round(time.perf_counter() - inicio, 3),
+    }
+    print(f"[Búsqueda] Mejor configuración: {mejores} (logloss {logloss:.5f}, {busqueda['segundos']}s)")
+
+    if guardar:
+        registro_modelos.actualizar_metadatos(
+            ticker, dias_a_predecir, mejores_hiperparametros=mejores, busqueda=busqueda,
+        )
+    return {"mejores_hiperparametros": mejores, "busqueda": busqueda}
+
+def buscar_universo(tickers, horizontes, snapshot=None, factor=FACTOR_PREDICTOR, **kwargs):
+    """
+    Búsqueda para cada (ticker, horizonte). Cada búsqueda ya usa todo el
+    pool, así que se recorren en orden. Devuelve {(ticker, h): resultado}.
+    """
+    resultados = {}
+    for ticker in tickers:
+        X, targets = crear_features_multihorizonte(horizontes, snapshot=snapshot, target=ticker, factor=factor)
+        if X is None or X.empty:
+            print(f"*** [Búsqueda] Sin features para {ticker}. Se omite. ***")
+            continue
+        for h in horizontes:
+            y, mascara = targets[h]
+            resultados[(ticker, h)] = buscar_hiperparametros(h, X[mascara], y[mascara], ticker=ticker, **kwargs)
+    return resultados
+
+
+if __name__ == "__main__":
+    from datos.snapshot import cargar_snapshot
+    snapshot = cargar_snapshot()
+    buscar_universo([TARGET_PREDICCION], [1, 5, 21], snapshot=snapshot)
@@ -0,0 +1,187 @@
+import math
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+# Motor de features incremental.
+# 'crear_features_y_target' recalcula 10 años de historia para obtener
+# UNA fila nueva. Este motor guarda el estado de las ventanas móviles
+# (buffers circulares y sumas acumuladas) y calcula la fila de una barra
+# nueva en O(1), sin importar cuánta historia haya detrás.
+# Produce exactamente las mismas columnas (y valores) que el cálculo por lotes.
+
+try:
+    from modelo.procesador_features import (
+        PERIODO_CORRELACION, TARGET_PREDICCION, FACTOR_PREDICTOR, _cargar_precios
+    )
+except ImportError:
+    from procesador_features import (
+        PERIODO_CORRELACION, TARGET_PREDICCION, FACTOR_PREDICTOR, _cargar_precios
+    )
+
+LAGS_RETORNO = (1, 3, 5, 10)
+VENTANA_SMA = 20
+RESINCRONIZAR_CADA = 10_000  # Recalcula las sumas desde el buffer para evitar deriva numérica
+
+
+class MotorFeaturesIncremental:
+    """
+    Mantiene el estado de las features de AAPL/SMH y lo actualiza barra a barra.
+
+    Uso:
+        motor = MotorFeaturesIncremental.desde_snapshot(snapshot)
+        fila = motor.actualizar(precio_aapl, precio_smh, fecha)
+    """
+
+    def __init__(self, lags=LAGS_RETORNO, periodo_correlacion=PERIODO_CORRELACION,
+                 ventana_sma=VENTANA_SMA):
+        self.lags = tuple(lags)
+        self.periodo_correlacion = periodo_correlacion
+        self.ventana_sma = ventana_sma
+
+        # Precios recientes (para los retornos con lag)
+        self._precios_target = deque(maxlen=max(self.lags) + 1)
+        self._precios_factor = deque(maxlen=max(self.lags) + 1)
+
+        # Media móvil: buffer + suma acumulada
+        self._sma_buffer = deque(maxlen=ventana_sma)
+        self._sma_suma = 0.0
+
+        # Correlación: buffer de pares de retornos + co-momentos acumulados
+        self._corr_buffer = deque(maxlen=periodo_correlacion)
+        self._sx = self._sy = self._sxx = self._syy = self._sxy = 0.0
+
+        self._actualizaciones = 0
+        self.ultima_fecha = None
+        self.ultima_fila = None
+        self.columnas = (
+            [c for lag in self.lags for c in (f'AAPL_retorno_{lag}d', f'SMH_retorno_{lag}d')]
+            + [f'Correl_AAPL_SMH_{self.periodo_correlacion}d', 'AAPL_vs_SMA20']
+        )
+
+    @property
+    def historial_necesario(self):
+        """Barras necesarias antes de que la primera fila esté completa."""
+        return max(max(self.lags) + 1, self.periodo_correlacion + 1, self.ventana_sma)
+
+    # --- Actualizaciones de estado ---
+
+    def _actualizar_sma(self, precio):
+        if len(self._sma_buffer) == self._sma_buffer.maxlen:
+            self._sma_suma -= self._sma_buffer[0]
+        self._sma_buffer.append(precio)
+        self._sma_suma += precio
+
+    def _actualizar_correlacion(self, x, y):
+        if len(self._corr_buffer) == self._corr_buffer.maxlen:
+            x0, y0 = self._corr_buffer[0]
+            self._sx -= x0
+            self._sy -= y0
+            self._sxx -= x0 * x0
+            self._syy -= y0 * y0
+            self._sxy -= x0 * y0
+        self._corr_buffer.append((x, y))
+        self._sx += x
+        self._sy += y
+        self._sxx += x * x
+        self._syy += y * y
+        self._sxy += x * y
+
+    def _resincronizar(self):
+        """Recalcula las sumas desde los buffers (O(ventana), muy de vez en cuando)."""
+        self._sma_suma = math.fsum(self._sma_buffer)
+        xs = [p[0] for p in self._corr_buffer]
+        ys = [p[1] for p in self._corr_buffer]
+        self._sx, self._sy = math.fsum(xs), math.fsum(ys)
+        self._sxx = math.fsum(x * x for x in xs)
+        self._syy = math.fsum(y * y for y in ys)
+        self._sxy = math.fsum(x * y for x, y in zip(xs, ys))
+
+    def _correlacion(self):
+        n = len(self._corr_buffer)
+        if n < self.periodo_correlacion:
+            return math.nan
+        cov = self._sxy - self._sx * self._sy / n
+        var_x = self._sxx - self._sx * self._sx / n
+        var_y = self._syy - self._sy * self._sy / n
+        if var_x <= 0 or var_y <= 0:
+            return math.nan
+        return cov / math.sqrt(var_x * var_y)
+
+    def actualizar(self, precio_target: float, precio_factor: float, fecha=None):
+        """
+        Incorpora una barra nueva y devuelve su fila de features como
+        diccionario {columna: valor}, o None si aún falta historia.
+        """
+        precio_target = float(precio_target)
+        precio_factor = float(precio_factor)
+
+        if self._precios_target:
+            self._actualizar_correlacion(
+                precio_target / self._precios_target[-1] - 1,
+                precio_factor / self._precios_factor[-1] - 1,
+            )
+        self._precios_target.append(precio_target)
+        self._precios_factor.append(precio_factor)
+        self._actualizar_sma(precio_target)
+
+        self._actualizaciones += 1
+        if self._actualizaciones % RESINCRONIZAR_CADA == 0:
+            self._resincronizar()
+        self.ultima_fecha = fecha
+
+        if len(self._precios_target) < self._precios_target.maxlen or len(self._sma_buffer) < self.ventana_sma:
+            self.ultima_fila = None
+            return None
+        correlacion = self._correlacion()
+        if math.isnan(correlacion):
+            self.ultima_fila = None
+            return None
+
+        fila = {}
+        for lag in self.lags:
+            fila[f'AAPL_retorno_{lag}d'] = precio_target / self._precios_target[-1 - lag] - 1
+            fila[f'SMH_retorno_{lag}d'] = precio_factor / self._precios_factor[-1 - lag] - 1
+        fila[f'Correl_AAPL_SMH_{self.periodo_correlacion}d'] = correlacion
+        sma = self._sma_suma / self.ventana_sma
+        fila['AAPL_vs_SMA20'] = (precio_target - sma) / sma
+
+        self.ultima_fila = fila
+        return fila
+
+    # --- Salidas para el modelo ---
+
+    def fila_actual(self):
+        """Última fila como DataFrame de 1 fila (formato que espera el modelo)."""
+        if self.ultima_fila is None:
+            return None
+        indice = pd.DatetimeIndex([self.ultima_fecha]) if self.ultima_fecha is not None else None
+        return pd.DataFrame([self.ultima_fila], columns=self.columnas, index=indice)
+
+    def vector_actual(self):
+        """Última fila como arreglo float64 en el orden de 'columnas'."""
+        if self.ultima_fila is None:
+            return None
+        return np.array([self.ultima_fila[c] for c in self.columnas])
+
+    # --- Construcción ---
+
+    def cargar_historial(self, df_precios: pd.DataFrame):
+        """
+        Alimenta el motor con un DataFrame de precios (columnas AAPL y SMH).
+        Solo se usan las últimas 'historial_necesario' filas: el resto no
+        afecta al estado de las ventanas.
+        """
+        recientes = df_precios.tail(self.historial_necesario)
+        for fecha, a, s in zip(recientes.index, recientes[TARGET_PREDICCION], recientes[FACTOR_PREDICTOR]):
+            self.actualizar(a, s, fecha)
+        return self
+
+    @classmethod
+    def desde_snapshot(cls, snapshot=None, **kwargs):
+        """Crea un motor caliente a partir del snapshot (o de los gestores)."""
+        df = _cargar_precios(snapshot)
+        if df is None:
+            return None
+        return cls(**kwargs).cargar_historial(df)
@@ -1,20 +1,34 @@
 import sys
 import os
+import math
 import pandas as pd
 import numpy as np
 import xgboost as xgb # El modelo
-from sklearn.model_selection import train_test_split # Para dividir los datos
-from sklearn.metrics import accuracy_score, classification_report # Para medir
+from sklearn.metrics import accuracy_score, precision_score, recall_score, classification_report # Para medir
 
 
 # Importamos nuestro propio procesador
 try:
     from modelo.procesador_features import crear_features_y_target
+    from modelo.matriz_cuantizada import clasificador_desde_booster
+    from modelo.instrumentacion import etapa
 except ImportError:
     print("Error: No se pudo importar 'procesador_features.py'.")
     sys.exit(1)
 
-def entrenar_nuevo_modelo(dias_a_predecir=5):
+# --- Hiperparámetros del Modelo ---
+HIPERPARAMETROS_MODELO = {
+    "n_estimators": 100,
+    "learning_rate": 0.1,
+    "max_depth": 5,
+}
+FRACCION_PRUEBA = 0.2  # El 20% más reciente de cada horizonte se usa para evaluar
+
+def filas_entrenamiento(filas: int):
+    """Filas de entrenamiento que deja la división de entrenar_y_evaluar (como train_test_split)."""
+    return filas - math.ceil(filas * FRACCION_PRUEBA)
+
+def entrenar_nuevo_modelo(dias_a_predecir=5, snapshot=None, X=None, y=None):
     """
     Función principal de este módulo.
     1. Carga y procesa los features (usando procesador_features).
@@ -25,12 +39,16 @@ def entrenar_nuevo_modelo(dias_a_predecir=5):
     
     Args:
         dias_a_predecir (int): El horizonte (1, 5, 21) para el que se entrenará.
+        snapshot (dict): Snapshot de datos de la ejecución (opcional).
+        X, y: Features y target ya calculados (ej. con
+            crear_features_multihorizonte). Si se pasan, no se recalculan.
     """
     print(f"[Gestor Modelo] Iniciando entrenamiento para {dias_a_predecir} días...")
 
     # --- 1. Obtener Datos ---
     # ¡CAMBIO CLAVE! Pasamos el parámetro a la función de creación
-    X, y = crear_features_y_target(dias_a_predecir=dias_a_predecir)
+    if X is None or y is None:
+        X, y = crear_features_y_target(dias_a_predecir=dias_a_predecir, snapshot=snapshot)
     
     if X is None or y is None:
         print("[Gestor Modelo] Falló la obtención de datos. Abortando.")
@@ -40,46 +58,96 @@ def entrenar_nuevo_modelo(dias_a_predecir=5):
         print(f"[Gestor Modelo] No hay datos suficientes para entrenar (Filas: {len(X)}).")
         return None
 
+    modelo, _ = entrenar_y_evaluar(X, y, dias_a_predecir)
+    
+    # --- 5. Devolver el modelo ---
+    return modelo
+
+def parametros_nativos(hiperparametros: dict, n_jobs=None):
+    """
+    Traduce los hiperparámetros del XGBClassifier a la API nativa
+    (xgb.train). Devuelve (parametros, número de árboles).
+    """
+    parametros = {k: v for k, v in hiperparametros.items() if k != "n_estimators"}
+    parametros.update(objective="binary:logistic", eval_metric="logloss")
+    if n_jobs is not None:
+        parametros["nthread"] = n_jobs
+    return parametros, hiperparametros["n_estimators"]
+
+def entrenar_y_evaluar(X, y, dias_a_predecir=5, hiperparametros=None, n_jobs=None, matriz=None):
+    """
+    Pasos 2 a 4 de 'entrenar_nuevo_modelo' sobre X, y ya calculados.
+
+    Args:
+        hiperparametros (dict): Reemplazan a HIPERPARAMETROS_MODELO.
+        n_jobs (int): Hilos de XGBoost (None = todos los núcleos). No es
+            un hiperparámetro: no cambia el modelo, solo cuánto tarda.
+        matriz (MatrizCuantizada): Matriz ya cuantizada que empieza con
+            las filas de X (ej. la de X_full compartida por los horizontes).
+            Si se pasa, se entrena sobre una vista sin volver a leer X.
+
+    Returns:
+        (modelo, metricas): metricas = {'accuracy', 'precision', 'recall',
+        'filas_entrenamiento', 'filas_prueba'}. (None, None) si no hay datos.
+    """
     # --- 2. Dividir Datos (Train/Test Split) ---
     # NUNCA barajamos (shuffle=False) en series de tiempo.
     # Usamos el 20% más reciente de los datos para probar.
+    # Es la misma división que train_test_split(shuffle=False), pero con
+    # rebanadas: no copia X (con la matriz compartida, X_train ni se lee).
     
     print("[Gestor Modelo] Dividiendo datos en 80% entrenamiento y 20% prueba...")
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y, 
-        test_size=0.2, 
-        shuffle=False 
-    )
+    with etapa("division", horizonte=dias_a_predecir, filas=len(X)):
+        corte = filas_entrenamiento(len(X))
+        X_train, X_test = X.iloc[:corte], X.iloc[corte:]
+        y_train, y_test = y.iloc[:corte], y.iloc[corte:]
     
     if X_train.empty or y_train.empty:
         print("[Gestor Modelo] Error: No hay suficientes datos después de la división. Prueba un período más largo.")
-        return None
+        return None, None
 
     # --- 3. Definir y Entrenar el Modelo (XGBoost) ---
-    print("[Gestor Modelo] Definiendo modelo XGBClassifier...")
-    modelo = xgb.XGBClassifier(
-        objective='binary:logistic',
-        n_estimators=100,
-        learning_rate=0.1,
-        max_depth=5,
-        use_label_encoder=False,
-        eval_metric='logloss'
-    )
+    hiperparametros = {**HIPERPARAMETROS_MODELO, **(hiperparametros or {})}
+    with etapa("ajuste", horizonte=dias_a_predecir, filas=len(X_train)):
+        if matriz is not None and matriz.es_prefijo(X):
+            # Sin re-ingestar pandas: vista de las primeras filas. Cada horizonte
+            # entrena sobre un largo distinto, así que la vista no se guarda.
+            print("[Gestor Modelo] Entrenando el modelo (matriz cuantizada compartida)...")
+            parametros, arboles = parametros_nativos(hiperparametros, n_jobs)
+            dtrain = matriz.vista(fin=len(X_train), etiquetas=y_train.to_numpy(), guardar=False)
+            booster = xgb.train(parametros, dtrain, num_boost_round=arboles)
+            modelo = clasificador_desde_booster(booster, n_jobs=n_jobs)
+        else:
+            print("[Gestor Modelo] Definiendo modelo XGBClassifier...")
+            modelo = xgb.XGBClassifier(
+                objective='binary:logistic',
+                use_label_encoder=False,
+                eval_metric='logloss',
+                n_jobs=n_jobs,
+                **hiperparametros
+            )
 
-    print("[Gestor Modelo] Entrenando el modelo...")
-    modelo.fit(X_train, y_train)
+            print("[Gestor Modelo] Entrenando el modelo...")
+            modelo.fit(X_train, y_train)
     print("[Gestor Modelo] ¡Entrenamiento completado!")
 
     # --- 4. Evaluar el Modelo ---
     print(f"\n--- Evaluación (para {dias_a_predecir} días) sobre datos de prueba ---")
     
-    y_pred = modelo.predict(X_test)
+    with etapa("evaluacion", horizonte=dias_a_predecir, filas=len(X_test)):
+        y_pred = modelo.predict(X_test)
     
     accuracy = accuracy_score(y_test, y_pred)
     print(f"Precisión (Accuracy): {accuracy * 100:.2f}%")
     
     print("\nReporte de Clasificación:")
     print(classification_report(y_test, y_pred, target_names=['No Sube (0)', 'Sube (1)'], zero_division=0))
-    
-    # --- 5. Devolver el modelo ---
-    return modelo
+
+    metricas = {
+        "accuracy": float(accuracy),
+        "precision": float(precision_score(y_test, y_pred, zero_division=0)),
+        "recall": float(recall_score(y_test, y_pred, zero_division=0)),
+        "filas_entrenamiento": int(len(X_train)),
+        "filas_prueba": int(len(X_test)),
+    }
+    return modelo, metricas
@@ -0,0 +1,266 @@
+import os
+import sys
+import json
+import time
+import io
+import pstats
+import cProfile
+import threading
+import tracemalloc
+import contextvars
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import resource  # Solo Unix: en Windows el pico de RSS queda en None
+except ImportError:
+    resource = None
+
+# --- Configuración de Ruta (Path) ---
+script_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.abspath(os.path.join(script_dir, os.pardir))
+if parent_dir not in sys.path:
+    sys.path.append(parent_dir)
+# --- Fin de Configuración ---
+
+# Instrumentación de etapas (carga de datos, features, split, ajuste,
+# evaluación, puntuación, registro...).
+#
+#   with Traza("ejecutar_predicciones") as traza:
+#       with etapa("features") as e:
+#           X, targets = crear_features_multihorizonte(...)
+#           e.anotar(filas=len(X))
+#   traza.exportar()
+#
+# Cada etapa mide reloj, CPU del proceso (incluye los hilos de XGBoost),
+# pico de memoria de Python (tracemalloc, incluye NumPy/pandas) y el pico
+# de RSS del proceso (lo que reserva XGBoost en C++ no lo ve tracemalloc).
+# Las etapas se anidan: el pico de una etapa incluye el de sus hijas.
+#
+# etapa() se puede llamar desde cualquier módulo (ej. gestor_modelo):
+# si no hay una Traza activa no mide nada y cuesta casi cero.
+#
+# El JSON exportado es a la vez un resumen y una traza de Chrome
+# (chrome://tracing o https://ui.perfetto.dev): 'traceEvents' tiene un
+# evento por etapa. Para comparar dos ejecuciones basta con diffear los
+# 'etapas' de sus archivos.
+
+DIRECTORIO_TRAZAS = os.environ.get(
+    "MODELO_DIRECTORIO_TRAZAS", os.path.join(parent_dir, "predicciones", "trazas")
+)
+# Etapas a perfilar con cProfile (ej. MODELO_PERFILAR=ajuste,features)
+ETAPAS_PERFILADAS = tuple(e for e in os.environ.get("MODELO_PERFILAR", "").split(",") if e)
+FUNCIONES_PERFIL = 15  # Funciones (por tiempo acumulado) que se guardan de cada perfil
+
+_traza_activa = contextvars.ContextVar("traza_activa", default=None)
+
+
+def _rss_pico_mb():
+    """Pico de RSS del proceso en MB (ru_maxrss está en KB en Linux y en bytes en macOS)."""
+    if resource is None:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pico / 2**20 if sys.platform == "darwin" else pico / 1024
+
+
+class Etapa:
+    """Una etapa medida. 'datos' guarda lo que se anote (filas, horizonte...)."""
+
+    def __init__(self, nombre, padre, datos):
+        self.nombre = nombre
+        self.padre = padre
+        self.datos = dict(datos)
+        self.hilo = threading.get_ident()
+        self.resultado = None
+        self._pico = 0
+
+    def anotar(self, **datos):
+        self.datos.update(datos)
+
+
+class _EtapaNula:
+    """Lo que devuelve etapa() sin una Traza activa."""
+
+    def anotar(self, **datos):
+        pass
+
+
+_ETAPA_NULA = _EtapaNula()
+
+
+class Traza:
+    """
+    Registro de las etapas de una ejecución.
+
+    Args:
+        nombre (str): Nombre de la ejecución (y del archivo exportado).
+        memoria (bool): Medir picos con tracemalloc (hace más lentas las
+            reservas de memoria de Python mientras está activo).
+        perfilar (iterable): Nombres de etapas a envolver en cProfile.
+    """
+
+    def __init__(self, nombre, memoria=True, perfilar=ETAPAS_PERFILADAS):
+        self.nombre = nombre
+        self.memoria = memoria
+        self.perfilar = set(perfilar)
+        self.etapas = []
+        self.perfiles = {}
+        self._abiertas = {}  # {hilo: [etapas abiertas]}
+        self._candado = threading.Lock()
+        self._perfilando = False
+        self._token = None
+        self._inicio_tracemalloc = False
+        self.inicio = datetime.now()
+        self._t0 = time.perf_counter()
+
+    def __enter__(self):
+        self._token = _traza_activa.set(self)
+        if self.memoria and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._inicio_tracemalloc = True
+        self._t0 = time.perf_counter()
+        self.inicio = datetime.now()
+        return self
+
+    def __exit__(self, *exc):
+        self.segundos = time.perf_counter() - self._t0
+        if self._inicio_tracemalloc:
+            tracemalloc.stop()
+            self._inicio_tracemalloc = False
+        _traza_activa.reset(self._token)
+        return False
+
+    @contextmanager
+    def etapa(self, nombre, **datos):
+        abiertas = self._abiertas.setdefault(threading.get_ident(), [])
+        actual = Etapa(nombre, abiertas[-1].nombre if abiertas else None, datos)
+        medir_memoria = self.memoria and tracemalloc.is_tracing()
+        if medir_memoria:
+            memoria_inicio, pico = tracemalloc.get_traced_memory()
+            # El pico que llevaban las etapas abiertas no se pierde al reiniciarlo
+            for abierta in abiertas:
+                abierta._pico = max(abierta._pico, pico)
+            tracemalloc.reset_peak()
+
+        perfil = None
+        if nombre in self.perfilar and not self._perfilando:
+            perfil, self._perfilando = cProfile.Profile(), True
+
+        abiertas.append(actual)
+        inicio_cpu = time.process_time()
+        inicio = time.perf_counter()
+        if perfil is not None:
+            perfil.enable()
+        try:
+            yield actual
+            actual.resultado = "ok"
+        except BaseException as e:
+            actual.resultado = f"error: {type(e).__name__}"
+            raise
+        finally:
+            if perfil is not None:
+                perfil.disable()
+                self._perfilando = False
+            fin = time.perf_counter()
+            abiertas.pop()
+            actual.inicio = inicio - self._t0
+            actual.segundos = fin - inicio
+            actual.segundos_cpu = time.process_time() - inicio_cpu
+            actual.rss_pico_mb = _rss_pico_mb()
+            if medir_memoria:
+                pico = max(actual._pico, tracemalloc.get_traced_memory()[1])
+                actual.memoria_pico_mb = (pico - memoria_inicio) / 2**20
+            if perfil is not None:
+                self.perfiles[f"{nombre}#{len(self.etapas)}"] = _resumen_perfil(perfil)
+            with self._candado:
+                self.etapas.append(actual)
+
+    def _ordenadas(self):
+        return sorted(self.etapas, key=lambda e: e.inicio)
+
+    def resumen(self):
+        """Una fila (dict) por etapa, en orden de inicio."""
+        return [_fila(e) for e in self._ordenadas()]
+
+    def a_dict(self):
+        pid = os.getpid()
+        eventos = []
+        for e in self._ordenadas():
+            fila = _fila(e)
+            eventos.append({
+                "name": e.nombre, "cat": "etapa", "ph": "X", "pid": pid, "tid": e.hilo,
+                "ts": round(e.inicio * 1e6, 1), "dur": round(e.segundos * 1e6, 1),
+                "args": {k: v for k, v in fila.items() if k not in ("etapa", "inicio_s", "segundos")},
+            })
+        return {
+            "nombre": self.nombre,
+            "inicio": self.inicio.isoformat(timespec="seconds"),
+            "segundos": round(getattr(self, "segundos", time.perf_counter() - self._t0), 6),
+            "etapas": self.resumen(),
+            "perfiles": self.perfiles,
+            "traceEvents": eventos,
+            "displayTimeUnit": "ms",
+        }
+
+    def exportar(self, ruta=None):
+        """Escribe la traza en JSON. Devuelve la ruta (None si falló)."""
+        if ruta is None:
+            os.makedirs(DIRECTORIO_TRAZAS, exist_ok=True)
+            ruta = os.path.join(DIRECTORIO_TRAZAS, f"{self.nombre}_{self.inicio.strftime('%Y%m%d_%H%M%S')}.json")
+        try:
+            with open(ruta, "w", encoding="utf-8") as f:
+                json.dump(self.a_dict(), f, indent=1, default=str)
+        except Exception as e:
+            print(f"*** [Instrumentación] No se pudo escribir la traza: {e} ***")
+            return None
+        print(f"[Instrumentación] Traza guardada en: {ruta}")
+        return ruta
+
+    def imprimir(self):
+        print(f"\n--- Tiempos por Etapa ({self.nombre}) ---")
+        print(f"{'Etapa':<24}{'Seg.':>9}{'CPU':>9}{'Mem. MB':>10}{'Filas':>9}")
+        for fila in self.resumen():
+            sangria = "  " if fila["padre"] else ""
+            nombre = fila["etapa"] + (f" {fila['horizonte']}d" if "horizonte" in fila else "")
+            memoria = fila.get("memoria_pico_mb")
+            print(f"{sangria + nombre:<24}{fila['segundos']:>9.3f}{fila['segundos_cpu']:>9.3f}"
+                  f"{'-' if memoria is None else f'{memoria:.1f}':>10}{fila.get('filas', '-'):>9}")
+
+
+def _fila(e):
+    fila = {
+        "etapa": e.nombre,
+        "padre": e.padre,
+        "inicio_s": round(e.inicio, 6),
+        "segundos": round(e.segundos, 6),
+        "segundos_cpu": round(e.segundos_cpu, 6),
+        "rss_pico_mb": None if e.rss_pico_mb is None else round(e.rss_pico_mb, 1),
+        "resultado": e.resultado,
+    }
+    if hasattr(e, "memoria_pico_mb"):
+        fila["memoria_pico_mb"] = round(e.memoria_pico_mb, 3)
+    fila.update(e.datos)
+    return fila
+
+def _resumen_perfil(perfil):
+    """Las FUNCIONES_PERFIL funciones con más tiempo acumulado, como texto."""
+    salida = io.StringIO()
+    pstats.Stats(perfil, stream=salida).sort_stats("cumulative").print_stats(FUNCIONES_PERFIL)
+    return salida.getvalue()
+
+
+def traza_activa():
+    return _traza_activa.get()
+
+
+def etapa(nombre, **datos):
+    """Mide 'nombre' en la Traza activa; sin traza, no hace nada."""
+    traza = _traza_activa.get()
+    if traza is None:
+        return _sin_traza()
+    return traza.etapa(nombre, **datos)
+
+
+@contextmanager
+def _sin_traza():
+    yield _ETAPA_NULA
@@ -0,0 +1,136 @@
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Kernels NumPy para las features de 'procesador_features'.
+# En vez de añadir una columna de pandas por feature (con su copia),
+# todo se calcula sobre arreglos 2-D (tiempo x series) y se escribe en
+# UNA matriz float32 preasignada:
+# - Retornos con lag: una sola pasada con una vista deslizante (strided).
+# - Media y correlación móviles: sumas acumuladas (cumsum) en O(T).
+# Los cálculos intermedios son float64; solo la salida es float32.
+
+try:
+    from modelo.procesador_features import PERIODO_CORRELACION
+except ImportError:
+    from procesador_features import PERIODO_CORRELACION
+
+LAGS_RETORNO = (1, 3, 5, 10)
+VENTANA_SMA = 20
+DTYPE_SALIDA = np.float32
+
+
+def _como_2d(x):
+    x = np.asarray(x, dtype=np.float64)
+    return x[:, None] if x.ndim == 1 else x
+
+def retornos_con_lag(precios, lags=LAGS_RETORNO):
+    """
+    Retornos porcentuales para varios lags en una pasada.
+    precios: (T, K). Devuelve (T, K, L); NaN en las primeras 'lag' filas,
+    igual que pandas 'pct_change(lag)'.
+    """
+    precios = _como_2d(precios)
+    lags = np.asarray(lags)
+    max_lag = int(lags.max())
+    relleno = np.full((max_lag, precios.shape[1]), np.nan)
+    extendido = np.concatenate([relleno, precios], axis=0)
+    # ventanas[t, k, :] = precios[t - max_lag .. t, k]   (vista, sin copia)
+    ventanas = sliding_window_view(extendido, max_lag + 1, axis=0)
+    return ventanas[..., -1:] / ventanas[..., max_lag - lags] - 1
+
+def _sumas_moviles(x, ventana):
+    """Suma móvil de 'ventana' filas con cumsum. NaN en las primeras ventana-1."""
+    acumulada = np.cumsum(x, axis=0)
+    salida = np.full_like(x, np.nan)
+    salida[ventana - 1] = acumulada[ventana - 1]
+    salida[ventana:] = acumulada[ventana:] - acumulada[:-ventana]
+    return salida
+
+def media_movil(x, ventana):
+    """Equivalente a 'rolling(ventana).mean()' sobre cada columna de x (T, K)."""
+    return _sumas_moviles(_como_2d(x), ventana) / ventana
+
+def correlacion_movil(x, y, ventana):
+    """
+    Correlación móvil de Pearson columna a columna (como 'rolling().corr()').
+    Las filas iniciales con NaN (ej. el primer retorno) se saltan.
+    """
+    x, y = _como_2d(x), _como_2d(y)
+    salida = np.full(x.shape, np.nan)
+    validas = ~(np.isnan(x).any(axis=1) | np.isnan(y).any(axis=1))
+    inicio = int(np.argmax(validas)) if validas.any() else len(x)
+    if len(x) - inicio < ventana:
+        return salida
+    x, y = x[inicio:], y[inicio:]
+    # Restar la media no cambia la correlación y evita cancelaciones en cumsum
+    x = x - x.mean(axis=0)
+    y = y - y.mean(axis=0)
+
+    sx, sy = _sumas_moviles(x, ventana), _sumas_moviles(y, ventana)
+    sxx, syy = _sumas_moviles(x * x, ventana), _sumas_moviles(y * y, ventana)
+    sxy = _sumas_moviles(x * y, ventana)
+
+    cov = sxy - sx * sy / ventana
+    var_x = sxx - sx * sx / ventana
+    var_y = syy - sy * sy / ventana
+    with np.errstate(invalid='ignore', divide='ignore'):
+        corr = cov / np.sqrt(var_x * var_y)
+    corr[(var_x <= 0) | (var_y <= 0)] = np.nan
+    salida[inicio:] = corr
+    return salida
+
+def nombres_columnas(nombre_target='AAPL', nombre_factor='SMH', lags=LAGS_RETORNO,
+                     periodo_correlacion=PERIODO_CORRELACION):
+    """Nombres de columnas en el mismo orden que 'procesador_features'."""
+    return (
+        [c for lag in lags for c in (f'{nombre_target}_retorno_{lag}d', f'{nombre_factor}_retorno_{lag}d')]
+        + [f'Correl_{nombre_target}_{nombre_factor}_{periodo_correlacion}d', f'{nombre_target}_vs_SMA20']
+    )
+
+def calcular_matriz_features(precios_target, precios_factor, lags=LAGS_RETORNO,
+                             periodo_correlacion=PERIODO_CORRELACION,
+                             ventana_sma=VENTANA_SMA, salida=None):
+    """
+    Calcula todas las features para K pares (target, factor) a la vez.
+
+    Args:
+        precios_target, precios_factor: (T,) o (T, K), sin huecos.
+        salida: matriz float32 (T, K, F) preasignada (opcional).
+
+    Returns:
+        Matriz float32 (T, K, F) con F = 2*len(lags) + 2, en el orden de
+        'nombres_columnas'. Las filas de calentamiento quedan en NaN.
+    """
+    pt, pf = _como_2d(precios_target), _como_2d(precios_factor)
+    T, K = pt.shape
+    n_features = 2 * len(lags) + 2
+    if salida is None:
+        salida = np.empty((T, K, n_features), dtype=DTYPE_SALIDA)
+
+    # a) Retornos: target y factor intercalados, como en pandas
+    salida[:, :, 0:2 * len(lags):2] = retornos_con_lag(pt, lags)
+    salida[:, :, 1:2 * len(lags):2] = retornos_con_lag(pf, lags)
+
+    # b) Correlación móvil de los retornos de 1 día
+    r_t = np.full_like(pt, np.nan)
+    r_f = np.full_like(pf, np.nan)
+    r_t[1:] = pt[1:] / pt[:-1] - 1
+    r_f[1:] = pf[1:] / pf[:-1] - 1
+    salida[:, :, 2 * len(lags)] = correlacion_movil(r_t, r_f, periodo_correlacion)
+
+    # c) Distancia a la media móvil
+    sma = media_movil(pt, ventana_sma)
+    salida[:, :, 2 * len(lags) + 1] = (pt - sma) / sma
+    return salida
+
+def features_numpy(df_precios: pd.DataFrame, target='AAPL', factor='SMH'):
+    """
+    Versión NumPy de las features de 'procesador_features' para un par.
+    Recibe el DataFrame con columnas de precios (ej. AAPL y SMH) y
+    devuelve X (float32) sin las filas de calentamiento.
+    """
+    matriz = calcular_matriz_features(df_precios[target].to_numpy(), df_precios[factor].to_numpy())[:, 0, :]
+    completas = ~np.isnan(matriz).any(axis=1)
+    return pd.DataFrame(matriz[completas], index=df_precios.index[completas],
+                        columns=nombres_columnas(target, factor))
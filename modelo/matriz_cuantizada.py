@@ -0,0 +1,203 @@
+import os
+import sys
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+
+# --- Configuración de Ruta (Path) ---
+script_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.abspath(os.path.join(script_dir, os.pardir))
+if parent_dir not in sys.path:
+    sys.path.append(parent_dir)
+# --- Fin de Configuración ---
+
+# Matriz de entrenamiento cuantizada (hist) reutilizable.
+# Cada fit() de XGBoost vuelve a leer el DataFrame de pandas y a calcular
+# los cortes de cuantiles (el "sketch"). Pero los 3 horizontes, los
+# reentrenamientos y los pliegues del backtest usan la MISMA matriz de
+# features: solo cambian las etiquetas y hasta qué fila se entrena.
+# Acá la matriz se guarda una vez y cada rango de filas es una vista
+# QuantileDMatrix (que se puede guardar y reutilizar cambiando la etiqueta).
+#
+# Los cortes de los bins nunca ven filas posteriores a las de entrenamiento
+# (los valores futuros de las features también son mirar hacia adelante):
+# - Por defecto (fin_cortes=None) cada vista calcula sus cortes con SUS
+#   filas: el modelo es el mismo que el de fit() sobre esas filas.
+# - Con fin_cortes=n los cortes salen de las primeras n filas y todas las
+#   vistas los reutilizan con ref=... (sin sketch). Un valor fuera de esos
+#   cortes cae en el bin del extremo. Es lo que usan la predicción diaria
+#   y el planificador (n = filas de entrenamiento del horizonte más corto
+#   en datos, ver gestor_modelo.filas_entrenamiento) y el backtest (n =
+#   el primer bloque de entrenamiento): un solo sketch para todo.
+#
+# Con un DataFrame, las vistas leen sus filas directamente (XGBoost toma
+# cada columna sin copiarla): ni una copia de la matriz, y crearla no
+# cuesta nada si todos los modelos del registro siguen vigentes.
+# 'datos' (float32, para inplace_predict) se convierte solo si se pide.
+#
+# XGBoost 3.x no permite .slice() sobre una QuantileDMatrix, por eso las
+# vistas se construyen con 'ref' en lugar de recortar una matriz única.
+
+MAX_BIN = 256            # El valor por defecto de tree_method="hist"
+# Rangos de filas guardados por matriz (LRU). Lo que se reutiliza de
+# verdad son las vistas de entrenamiento y evaluación de los pliegues de
+# la búsqueda. Los horizontes de una ejecución y los pliegues del
+# backtest entrenan cada uno sobre un largo distinto: no se guardan
+# (vista(..., guardar=False)).
+MAX_VISTAS_CACHE = 8
+MAX_MATRICES_CACHE = 8   # Matrices guardadas por proceso (matriz_para)
+
+
+class MatrizCuantizada:
+    """
+    Features de entrenamiento (T, F) con cortes de cuantiles compartidos.
+
+    Uso:
+        matriz = MatrizCuantizada(X_full, fin_cortes=500)
+        dtrain = matriz.vista(fin=800, etiquetas=y[:800])
+        booster = xgb.train(parametros, dtrain, 100)
+        prob = booster.inplace_predict(matriz.datos[800:900])
+    """
+
+    def __init__(self, X, max_bin: int = MAX_BIN, max_vistas: int = MAX_VISTAS_CACHE, fin_cortes: int = None):
+        if isinstance(X, pd.DataFrame):
+            self.indice = X.index
+            self.columnas = [str(c) for c in X.columns]
+        else:
+            self.indice = None
+            self.columnas = None
+        self._origen = X         # Las vistas leen de acá (ver _filas)
+        self._datos = None       # float32, solo si alguien lo pide (ver datos)
+        self.filas = len(X)
+        self.max_bin = max_bin
+        self.max_vistas = max_vistas
+        self.fin_cortes = fin_cortes
+        self._referencia = None  # Se construye al primer uso: cargar la matriz no cuesta nada
+        self._vistas = OrderedDict()
+        self.sketches = 0        # Cuántas veces se calcularon cortes (con fin_cortes, 1)
+        self.vistas_creadas = 0
+
+    def __len__(self):
+        return self.filas
+
+    @property
+    def datos(self):
+        """Features (T, F) en float32 contiguo (ej. para inplace_predict); se convierten una vez."""
+        if self._datos is None:
+            origen = self._origen.to_numpy() if isinstance(self._origen, pd.DataFrame) else self._origen
+            self._datos = np.ascontiguousarray(origen, dtype=np.float32)  # Una sola copia
+        return self._datos
+
+    def _filas(self, inicio, fin):
+        """Filas [inicio, fin) para una QuantileDMatrix: del DataFrame, sin copiarlas."""
+        if isinstance(self._origen, pd.DataFrame):
+            return self._origen.iloc[inicio:fin]
+        return self.datos[inicio:fin]
+
+    def _sketch(self, inicio, fin):
+        """QuantileDMatrix de [inicio, fin) con cortes calculados sobre esas mismas filas."""
+        self.sketches += 1
+        return xgb.QuantileDMatrix(self._filas(inicio, fin), max_bin=self.max_bin, feature_names=self.columnas)
+
+    @property
+    def referencia(self):
+        """Filas [0, fin_cortes): sus cortes los comparten todas las vistas."""
+        if self._referencia is None:
+            self._referencia = self._sketch(0, self.fin_cortes)
+        return self._referencia
+
+    def es_prefijo(self, X: pd.DataFrame):
+        """True si las filas de X son las primeras filas de esta matriz (ej. X de un horizonte)."""
+        if self.indice is None or len(X) > len(self.indice):
+            return False
+        return bool(self.indice[:len(X)].equals(X.index)) and list(map(str, X.columns)) == self.columnas
+
+    def _vista_guardada(self, clave, crear, guardar=True):
+        dmatrix = self._vistas.get(clave)
+        if dmatrix is None:
+            dmatrix = crear()
+            self.vistas_creadas += 1
+            if not guardar:
+                return dmatrix
+            self._vistas[clave] = dmatrix
+            while len(self._vistas) > self.max_vistas:
+                self._vistas.popitem(last=False)
+        else:
+            self._vistas.move_to_end(clave)
+        return dmatrix
+
+    def _asignar(self, dmatrix, etiquetas, base_margin):
+        if etiquetas is not None:
+            dmatrix.set_label(np.asarray(etiquetas, dtype=np.float32))
+        # Un base_margin vacío borra el de un uso anterior de la misma vista
+        dmatrix.set_base_margin(
+            np.asarray(base_margin, dtype=np.float32) if base_margin is not None
+            else np.array([], dtype=np.float32)
+        )
+        return dmatrix
+
+    def vista(self, fin: int, inicio: int = 0, etiquetas=None, base_margin=None, guardar: bool = True):
+        """
+        QuantileDMatrix de las filas [inicio, fin), con las etiquetas y el
+        base_margin pedidos (el base_margin anterior se borra si no se pasa).
+        guardar=False: la vista no queda en la caché (se usa una sola vez).
+        """
+        def crear():
+            if self.fin_cortes is None:
+                return self._sketch(inicio, fin)
+            if inicio == 0 and fin == self.fin_cortes:
+                return self.referencia
+            return xgb.QuantileDMatrix(
+                self._filas(inicio, fin), ref=self.referencia,
+                max_bin=self.max_bin, feature_names=self.columnas,
+            )
+        return self._asignar(self._vista_guardada((inicio, fin), crear, guardar), etiquetas, base_margin)
+
+    def vista_evaluacion(self, fin: int, inicio: int, fin_entrenamiento: int, etiquetas=None):
+        """
+        Vista [inicio, fin) para usar en 'evals' (early stopping) junto a
+        vista(fin_entrenamiento). XGBoost exige que una QuantileDMatrix de
+        evaluación tenga como referencia la de entrenamiento (mismos cortes).
+        """
+        def crear():
+            return xgb.QuantileDMatrix(
+                self._filas(inicio, fin), ref=self.vista(fin_entrenamiento),
+                max_bin=self.max_bin, feature_names=self.columnas,
+            )
+        clave = (inicio, fin, "evaluacion", fin_entrenamiento)
+        return self._asignar(self._vista_guardada(clave, crear), etiquetas, None)
+
+
+# --- Caché por proceso ---
+# Los procesos del pool (backtest, búsqueda, planificador) reciben la
+# matriz por memoria compartida; así cada proceso cuantiza una sola vez
+# por bloque aunque le toquen varias tareas (horizontes, pliegues, configs).
+_CACHE_MATRICES = OrderedDict()
+
+def matriz_para(clave, cargar, fin_cortes: int = None):
+    """
+    MatrizCuantizada guardada bajo 'clave' (ej. el nombre del bloque
+    compartido). 'cargar()' devuelve las features y solo se llama si la
+    matriz no está en la caché.
+    """
+    clave = (clave, fin_cortes)
+    matriz = _CACHE_MATRICES.get(clave)
+    if matriz is None:
+        matriz = MatrizCuantizada(cargar(), fin_cortes=fin_cortes)
+        _CACHE_MATRICES[clave] = matriz
+        while len(_CACHE_MATRICES) > MAX_MATRICES_CACHE:
+            _CACHE_MATRICES.popitem(last=False)
+    else:
+        _CACHE_MATRICES.move_to_end(clave)
+    return matriz
+
+def limpiar_cache():
+    _CACHE_MATRICES.clear()
+
+def clasificador_desde_booster(booster, **parametros):
+    """Envuelve un booster nativo en un XGBClassifier (mismo formato que guarda el registro)."""
+    modelo = xgb.XGBClassifier(**parametros)
+    modelo.load_model(booster.save_raw())
+    return modelo
@@ -0,0 +1,203 @@
+import numpy as np
+import pandas as pd
+
+# Motor de correlaciones móviles entre activos.
+# Para un universo de N tickers y F factores mantiene las estadísticas
+# suficientes de la ventana (sumas de x, y, x², y², x·y) y las actualiza
+# barra a barra en O(N·F), en vez de recalcular cada ventana completa.
+# Opcionalmente mantiene también la matriz N×N completa (O(N²) por barra).
+# La memoria está acotada: solo se guardan las últimas 'ventana' barras.
+
+RESINCRONIZAR_CADA = 5_000  # Recalcula las sumas desde el buffer (evita deriva numérica)
+
+
+class MotorCorrelaciones:
+    """
+    Correlaciones y betas móviles de cada ticker contra cada factor.
+
+    Uso:
+        motor = MotorCorrelaciones(['NVDA', 'AMD'], ['SMH', 'SOXX'], ventana=30)
+        motor.actualizar(retornos_tickers, retornos_factores)
+        motor.correlaciones()   # (N, F)
+        motor.betas()           # (N, F)
+    """
+
+    def __init__(self, tickers, factores, ventana: int = 30, matriz_completa: bool = False):
+        self.tickers = list(tickers)
+        self.factores = list(factores)
+        self.ventana = ventana
+        self.matriz_completa = matriz_completa
+        N, F = len(self.tickers), len(self.factores)
+
+        # Buffers circulares: memoria fija de ventana x (N + F)
+        self._bx = np.zeros((ventana, N))
+        self._by = np.zeros((ventana, F))
+        self._pos = 0
+        self.n = 0
+        self._actualizaciones = 0
+
+        self._sx, self._sxx = np.zeros(N), np.zeros(N)
+        self._sy, self._syy = np.zeros(F), np.zeros(F)
+        self._sxy = np.zeros((N, F))
+        self._sxx_completa = np.zeros((N, N)) if matriz_completa else None
+
+    @property
+    def lleno(self):
+        return self.n >= self.ventana
+
+    def actualizar(self, retornos_tickers, retornos_factores):
+        """Incorpora los retornos de una barra nueva: O(N·F) (+ O(N²) con matriz completa)."""
+        x = np.asarray(retornos_tickers, dtype=np.float64)
+        y = np.asarray(retornos_factores, dtype=np.float64)
+
+        if self.n >= self.ventana:
+            x0, y0 = self._bx[self._pos], self._by[self._pos]
+            self._sx -= x0
+            self._sy -= y0
+            self._sxx -= x0 * x0
+            self._syy -= y0 * y0
+            self._sxy -= np.outer(x0, y0)
+            if self.matriz_completa:
+                self._sxx_completa -= np.outer(x0, x0)
+
+        self._bx[self._pos] = x
+        self._by[self._pos] = y
+        self._pos = (self._pos + 1) % self.ventana
+        self.n = min(self.n + 1, self.ventana)
+
+        self._sx += x
+        self._sy += y
+        self._sxx += x * x
+        self._syy += y * y
+        self._sxy += np.outer(x, y)
+        if self.matriz_completa:
+            self._sxx_completa += np.outer(x, x)
+
+        self._actualizaciones += 1
+        if self._actualizaciones % RESINCRONIZAR_CADA == 0:
+            self._resincronizar()
+
+    def _resincronizar(self):
+        bx, by = self._bx[:self.n], self._by[:self.n]
+        self._sx, self._sy = bx.sum(axis=0), by.sum(axis=0)
+        self._sxx, self._syy = (bx * bx).sum(axis=0), (by * by).sum(axis=0)
+        self._sxy = bx.T @ by
+        if self.matriz_completa:
+            self._sxx_completa = bx.T @ bx
+
+    # --- Estadísticas de la ventana actual ---
+
+    def _momentos(self):
+        n = self.n
+        cov = self._sxy - np.outer(self._sx, self._sy) / n
+        var_x = self._sxx - self._sx * self._sx / n
+        var_y = self._syy - self._sy * self._sy / n
+        return cov, var_x, var_y
+
+    def correlaciones(self):
+        """Matriz (N, F) de correlaciones; NaN hasta llenar la ventana."""
+        if not self.lleno:
+            return np.full((len(self.tickers), len(self.factores)), np.nan)
+        cov, var_x, var_y = self._momentos()
+        with np.errstate(invalid='ignore', divide='ignore'):
+            corr = cov / np.sqrt(np.outer(var_x, var_y))
+        corr[~(np.outer(var_x, var_y) > 0)] = np.nan
+        return corr
+
+    def betas(self):
+        """Matriz (N, F) de betas (cov(ticker, factor) / var(factor))."""
+        if not self.lleno:
+            return np.full((len(self.tickers), len(self.factores)), np.nan)
+        cov, _, var_y = self._momentos()
+        with np.errstate(invalid='ignore', divide='ignore'):
+            beta = cov / var_y[None, :]
+        beta[:, ~(var_y > 0)] = np.nan
+        return beta
+
+    def matriz_correlacion(self):
+        """Matriz completa (N, N) entre tickers (requiere matriz_completa=True)."""
+        if not self.matriz_completa:
+            raise ValueError("El motor se creó sin 'matriz_completa=True'.")
+        if not self.lleno:
+            return np.full((len(self.tickers),) * 2, np.nan)
+        n = self.n
+        cov = self._sxx_completa - np.outer(self._sx, self._sx) / n
+        desv = np.sqrt(np.clip(np.diag(cov), 0, None))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return cov / np.outer(desv, desv)
+
+    # --- Modo por lotes ---
+
+    def procesar_historial(self, retornos_tickers: pd.DataFrame, retornos_factores: pd.DataFrame):
+        """
+        Recorre una historia de retornos (fechas x tickers / factores) y
+        devuelve un DataFrame con 'Correl_<t>_<f>_<v>d' y 'Beta_<t>_<f>_<v>d'
+        para cada fila. Las filas con algún NaN se saltan.
+        """
+        x = retornos_tickers[self.tickers].to_numpy(np.float64)
+        y = retornos_factores[self.factores].to_numpy(np.float64)
+        validas = ~(np.isnan(x).any(axis=1) | np.isnan(y).any(axis=1))
+        N, F = len(self.tickers), len(self.factores)
+        corr = np.full((len(x), N, F), np.nan)
+        beta = np.full((len(x), N, F), np.nan)
+
+        for i in np.flatnonzero(validas):
+            self.actualizar(x[i], y[i])
+            if self.lleno:
+                corr[i] = self.correlaciones()
+                beta[i] = self.betas()
+
+        columnas, valores = [], []
+        for a, t in enumerate(self.tickers):
+            for b, f in enumerate(self.factores):
+                columnas += [f'Correl_{t}_{f}_{self.ventana}d', f'Beta_{t}_{f}_{self.ventana}d']
+                valores += [corr[:, a, b], beta[:, a, b]]
+        return pd.DataFrame(np.column_stack(valores), index=retornos_tickers.index, columns=columnas)
+
+
+# --- Integración con el registro de features ---
+
+def _correlaciones_lote(*retornos, tickers, factores, ventana):
+    n = len(tickers)
+    rt = pd.concat(retornos[:n], axis=1, keys=tickers)
+    rf = pd.concat(retornos[n:], axis=1, keys=factores)
+    return MotorCorrelaciones(tickers, factores, ventana).procesar_historial(rt, rf)
+
+def _columna(tabla, columna):
+    return tabla[columna]
+
+def registrar_features_correlacion(tickers, factores, ventana: int = 30):
+    """
+    Registra en 'registro_features' las correlaciones y betas móviles de
+    cada ticker contra cada factor, calculadas con UN motor compartido.
+    Devuelve los nombres registrados, para pasarlos como 'features' a
+    crear_features_y_target / crear_features_multihorizonte.
+    Los nombres que ya existían (ej. la correlación de pandas del modelo
+    base) no se reemplazan.
+    """
+    try:
+        from modelo.registro_features import registrar_feature, REGISTRO_FEATURES, PREFIJO_PRECIO, _retorno
+    except ImportError:
+        from registro_features import registrar_feature, REGISTRO_FEATURES, PREFIJO_PRECIO, _retorno
+
+    for ticker in list(tickers) + list(factores):
+        if f"retorno_1d:{ticker}" not in REGISTRO_FEATURES:
+            registrar_feature(f"retorno_1d:{ticker}", [f"{PREFIJO_PRECIO}{ticker}"], _retorno,
+                              lookback=1, intermedia=True, periodos=1)
+
+    nodo = f"correlaciones_{ventana}d:{','.join(tickers)}|{','.join(factores)}"
+    registrar_feature(
+        nodo, [f"retorno_1d:{t}" for t in list(tickers) + list(factores)], _correlaciones_lote,
+        lookback=ventana - 1, intermedia=True,
+        tickers=list(tickers), factores=list(factores), ventana=ventana,
+    )
+
+    nombres = []
+    for t in tickers:
+        for f in factores:
+            for prefijo in ("Correl", "Beta"):
+                nombre = f"{prefijo}_{t}_{f}_{ventana}d"
+                if nombre not in REGISTRO_FEATURES:
+                    registrar_feature(nombre, [nodo], _columna, columna=nombre)
+                nombres.append(nombre)
+    return nombres
@@ -0,0 +1,141 @@
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+# --- Configuración de Ruta (Path) ---
+script_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.abspath(os.path.join(script_dir, os.pardir))
+if parent_dir not in sys.path:
+    sys.path.append(parent_dir)
+# --- Fin de Configuración ---
+
+from modelo.kernels_features import calcular_matriz_features, nombres_columnas, LAGS_RETORNO, DTYPE_SALIDA
+from modelo.procesador_features import PERIODO_CORRELACION
+
+# Modo panel: la misma receta de features de 'procesador_features' para
+# cientos de pares (target, factor), ej. cada semiconductora contra SMH o SOXX.
+# - Los precios de todos los tickers van a UN bloque de memoria compartida.
+# - Cada proceso del pool toma un grupo de pares y calcula sus features
+#   vectorizadas a lo largo del eje de tickers (kernels_features).
+# - El resultado es una matriz en formato largo (fecha, target, factor)
+#   lista para un modelo agrupado (pooled).
+
+PARES_POR_TAREA = 64  # Pares que procesa cada tarea del pool
+
+
+def _columnas_panel():
+    # Nombres genéricos: en formato largo el ticker va en el índice
+    return nombres_columnas('target', 'factor', LAGS_RETORNO, PERIODO_CORRELACION)
+
+def _tarea_pares(shm_precios, forma_precios, shm_salida, forma_salida, grupo, idx_target, idx_factor):
+    """
+    Se ejecuta en un proceso del pool: lee los precios desde la memoria
+    compartida y escribe las features de su grupo de pares directamente
+    en la matriz de salida compartida. Nada del panel se serializa.
+    """
+    entrada = shared_memory.SharedMemory(name=shm_precios)
+    salida = shared_memory.SharedMemory(name=shm_salida)
+    try:
+        precios = np.ndarray(forma_precios, dtype=np.float64, buffer=entrada.buf)
+        matriz = np.ndarray(forma_salida, dtype=DTYPE_SALIDA, buffer=salida.buf)
+        matriz[:, grupo, :] = _calcular_pares(precios, idx_target, idx_factor)
+    finally:
+        entrada.close()
+        salida.close()
+
+def _calcular_pares(precios, idx_target, idx_factor):
+    """
+    Features (T, K, F) de K pares sobre el índice completo del panel.
+    Como en el modo de un par, cada par usa solo las fechas en que cotizan
+    SUS dos tickers: los pares se agrupan por esas fechas y cada grupo se
+    calcula (vectorizado) sin huecos. Donde el par no cotiza queda NaN.
+    """
+    pt, pf = precios[:, idx_target], precios[:, idx_factor]
+    validas = ~(np.isnan(pt) | np.isnan(pf))
+    if validas.all():
+        return calcular_matriz_features(pt, pf)
+    matriz = np.full((len(precios), len(idx_target), len(_columnas_panel())), np.nan, dtype=DTYPE_SALIDA)
+    mascaras, grupo_de = np.unique(validas.T, axis=0, return_inverse=True)
+    for g, mascara in enumerate(mascaras):
+        filas = np.flatnonzero(mascara)[:, None]
+        columnas = np.flatnonzero(grupo_de.ravel() == g)[None, :]
+        if filas.size:
+            matriz[filas, columnas] = calcular_matriz_features(pt[filas, columnas], pf[filas, columnas])
+    return matriz
+
+def _a_formato_largo(matriz, fechas, pares):
+    """(T, K, F) -> DataFrame con índice (fecha, target, factor), sin filas incompletas."""
+    T, K, F = matriz.shape
+    indice = pd.MultiIndex.from_arrays([
+        np.repeat(fechas, K),
+        np.tile([p[0] for p in pares], T),
+        np.tile([p[1] for p in pares], T),
+    ], names=['fecha', 'target', 'factor'])
+    largo = pd.DataFrame(matriz.reshape(T * K, F), index=indice, columns=_columnas_panel())
+    return largo[~np.isnan(matriz.reshape(T * K, F)).any(axis=1)]
+
+def crear_features_panel(precios: pd.DataFrame, pares, procesos: int = None,
+                         pares_por_tarea: int = PARES_POR_TAREA):
+    """
+    Calcula las features de todos los pares (target, factor).
+
+    Args:
+        precios: DataFrame (fechas x tickers) de cierres, ej.
+            gestor_tickers.cargar_panel(...)[0].xs('Close', axis=1, level=1)
+            o PanelCompacto.a_dataframe('Close').
+        pares: lista de tuplas (target, factor).
+        procesos: tamaño del pool. 1 (o pocos pares) = todo en este proceso.
+
+    Returns:
+        DataFrame en formato largo con índice (fecha, target, factor).
+    """
+    tickers = sorted({t for par in pares for t in par})
+    faltantes = [t for t in tickers if t not in precios.columns]
+    if faltantes:
+        raise KeyError(f"Faltan precios de: {faltantes}")
+    # Índice completo: un ticker que empieza tarde (o deja de cotizar) solo
+    # recorta la historia de sus propios pares (ver _calcular_pares)
+    precios = precios[tickers].dropna(how='all')
+    posicion = {t: i for i, t in enumerate(tickers)}
+    idx_target = np.array([posicion[p[0]] for p in pares])
+    idx_factor = np.array([posicion[p[1]] for p in pares])
+
+    procesos = procesos or os.cpu_count() or 1
+    grupos = [slice(i, i + pares_por_tarea) for i in range(0, len(pares), pares_por_tarea)]
+    print(f"[panel_features] {len(pares)} pares, {len(precios)} fechas, "
+          f"{len(grupos)} tareas en {min(procesos, len(grupos))} procesos...")
+
+    if procesos == 1 or len(grupos) == 1:
+        datos = precios.to_numpy(np.float64)
+        matriz = _calcular_pares(datos, idx_target, idx_factor)
+        print("[panel_features] ¡Listo!")
+        return _a_formato_largo(matriz, precios.index, pares)
+
+    datos = np.ascontiguousarray(precios.to_numpy(np.float64))
+    forma_salida = (len(precios), len(pares), len(_columnas_panel()))
+    shm_precios = shared_memory.SharedMemory(create=True, size=datos.nbytes)
+    shm_salida = shared_memory.SharedMemory(
+        create=True, size=int(np.prod(forma_salida)) * np.dtype(DTYPE_SALIDA).itemsize
+    )
+    try:
+        np.ndarray(datos.shape, dtype=np.float64, buffer=shm_precios.buf)[:] = datos
+        with ProcessPoolExecutor(max_workers=min(procesos, len(grupos))) as pool:
+            futuros = [
+                pool.submit(_tarea_pares, shm_precios.name, datos.shape, shm_salida.name,
+                            forma_salida, g, idx_target[g], idx_factor[g])
+                for g in grupos
+            ]
+            for futuro in futuros:
+                futuro.result()  # Propaga cualquier error de los procesos
+        matriz = np.ndarray(forma_salida, dtype=DTYPE_SALIDA, buffer=shm_salida.buf).copy()
+    finally:
+        for shm in (shm_precios, shm_salida):
+            shm.close()
+            shm.unlink()
+
+    print("[panel_features] ¡Listo!")
+    return _a_formato_largo(matriz, precios.index, pares)
@@ -0,0 +1,227 @@
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+# --- Configuración de Ruta (Path) ---
+script_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.abspath(os.path.join(script_dir, os.pardir))
+if parent_dir not in sys.path:
+    sys.path.append(parent_dir)
+# --- Fin de Configuración ---
+
+from modelo.procesador_features import crear_features_multihorizonte, FACTOR_PREDICTOR
+from modelo.registro_modelos import obtener_o_entrenar, leer_metadatos
+from modelo.gestor_modelo import filas_entrenamiento
+from modelo.matriz_cuantizada import matriz_para
+
+# Planificador de entrenamiento: un trabajo por (ticker, horizonte).
+# - Las features de cada ticker se calculan UNA vez, en este proceso, y
+#   van a un bloque de memoria compartida junto con los targets de todos
+#   sus horizontes. Los procesos del pool solo reciben el nombre del bloque.
+# - Los núcleos se reparten entre el pool y los hilos de XGBoost: con
+#   8 núcleos y 4 procesos, cada entrenamiento usa n_jobs=2. Así no hay
+#   más hilos que núcleos peleando por la CPU.
+# - Cada trabajo devuelve sus tiempos para ver dónde se va el reloj.
+
+HORIZONTES_PLANIFICADOR = [1, 5, 21]
+
+
+def _repartir_nucleos(trabajos: int, procesos: int = None, nucleos: int = None):
+    """(procesos del pool, hilos de XGBoost por trabajo)."""
+    nucleos = nucleos or os.cpu_count() or 1
+    procesos = max(1, min(procesos or nucleos, trabajos, nucleos))
+    return procesos, max(1, nucleos // procesos)
+
+def _publicar_matriz(X: pd.DataFrame, targets: dict):
+    """
+    Copia X y los targets (NaN donde la máscara es False) a un bloque de
+    memoria compartida. Devuelve (shm, descriptor) donde el descriptor es
+    lo único que viaja a los procesos.
+    """
+    horizontes = sorted(targets)
+    datos = np.empty((len(X), X.shape[1] + len(horizontes)), dtype=np.float64)
+    datos[:, :X.shape[1]] = X.to_numpy(np.float64)
+    for j, h in enumerate(horizontes):
+        y, mascara = targets[h]
+        datos[:, X.shape[1] + j] = np.where(mascara.to_numpy(), y.to_numpy(np.float64), np.nan)
+
+    shm = shared_memory.SharedMemory(create=True, size=max(datos.nbytes, 1))
+    np.ndarray(datos.shape, dtype=np.float64, buffer=shm.buf)[:] = datos
+    descriptor = {
+        "nombre": shm.name,
+        "forma": datos.shape,
+        "fechas": X.index.asi8,
+        "columnas": list(X.columns),
+        "horizontes": horizontes,
+        # Cortes de cuantiles compartidos por todos los horizontes: las
+        # filas de entrenamiento del que tiene menos datos (ver MatrizCuantizada)
+        "fin_cortes": filas_entrenamiento(min(int(m.sum()) for _, m in targets.values())) or None,
+    }
+    return shm, descriptor
+
+def _leer_matriz(descriptor: dict, horizonte: int):
+    """Reconstruye (X, y) del horizonte pedido desde la memoria compartida (copia)."""
+    shm = shared_memory.SharedMemory(name=descriptor["nombre"])
+    try:
+        datos = np.ndarray(descriptor["forma"], dtype=np.float64, buffer=shm.buf)
+        n_features = len(descriptor["columnas"])
+        objetivo = datos[:, n_features + descriptor["horizontes"].index(horizonte)]
+        validas = ~np.isnan(objetivo)
+        indice = pd.DatetimeIndex(descriptor["fechas"][validas])
+        X = pd.DataFrame(datos[validas, :n_features], index=indice, columns=descriptor["columnas"])
+        y = pd.Series(objetivo[validas].astype(int), index=indice, name='Target')
+    finally:
+        shm.close()
+    return X, y
+
+def _leer_etiquetas(descriptor: dict, horizonte: int):
+    """Etiquetas válidas del horizonte; son las de las primeras filas del bloque."""
+    shm = shared_memory.SharedMemory(name=descriptor["nombre"])
+    try:
+        datos = np.ndarray(descriptor["forma"], dtype=np.float64, buffer=shm.buf)
+        objetivo = datos[:, len(descriptor["columnas"]) + descriptor["horizontes"].index(horizonte)].copy()
+    finally:
+        shm.close()
+    validas = ~np.isnan(objetivo)
+    if not validas[:validas.sum()].all():
+        raise ValueError(f"Las filas con target de {horizonte}d no son un prefijo del bloque.")
+    return objetivo[validas].astype(int)
+
+def _matriz_del_bloque(descriptor: dict, fin_cortes: int = None):
+    """
+    MatrizCuantizada con todas las filas del bloque, convertida una vez
+    por proceso. Las filas con target válido de cada horizonte son las
+    primeras del bloque (el target mira hacia adelante: solo faltan las
+    últimas), así que todos los horizontes usan vistas de esta matriz.
+    fin_cortes: ver MatrizCuantizada (None = cortes de cada vista).
+    """
+    def cargar():
+        shm = shared_memory.SharedMemory(name=descriptor["nombre"])
+        try:
+            datos = np.ndarray(descriptor["forma"], dtype=np.float64, buffer=shm.buf)
+            return pd.DataFrame(
+                datos[:, :len(descriptor["columnas"])].copy(),
+                index=pd.DatetimeIndex(descriptor["fechas"]), columns=descriptor["columnas"],
+            )
+        finally:
+            shm.close()
+
+    fechas = descriptor["fechas"]
+    clave = (descriptor["nombre"], descriptor["forma"], int(fechas[0]), int(fechas[-1]))
+    return matriz_para(clave, cargar, fin_cortes)
+
+def _trabajo_entrenamiento(descriptor, ticker, horizonte, hilos_xgb, politica, forzar):
+    """Un (ticker, horizonte). Se ejecuta en un proceso del pool (o en este, si procesos=1)."""
+    inicio = time.perf_counter()
+    X, y = _leer_matriz(descriptor, horizonte)
+    matriz = _matriz_del_bloque(descriptor, descriptor["fin_cortes"])
+    segundos_datos = time.perf_counter() - inicio
+
+    anterior = (leer_metadatos(ticker, horizonte) or {}).get("version_modelo")
+    modelo, metadatos = obtener_o_entrenar(
+        horizonte, X, y, ticker=ticker, politica=politica, forzar=forzar, n_jobs=hilos_xgb, matriz=matriz,
+    )
+    version = metadatos.get("version_modelo") if metadatos else None
+    return {
+        "ticker": ticker,
+        "horizonte": horizonte,
+        "ok": modelo is not None,
+        "reentrenado": version is not None and version != anterior,
+        "version_modelo": version,
+        "filas": int(len(X)),
+        "hilos_xgb": hilos_xgb,
+        "pid": os.getpid(),
+        "segundos_datos": round(segundos_datos, 3),
+        "segundos": round(time.perf_counter() - inicio, 3),
+    }
+
+def planificar_entrenamiento(tickers, horizontes=None, snapshot=None, factor=FACTOR_PREDICTOR,
+                             procesos: int = None, nucleos: int = None, politica=None, forzar=False):
+    """
+    Entrena (o reutiliza, según la política del registro) un modelo por
+    cada combinación (ticker, horizonte).
+
+    Args:
+        tickers (list): Targets a modelar (cada uno contra 'factor').
+        horizontes (list): Días a predecir (por defecto HORIZONTES_PLANIFICADOR).
+        snapshot (dict): Snapshot de datos de la ejecución (opcional).
+        procesos (int): Tamaño del pool. 1 = todo en este proceso.
+        nucleos (int): Núcleos a repartir entre el pool y XGBoost
+            (por defecto todos).
+        politica, forzar: Ver registro_modelos.obtener_o_entrenar.
+
+    Returns:
+        Lista de dicts, uno por trabajo, con sus tiempos y la versión del
+        modelo resultante. Los modelos quedan en el registro (cargar_modelo).
+    """
+    horizontes = list(horizontes or HORIZONTES_PLANIFICADOR)
+    inicio = time.perf_counter()
+
+    # --- 1. Features una vez por ticker, publicadas en memoria compartida ---
+    bloques = []
+    trabajos = []
+    resultados = []
+    try:
+        for ticker in tickers:
+            X, targets = crear_features_multihorizonte(horizontes, snapshot=snapshot, target=ticker, factor=factor)
+            if X is None or X.empty:
+                print(f"*** [Planificador] Sin features para {ticker}. Se omite. ***")
+                resultados.extend({"ticker": ticker, "horizonte": h, "ok": False} for h in horizontes)
+                continue
+            shm, descriptor = _publicar_matriz(X, targets)
+            bloques.append(shm)
+            # Los trabajos con más filas primero: el pool termina más parejo
+            trabajos.extend((int(targets[h][1].sum()), descriptor, ticker, h) for h in horizontes)
+        segundos_features = time.perf_counter() - inicio
+
+        trabajos.sort(key=lambda t: -t[0])
+        procesos, hilos_xgb = _repartir_nucleos(len(trabajos) or 1, procesos, nucleos)
+        print(f"[Planificador] {len(trabajos)} trabajos en {procesos} procesos x {hilos_xgb} hilos de XGBoost...")
+
+        # --- 2. Entrenar ---
+        if procesos == 1:
+            for _, descriptor, ticker, h in trabajos:
+                resultados.append(_trabajo_entrenamiento(descriptor, ticker, h, hilos_xgb, politica, forzar))
+        else:
+            with ProcessPoolExecutor(max_workers=procesos) as pool:
+                futuros = {
+                    pool.submit(_trabajo_entrenamiento, descriptor, ticker, h, hilos_xgb, politica, forzar): (ticker, h)
+                    for _, descriptor, ticker, h in trabajos
+                }
+                for futuro, (ticker, h) in futuros.items():
+                    try:
+                        resultados.append(futuro.result())
+                    except Exception as e:
+                        print(f"*** [Planificador] Falló {ticker} {h}d: {e} ***")
+                        resultados.append({"ticker": ticker, "horizonte": h, "ok": False, "error": str(e)})
+    finally:
+        for shm in bloques:
+            shm.close()
+            shm.unlink()
+
+    _imprimir_resumen(resultados, segundos_features, time.perf_counter() - inicio)
+    return resultados
+
+def _imprimir_resumen(resultados, segundos_features, segundos_totales):
+    print("\n--- Planificador de Entrenamiento ---")
+    print(f"{'Ticker':<8}{'Horiz.':>7}{'Filas':>8}{'Seg.':>9}  Estado")
+    for r in sorted(resultados, key=lambda r: (r["ticker"], r["horizonte"])):
+        if not r.get("ok"):
+            print(f"{r['ticker']:<8}{r['horizonte']:>6}d{'-':>8}{'-':>9}  FALLÓ")
+            continue
+        estado = "reentrenado" if r["reentrenado"] else "reutilizado"
+        print(f"{r['ticker']:<8}{r['horizonte']:>6}d{r['filas']:>8}{r['segundos']:>9.2f}  "
+              f"{estado} ({r['version_modelo']}, pid {r['pid']})")
+    suma = sum(r.get("segundos", 0) for r in resultados)
+    print(f"Features: {segundos_features:.2f}s | Suma de trabajos: {suma:.2f}s | Total: {segundos_totales:.2f}s")
+
+
+if __name__ == "__main__":
+    from datos.snapshot import cargar_snapshot
+    snapshot = cargar_snapshot()
+    planificar_entrenamiento(["AAPL"], snapshot=snapshot)
@@ -13,8 +13,12 @@ if parent_dir not in sys.path:
 
 # Ahora podemos importar nuestros gestores de datos
 try:
-    from datos import gestor_aapl
-    from datos import gestor_smh
+    from datos import snapshot as snapshot_datos
+    from modelo.registro_features import (
+        registrar_features_par, calcular_features, resolver_orden, historial_minimo,
+        tickers_requeridos, REGISTRO_FEATURES
+    )
+    from modelo import almacen_features
 except ImportError:
     print("Error: No se pudieron importar los gestores desde 'datos/'.")
     print("Asegúrate de que la estructura de carpetas y los __init__.py son correctos.")
@@ -25,93 +29,179 @@ TARGET_PREDICCION = "AAPL"
 FACTOR_PREDICTOR = "SMH"
 # ¡CAMBIO! Eliminamos DIAS_A_PREDECIR = 5 de aquí.
 PERIODO_CORRELACION = 30  # Ventana de 30 días para la correlación móvil
+LAGS_RETORNO = [1, 3, 5, 10]
+# Subir este número al cambiar CÓMO se calcula una feature: invalida el almacén de features
+VERSION_FEATURES = 1
 
-# ¡CAMBIO! Añadimos el argumento (con valor por defecto 5)
-def crear_features_y_target(dias_a_predecir=5):
+# Registramos la receta del par en el registro de features.
+# FEATURES_MODELO es la lista (y el orden) de columnas que usa el modelo.
+FEATURES_MODELO = registrar_features_par(
+    TARGET_PREDICCION, FACTOR_PREDICTOR,
+    lags=LAGS_RETORNO, periodo_correlacion=PERIODO_CORRELACION, ventana_sma=20,
+)
+
+def features_para_par(target, factor):
     """
-    Función principal que carga, combina y procesa todos los datos
-    para crear la tabla de entrenamiento (X) y el objetivo (y).
+    Lista de features del modelo para un par (target, factor) cualquiera:
+    la misma receta que FEATURES_MODELO, registrada con esos tickers.
     """
-    print("[Procesador] Iniciando la creación de features...")
+    if (target, factor) == (TARGET_PREDICCION, FACTOR_PREDICTOR):
+        return FEATURES_MODELO
+    return registrar_features_par(
+        target, factor, lags=LAGS_RETORNO, periodo_correlacion=PERIODO_CORRELACION, ventana_sma=20,
+    )
 
+def _cargar_precios(snapshot=None, tickers_extra=(), target=TARGET_PREDICCION, factor=FACTOR_PREDICTOR):
+    """
+    Carga los precios del target y del factor (y de 'tickers_extra', si
+    alguna feature los necesita) y los combina en un único DataFrame con
+    una columna por ticker. None si algo falla.
+    """
     # --- 1. Cargar Datos Crudos ---
-    print(f"[Procesador] Cargando datos de {TARGET_PREDICCION}...")
-    df_aapl_raw = gestor_aapl.cargar_datos_modelo()
+    print(f"[Procesador] Cargando datos de {target}...")
+    df_target_raw = snapshot_datos.precios_de(snapshot, target)
     
-    print(f"[Procesador] Cargando datos de {FACTOR_PREDICTOR}...")
-    df_smh_raw = gestor_smh.cargar_datos_modelo()
+    print(f"[Procesador] Cargando datos de {factor}...")
+    df_factor_raw = snapshot_datos.precios_de(snapshot, factor)
 
-    if df_aapl_raw is None or df_smh_raw is None:
+    if df_target_raw is None or df_factor_raw is None:
         print("Error fatal: No se pudieron cargar los datos de uno de los gestores.")
-        return None, None
+        return None
 
     # --- 2. Preparar y Combinar ---
     # Solo necesitamos 'Close' (o Adj Close) para los retornos
     # Usaremos 'Adj Close' (Cierre Ajustado) si está, si no 'Close'
-    col_aapl = 'Adj Close' if 'Adj Close' in df_aapl_raw.columns else 'Close'
-    col_smh = 'Adj Close' if 'Adj Close' in df_smh_raw.columns else 'Close'
+    col_target = 'Adj Close' if 'Adj Close' in df_target_raw.columns else 'Close'
+    col_factor = 'Adj Close' if 'Adj Close' in df_factor_raw.columns else 'Close'
 
     # Renombramos y creamos un DataFrame único
-    df = pd.DataFrame(index=df_aapl_raw.index)
-    df['AAPL'] = df_aapl_raw[col_aapl]
-    df['SMH'] = df_smh_raw[col_smh]
+    df = pd.DataFrame(index=df_target_raw.index)
+    df[target] = df_target_raw[col_target]
+    df[factor] = df_factor_raw[col_factor]
+
+    for ticker in tickers_extra:
+        print(f"[Procesador] Cargando datos de {ticker}...")
+        df_raw = snapshot_datos.precios_de(snapshot, ticker)
+        if df_raw is None:
+            print(f"Error fatal: No se pudieron cargar los datos de {ticker}.")
+            return None
+        df[ticker] = df_raw['Adj Close' if 'Adj Close' in df_raw.columns else 'Close']
     
-    # Eliminamos cualquier día en que uno de los dos no haya cotizado
-    df = df.dropna()
+    # Eliminamos cualquier día en que alguno no haya cotizado
+    return df.dropna()
 
+def _calcular_features(df, features=None, usar_almacen=True):
+    """
+    Añade a 'df' (una columna de precios por ticker) las columnas de features pedidas
+    (por defecto, FEATURES_MODELO). Ninguna depende del horizonte.
+    Con 'usar_almacen', una matriz ya calculada para los mismos datos se
+    lee del almacén de features en lugar de recalcularse.
+    """
     # --- 3. Ingeniería de Atributos (Features - X) ---
-    # Convertimos los precios en "Retornos" (% de cambio)
-    # Esto es mucho más útil para el modelo que el precio crudo
-    print("[Procesador] Creando features (Retornos, Correlación, SMA)...")
+    # Convertimos los precios en "Retornos" (% de cambio), correlación
+    # móvil y distancia a la SMA20. Las definiciones viven en
+    # 'registro_features.py': solo se calcula lo que 'features' necesita.
+    features = features or FEATURES_MODELO
+    print(f"[Procesador] Creando {len(features)} features (Retornos, Correlación, SMA)...")
     
-    # a) Retornos (Lags) de AAPL y SMH
-    for lag in [1, 3, 5, 10]:
-        df[f'AAPL_retorno_{lag}d'] = df['AAPL'].pct_change(periods=lag)
-        df[f'SMH_retorno_{lag}d'] = df['SMH'].pct_change(periods=lag)
+    if usar_almacen:
+        tabla = almacen_features.obtener_features(
+            df, features,
+            calcular=calcular_features,
+            definiciones={n: REGISTRO_FEATURES[n] for n in resolver_orden(features)},
+            version=VERSION_FEATURES,
+            calentamiento=historial_minimo(features) - 1,
+        )
+    else:
+        tabla = calcular_features(df, features)
 
-    # b) Correlación Móvil (¡La pista clave!)
-    # Calculamos la correlación de los retornos de 1 día
-    retornos_1d = df['AAPL'].pct_change(1).dropna()
-    retornos_smh_1d = df['SMH'].pct_change(1).dropna()
-    df[f'Correl_AAPL_SMH_{PERIODO_CORRELACION}d'] = retornos_1d.rolling(PERIODO_CORRELACION).corr(retornos_smh_1d)
+    for nombre, serie in tabla.items():
+        df[nombre] = serie
+    return df
 
-    # c) Indicador de Tendencia (Media Móvil)
-    sma_20 = df['AAPL'].rolling(window=20).mean()
-    df['AAPL_vs_SMA20'] = (df['AAPL'] - sma_20) / sma_20 # % de distancia de la media
+def crear_features_multihorizonte(horizontes, snapshot=None, features=None,
+                                  target=TARGET_PREDICCION, factor=FACTOR_PREDICTOR):
+    """
+    Construye la matriz de features UNA sola vez y un target por cada
+    horizonte pedido. Solo el 'shift(-N)' del target depende del
+    horizonte, así que 3 (o 30) horizontes cuestan una sola pasada.
 
-    
-    # --- 4. Creación del Objetivo (Target - y) ---
-    # Queremos predecir: ¿El precio de AAPL será más alto 
-    # en 'DIAS_A_PREDECIR' días de lo que es hoy?
-    
-    # ¡CAMBIO! Usamos el argumento de la función 'dias_a_predecir'
-    print(f"[Procesador] Creando target (y) a {dias_a_predecir} días...")
+    Args:
+        horizontes (list): Días a predecir, ej. HORIZONTES_DE_PREDICCION.
+        snapshot (dict): Snapshot de la ejecución (datos/snapshot.py).
+        features (list): Subconjunto de features a calcular
+            (por defecto FEATURES_MODELO).
+        target, factor: Par de tickers (por defecto AAPL y SMH).
 
-    # Usamos .shift(-N) para "traer" el precio futuro N días a la fila de hoy
-    # ¡CAMBIO! Usamos el argumento de la función 'dias_a_predecir'
-    precio_futuro = df['AAPL'].shift(-dias_a_predecir)
-    
-    # La condición: 1 si el precio futuro es > al precio de hoy, 0 si no
-    df['Target'] = (precio_futuro > df['AAPL']).astype(int)
+    Returns:
+        (X, targets): X con TODAS las filas que tienen features completas
+        (incluida la última, la que se usa para predecir), y
+        targets = {horizonte: (y, mascara)}, ambos alineados con X.
+        'mascara' es True donde el precio futuro ya se conoce: solo esas
+        filas sirven para entrenar o evaluar.
+    """
+    print("[Procesador] Iniciando la creación de features...")
+
+    features = features or features_para_par(target, factor)
+    tickers_extra = [t for t in tickers_requeridos(features) if t not in (target, factor)]
+    df = _cargar_precios(snapshot, tickers_extra, target=target, factor=factor)
+    if df is None:
+        return None, None
+    columnas_precio = list(df.columns)
+
+    df = _calcular_features(df, features)
+
+    # --- 4. Creación del Objetivo (Target - y) ---
+    # Queremos predecir: ¿El precio del target (AAPL) será más alto 
+    # en N días de lo que es hoy?
+    print(f"[Procesador] Creando targets (y) a {', '.join(str(h) for h in horizontes)} días...")
+    precios_futuros = {}
+    for dias in horizontes:
+        # Usamos .shift(-N) para "traer" el precio futuro N días a la fila de hoy
+        precios_futuros[dias] = df[target].shift(-dias)
 
-    
     # --- 5. Limpieza Final ---
-    # Todo este 'rolling' y 'shift' crea valores NaN (vacíos)
-    # al principio y al final del DataFrame.
-    # Debemos eliminarlos para que el modelo solo entrene con datos completos.
+    # El 'rolling' crea valores NaN (vacíos) al principio del DataFrame.
+    # Los eliminamos para que el modelo solo vea filas con features completas.
     print("[Procesador] Limpiando datos (eliminando NaNs)...")
-    df = df.dropna()
-    
-    # Separamos X (las "pistas") de y (la "respuesta")
-    
-    # y (Target): La columna que queremos predecir
-    y = df['Target']
+    columnas_features = [col for col in df.columns if col not in columnas_precio]
+    df = df.dropna(subset=columnas_features)
     
-    # X (Features): TODO lo demás (excepto los precios crudos y el target)
-    columnas_features = [col for col in df.columns if col not in ['AAPL', 'SMH', 'Target']]
+    # X (Features): TODO lo demás (excepto los precios crudos)
     X = df[columnas_features]
 
-    print(f"[Procesador] ¡Listo! Features (X) y Target (y) creados.")
+    targets = {}
+    for dias, precio_futuro in precios_futuros.items():
+        precio_futuro = precio_futuro.loc[X.index]
+        # La condición: 1 si el precio futuro es > al precio de hoy, 0 si no
+        y = (precio_futuro > df[target]).astype(int)
+        # Las últimas N filas aún no tienen precio futuro: su target no es válido
+        mascara = precio_futuro.notna()
+        targets[dias] = (y.rename('Target'), mascara)
+
+    print(f"[Procesador] ¡Listo! Features (X) y {len(targets)} target(s) creados.")
+    return X, targets
+
+# ¡CAMBIO! Añadimos el argumento (con valor por defecto 5)
+def crear_features_y_target(dias_a_predecir=5, snapshot=None, features=None):
+    """
+    Función principal que carga, combina y procesa todos los datos
+    para crear la tabla de entrenamiento (X) y el objetivo (y).
+    Solo devuelve las filas con target válido (precio futuro conocido).
+
+    Args:
+        dias_a_predecir (int): Horizonte del target.
+        snapshot (dict): Snapshot de la ejecución (datos/snapshot.py).
+            Si es None, los precios se cargan de los gestores.
+        features (list): Subconjunto de features (por defecto FEATURES_MODELO).
+    """
+    X, targets = crear_features_multihorizonte([dias_a_predecir], snapshot=snapshot, features=features)
+    if X is None:
+        return None, None
+
+    # Separamos X (las "pistas") de y (la "respuesta")
+    y, mascara = targets[dias_a_predecir]
+    X, y = X[mascara], y[mascara]
+
     print(f"Total de muestras de entrenamiento: {len(X)}")
-    
-    return X, y
\ No newline at end of file
+    return X, y
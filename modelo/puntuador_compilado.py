@@ -0,0 +1,216 @@
+import os
+import sys
+import json
+import math
+import threading
+
+import numpy as np
+
+# --- Configuración de Ruta (Path) ---
+script_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.abspath(os.path.join(script_dir, os.pardir))
+if parent_dir not in sys.path:
+    sys.path.append(parent_dir)
+# --- Fin de Configuración ---
+
+# Puntuador compilado para una fila (o un lote chico).
+# modelo.predict() + modelo.predict_proba() sobre un DataFrame de 1 fila
+# son dos viajes por el wrapper de sklearn (validación de columnas,
+# DMatrix, etc.) para puntuar UN vector. Acá los árboles de TODOS los
+# horizontes se exportan (booster.save_raw('json')) a arrays planos de
+# NumPy y se puntúan juntos:
+#
+# 1. Se decide la dirección de TODOS los nodos internos a la vez:
+#    d = fila[feature] >= umbral. Los nodos están ordenados por feature,
+#    así que fila[feature] es un np.repeat (mucho más barato que un take).
+# 2. siguiente = izq + d * delta (delta = der - izq) para todos los nodos.
+# 3. Desde las raíces, cada nivel es un único 'take': nodos = siguiente[nodos].
+#    Las hojas menos profundas se alargan con nodos "de paso" (umbral +inf,
+#    siempre a la izquierda) para que todas queden a la misma profundidad.
+# 4. La suma de las hojas de cada horizonte más su base_score (en logit)
+#    es el margen; la probabilidad es su sigmoide.
+#
+# Son ~10 llamadas a NumPy por fila, sin importar cuántos árboles haya.
+# Igual que XGBoost, se compara en float32 y un NaN va por 'default_left'.
+
+
+def _margen_base(learner: dict):
+    """base_score del modelo (probabilidad) convertido a margen (logit)."""
+    objetivo = learner["objective"]["name"]
+    if objetivo not in ("binary:logistic", "reg:logistic"):
+        raise ValueError(f"Objetivo no soportado por el puntuador compilado: {objetivo}")
+    texto = learner["learner_model_param"]["base_score"].strip("[]")
+    p = float(texto.split(",")[0])
+    return float(np.log(p / (1.0 - p)))
+
+def _arboles_de(booster):
+    """(árboles del JSON, margen base, nombres de features) de un Booster o XGBClassifier."""
+    if hasattr(booster, "get_booster"):
+        booster = booster.get_booster()
+    modelo = json.loads(booster.save_raw("json"))
+    learner = modelo["learner"]
+    arboles = learner["gradient_booster"]["model"]["trees"]
+    # Si hubo early stopping, XGBoost predice solo hasta la mejor iteración
+    mejor = booster.attr("best_iteration")
+    if mejor is not None:
+        arboles = arboles[: int(mejor) + 1]
+    return arboles, _margen_base(learner), learner.get("feature_names") or None
+
+
+class PuntuadorCompilado:
+    """
+    Árboles de varios modelos (uno por horizonte) en arrays planos.
+
+    Uso:
+        puntuador = PuntuadorCompilado({1: modelo_1d, 5: modelo_5d, 21: modelo_21d})
+        clases, probabilidades = puntuador.puntuar(fila)   # fila: (F,) o (B, F)
+    """
+
+    def __init__(self, modelos: dict):
+        self.horizontes = sorted(modelos)
+        self.features = None
+        por_horizonte, margen_base = [], []
+        for h in self.horizontes:
+            arboles, base, nombres = _arboles_de(modelos[h])
+            if nombres is not None:
+                if self.features is not None and nombres != self.features:
+                    raise ValueError(f"El modelo de {h}d usa otras features que los demás horizontes.")
+                self.features = nombres
+            por_horizonte.append(arboles)
+            margen_base.append(base)
+
+        todos = [a for arboles in por_horizonte for a in arboles]
+        self.profundidad = max(1, max((_profundidad(a) for a in todos), default=1))
+        self.inicio_horizonte = np.cumsum([0] + [len(a) for a in por_horizonte[:-1]]).astype(np.intp)
+        self.margen_base = np.asarray(margen_base, dtype=np.float64)
+        self._compilar(todos)
+
+    def _compilar(self, arboles):
+        # Nodos internos: (feature, umbral, ref_izq, ref_der, default_izq).
+        # Una ref es ('nodo', i) o ('hoja', j); se resuelven al final.
+        internos, valores, raices = [], [], []
+
+        def agregar(arbol, n, nivel):
+            """Agrega el subárbol de 'n' (a 'nivel' de la raíz) y devuelve su ref."""
+            izq, der = arbol["left_children"][n], arbol["right_children"][n]
+            if nivel == self.profundidad:
+                valores.append(arbol["split_conditions"][n])
+                return ("hoja", len(valores) - 1)
+            i = len(internos)
+            internos.append(None)
+            if izq == -1:
+                # Hoja poco profunda: nodo de paso hacia sí misma un nivel más abajo
+                hijo = agregar(arbol, n, nivel + 1)
+                internos[i] = (0, np.inf, hijo, hijo, True)
+            else:
+                internos[i] = (
+                    arbol["split_indices"][n], arbol["split_conditions"][n],
+                    agregar(arbol, izq, nivel + 1), agregar(arbol, der, nivel + 1),
+                    bool(arbol["default_left"][n]),
+                )
+            return ("nodo", i)
+
+        for arbol in arboles:
+            raices.append(agregar(arbol, 0, 0)[1])
+
+        # Orden: primero los nodos reales, agrupados por feature (así
+        # fila[feature] es np.repeat(fila, conteos)); al final los de paso,
+        # cuyo siguiente nodo no depende de la fila.
+        orden = sorted(range(len(internos)), key=lambda i: (internos[i][1] == np.inf, internos[i][0]))
+        nuevo_id = np.empty(len(internos), dtype=np.int64)
+        nuevo_id[orden] = np.arange(len(internos))
+
+        def resolver(ref):
+            tipo, i = ref
+            return int(nuevo_id[i]) if tipo == "nodo" else i
+
+        izq = np.array([resolver(internos[i][2]) for i in orden], dtype=np.int32)
+        der = np.array([resolver(internos[i][3]) for i in orden], dtype=np.int32)
+        n = sum(1 for i in orden if internos[i][1] != np.inf)
+        self.n_reales = n
+        feature = np.array([internos[i][0] for i in orden[:n]], dtype=np.intp)
+        self.umbral = np.array([internos[i][1] for i in orden[:n]], dtype=np.float32)
+        self.izq = izq[:n]
+        self.delta = der[:n] - izq[:n]
+        self.hijo_por_defecto = np.where([internos[i][4] for i in orden[:n]], izq[:n], der[:n]).astype(np.int32)
+        # Siguiente nodo de todos los internos; la cola (nodos de paso) es fija
+        self.plantilla_siguiente = izq
+        self.n_features = len(self.features) if self.features is not None else int(feature.max(initial=0)) + 1
+        self.conteos = np.bincount(feature, minlength=self.n_features)
+        self.valor = np.asarray(valores, dtype=np.float64)
+        self.raices = nuevo_id[raices].astype(np.intp)
+        # Un 'siguiente' por hilo (el servicio HTTP puntúa en paralelo, un hilo
+        # por conexión); threading.local lo libera cuando el hilo termina
+        self._buffers = threading.local()
+
+    @property
+    def n_arboles(self):
+        return len(self.raices)
+
+    def _buffer(self):
+        buffer = getattr(self._buffers, "siguiente", None)
+        if buffer is None:
+            completo = self.plantilla_siguiente.copy()
+            buffer = (completo, completo[:self.n_reales], np.empty(self.n_reales, dtype=np.int32))
+            self._buffers.siguiente = buffer
+        return buffer
+
+    def _margenes_fila(self, fila):
+        siguiente, reales, temporal = self._buffer()
+        x = np.repeat(fila, self.conteos)
+        np.multiply(x >= self.umbral, self.delta, out=temporal)
+        np.add(self.izq, temporal, out=reales)
+        if math.isnan(fila.sum()):
+            np.copyto(reales, self.hijo_por_defecto, where=np.isnan(x))
+        nodos = self.raices
+        for _ in range(self.profundidad):
+            nodos = siguiente.take(nodos)
+        return np.add.reduceat(self.valor.take(nodos), self.inicio_horizonte) + self.margen_base
+
+    def margenes(self, X):
+        """Margen (logit) por horizonte: (H,) para una fila, (B, H) para un lote."""
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            return self._margenes_fila(X)
+        x = np.repeat(X, self.conteos, axis=1)
+        reales = self.izq + np.multiply(x >= self.umbral, self.delta, dtype=np.int32)
+        if np.isnan(X).any():
+            reales = np.where(np.isnan(x), self.hijo_por_defecto, reales)
+        paso = self.plantilla_siguiente[self.n_reales:]
+        siguiente = np.concatenate([reales, np.broadcast_to(paso, (len(X), len(paso)))], axis=1)
+        nodos = np.broadcast_to(self.raices, (len(X), self.n_arboles))
+        for _ in range(self.profundidad):
+            nodos = np.take_along_axis(siguiente, nodos, axis=1)
+        return np.add.reduceat(self.valor[nodos], self.inicio_horizonte, axis=1) + self.margen_base
+
+    def puntuar(self, X):
+        """
+        (clases, probabilidades de 'Sube') de todos los horizontes en una
+        sola pasada. Las formas son (H,) para una fila y (B, H) para un lote,
+        en el orden de self.horizontes.
+        """
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            # Con H = 3 valores, math le gana a las ufuncs de NumPy
+            margenes = self._margenes_fila(X).tolist()
+            probabilidades = np.array([1.0 / (1.0 + math.exp(-m)) for m in margenes])
+        else:
+            probabilidades = np.reciprocal(1.0 + np.exp(-self.margenes(X)))
+        return (probabilidades > 0.5).view(np.int8), probabilidades
+
+    def puntuar_dict(self, fila):
+        """{horizonte: (clase, probabilidad)} para una fila."""
+        clases, probabilidades = self.puntuar(fila)
+        return {h: (int(c), float(p)) for h, c, p in zip(self.horizontes, clases, probabilidades)}
+
+
+def _profundidad(arbol):
+    """Profundidad (en divisiones) del árbol: niveles a recorrer hasta la hoja más honda."""
+    izquierdos, derechos = arbol["left_children"], arbol["right_children"]
+    profundidad, nivel = 0, [0]
+    while True:
+        siguiente = [h for n in nivel for h in (izquierdos[n], derechos[n]) if h != -1]
+        if not siguiente:
+            return profundidad
+        profundidad += 1
+        nivel = siguiente
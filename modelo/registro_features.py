@@ -0,0 +1,189 @@
+import math
+
+import pandas as pd
+
+# Registro declarativo de features.
+# Cada feature declara sus entradas (otros nodos), su 'lookback' (barras
+# extra que necesita de sus entradas) y sus parámetros. El motor resuelve
+# el grafo de dependencias, comparte los intermedios (ej. un único retorno
+# de 1 día alimenta el lag 1 y la correlación) y calcula SOLO lo que pide
+# la lista de features de un modelo.
+#
+# Los nodos de precio se llaman 'precio:<TICKER>' y salen directamente
+# de las columnas del DataFrame de precios.
+
+PREFIJO_PRECIO = "precio:"
+
+
+class DefinicionFeature:
+    """Un nodo del grafo: cómo calcular una serie a partir de sus entradas."""
+
+    def __init__(self, nombre, entradas, funcion, lookback=0, intermedia=False, **parametros):
+        self.nombre = nombre
+        self.entradas = list(entradas)
+        self.funcion = funcion
+        self.lookback = lookback
+        self.intermedia = intermedia
+        self.parametros = parametros
+
+    def calcular(self, *series):
+        return self.funcion(*series, **self.parametros)
+
+    def __repr__(self):
+        return f"DefinicionFeature({self.nombre!r}, entradas={self.entradas}, lookback={self.lookback})"
+
+
+# Nombre -> DefinicionFeature
+REGISTRO_FEATURES = {}
+
+def registrar_feature(nombre, entradas, funcion, lookback=0, intermedia=False, **parametros):
+    """Añade (o reemplaza) una feature en el registro y la devuelve."""
+    definicion = DefinicionFeature(nombre, entradas, funcion, lookback, intermedia, **parametros)
+    REGISTRO_FEATURES[nombre] = definicion
+    return definicion
+
+
+# --- Funciones de cálculo (pandas) ---
+
+def _retorno(precio, periodos):
+    return precio.pct_change(periods=periodos)
+
+def _identidad(serie):
+    return serie
+
+def _correlacion_movil(x, y, ventana):
+    # Igual que en la receta original: correlación sobre los retornos sin NaN
+    return x.dropna().rolling(ventana).corr(y.dropna())
+
+def _distancia_sma(precio, ventana):
+    sma = precio.rolling(window=ventana).mean()
+    return (precio - sma) / sma # % de distancia de la media
+
+
+def registrar_features_par(target, factor, lags=(1, 3, 5, 10), periodo_correlacion=30, ventana_sma=20):
+    """
+    Registra la receta de features de un par (target, factor) y devuelve
+    la lista de nombres de salida, en el orden de columnas del modelo.
+    """
+    precio_t, precio_f = f"{PREFIJO_PRECIO}{target}", f"{PREFIJO_PRECIO}{factor}"
+    ret1_t, ret1_f = f"retorno_1d:{target}", f"retorno_1d:{factor}"
+
+    # Intermedios compartidos
+    registrar_feature(ret1_t, [precio_t], _retorno, lookback=1, intermedia=True, periodos=1)
+    registrar_feature(ret1_f, [precio_f], _retorno, lookback=1, intermedia=True, periodos=1)
+
+    nombres = []
+    for lag in lags:
+        for ticker, precio, ret1 in ((target, precio_t, ret1_t), (factor, precio_f, ret1_f)):
+            nombre = f"{ticker}_retorno_{lag}d"
+            if lag == 1:
+                registrar_feature(nombre, [ret1], _identidad)
+            else:
+                registrar_feature(nombre, [precio], _retorno, lookback=lag, periodos=lag)
+            nombres.append(nombre)
+
+    nombre = f"Correl_{target}_{factor}_{periodo_correlacion}d"
+    registrar_feature(nombre, [ret1_t, ret1_f], _correlacion_movil,
+                      lookback=periodo_correlacion - 1, ventana=periodo_correlacion)
+    nombres.append(nombre)
+
+    nombre = f"{target}_vs_SMA{ventana_sma}"
+    registrar_feature(nombre, [precio_t], _distancia_sma, lookback=ventana_sma - 1, ventana=ventana_sma)
+    nombres.append(nombre)
+    return nombres
+
+
+# --- Resolución del Grafo ---
+
+def _definicion(nombre):
+    if nombre not in REGISTRO_FEATURES:
+        raise KeyError(f"Feature no registrada: {nombre}")
+    return REGISTRO_FEATURES[nombre]
+
+def resolver_orden(nombres):
+    """
+    Orden topológico de todos los nodos necesarios para 'nombres'
+    (sin los nodos de precio). Lanza ValueError si hay un ciclo.
+    """
+    orden, visitados, en_curso = [], set(), set()
+
+    def visitar(nombre):
+        if nombre.startswith(PREFIJO_PRECIO) or nombre in visitados:
+            return
+        if nombre in en_curso:
+            raise ValueError(f"Ciclo de dependencias en la feature: {nombre}")
+        en_curso.add(nombre)
+        for entrada in _definicion(nombre).entradas:
+            visitar(entrada)
+        en_curso.discard(nombre)
+        visitados.add(nombre)
+        orden.append(nombre)
+
+    for nombre in nombres:
+        visitar(nombre)
+    return orden
+
+def tickers_requeridos(nombres):
+    """Tickers cuyos precios hacen falta para calcular 'nombres'."""
+    tickers = []
+    for nombre in resolver_orden(nombres):
+        for entrada in _definicion(nombre).entradas:
+            if entrada.startswith(PREFIJO_PRECIO):
+                ticker = entrada[len(PREFIJO_PRECIO):]
+                if ticker not in tickers:
+                    tickers.append(ticker)
+    return tickers
+
+def calentamiento(nombre, _memo=None):
+    """
+    Barras de historia que necesita 'nombre' antes de su primer valor
+    válido: su lookback más el mayor calentamiento de sus entradas.
+    """
+    _memo = {} if _memo is None else _memo
+    if nombre.startswith(PREFIJO_PRECIO):
+        return 0
+    if nombre not in _memo:
+        definicion = _definicion(nombre)
+        _memo[nombre] = definicion.lookback + max(
+            (calentamiento(e, _memo) for e in definicion.entradas), default=0
+        )
+    return _memo[nombre]
+
+def historial_minimo(nombres, filas=1):
+    """Barras que hay que cargar para obtener 'filas' filas completas de 'nombres'."""
+    memo = {}
+    return max(calentamiento(n, memo) for n in nombres) + filas
+
+# Períodos aceptados por yfinance, de menor a mayor, con su largo aproximado en barras diarias
+PERIODOS_YFINANCE = [("5d", 5), ("1mo", 21), ("3mo", 63), ("6mo", 126), ("1y", 252),
+                     ("2y", 504), ("5y", 1260), ("10y", 2520)]
+
+def periodo_minimo(nombres, filas=1):
+    """El período de yfinance más corto que cubre 'historial_minimo' (con holgura por feriados)."""
+    barras = math.ceil(historial_minimo(nombres, filas) * 1.05)
+    for periodo, barras_periodo in PERIODOS_YFINANCE:
+        if barras_periodo >= barras:
+            return periodo
+    return "max"
+
+
+# --- Cálculo ---
+
+def calcular_features(df_precios: pd.DataFrame, nombres):
+    """
+    Calcula las features 'nombres' sobre 'df_precios' (una columna por
+    ticker). Cada nodo del grafo se calcula una sola vez.
+    Devuelve un DataFrame con las columnas en el orden de 'nombres'.
+    """
+    calculadas = {}
+
+    def valor(nombre):
+        if nombre.startswith(PREFIJO_PRECIO):
+            return df_precios[nombre[len(PREFIJO_PRECIO):]]
+        return calculadas[nombre]
+
+    for nombre in resolver_orden(nombres):
+        definicion = REGISTRO_FEATURES[nombre]
+        calculadas[nombre] = definicion.calcular(*(valor(e) for e in definicion.entradas))
+
+    return pd.DataFrame({n: valor(n) for n in nombres}, index=df_precios.index)
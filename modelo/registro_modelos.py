@@ -0,0 +1,256 @@
+import os
+import sys
+import json
+import time
+import hashlib
+import tempfile
+import contextlib
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+
+# --- Configuración de Ruta (Path) ---
+script_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.abspath(os.path.join(script_dir, os.pardir))
+if parent_dir not in sys.path:
+    sys.path.append(parent_dir)
+# --- Fin de Configuración ---
+
+try:
+    from modelo.gestor_modelo import entrenar_y_evaluar, HIPERPARAMETROS_MODELO
+    from modelo.procesador_features import TARGET_PREDICCION, VERSION_FEATURES
+except ImportError:
+    print("Error: No se pudieron importar los módulos de 'modelo/'.")
+    sys.exit(1)
+
+# Registro de modelos entrenados.
+# Cada modelo se guarda en el formato binario nativo de XGBoost (.ubj)
+# junto a un JSON de metadatos: horizonte, features, huella de los datos,
+# ventana de entrenamiento, métricas e hiperparámetros. Una ejecución
+# reutiliza el modelo guardado mientras no esté "obsoleto" según la
+# política; así una predicción diaria es cargar + puntuar, no 3 entrenamientos.
+
+DIRECTORIO_MODELOS = os.environ.get(
+    "MODELO_DIR_MODELOS", os.path.join(script_dir, "modelos_guardados")
+)
+
+# --- Política de Obsolescencia ---
+POLITICA_OBSOLESCENCIA = {
+    "max_barras_nuevas": 5,   # Reentrenar si hay más barras nuevas que esto desde el entrenamiento
+    "max_dias_antiguedad": 7, # Reentrenar si el modelo tiene más de N días
+}
+DECIMALES_HUELLA = 8  # Redondeo antes del hash: ignora diferencias de último bit
+ESPERA_BLOQUEO = 60   # Segundos: un .lock más viejo que esto quedó huérfano (proceso caído)
+
+
+def _nombre_base(ticker, horizonte):
+    return os.path.join(DIRECTORIO_MODELOS, f"{ticker.upper()}_{horizonte}d")
+
+@contextlib.contextmanager
+def _bloqueo(base):
+    """
+    Bloqueo entre procesos de un (ticker, horizonte): un archivo .lock
+    creado en exclusiva. Así dos escritores (ej. el demonio y un
+    'cli.py entrenar') no publican un .ubj de uno con el .json del otro.
+    """
+    ruta = f"{base}.lock"
+    limite = time.monotonic() + ESPERA_BLOQUEO
+    while True:
+        try:
+            os.close(os.open(ruta, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            break
+        except FileExistsError:
+            try:
+                huerfano = time.time() - os.path.getmtime(ruta) > ESPERA_BLOQUEO
+            except FileNotFoundError:
+                continue  # Lo acaban de liberar
+            if huerfano or time.monotonic() > limite:
+                print(f"[Registro Modelos] Aviso: se descarta el bloqueo {ruta}")
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(ruta)
+                continue
+            time.sleep(0.05)
+    try:
+        yield
+    finally:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(ruta)
+
+def _temporal(base, extension):
+    """Ruta temporal única junto al destino (el os.replace queda en el mismo disco)."""
+    fd, ruta = tempfile.mkstemp(dir=os.path.dirname(base), prefix=f"{os.path.basename(base)}.",
+                                suffix=f".tmp.{extension}")
+    os.close(fd)
+    return ruta
+
+def huella_matriz(X: pd.DataFrame):
+    """Hash de una matriz de features (fechas, columnas y valores redondeados)."""
+    h = hashlib.sha256()
+    h.update(np.ascontiguousarray(X.index.as_unit('ns').asi8).tobytes())
+    h.update("|".join(map(str, X.columns)).encode())
+    h.update(np.ascontiguousarray(X.to_numpy(dtype=np.float64).round(DECIMALES_HUELLA)).tobytes())
+    return h.hexdigest()
+
+
+def guardar_modelo(modelo, metadatos: dict):
+    """Guarda el booster y sus metadatos. Devuelve los metadatos completos (con la versión)."""
+    os.makedirs(DIRECTORIO_MODELOS, exist_ok=True)
+    base = _nombre_base(metadatos["ticker"], metadatos["horizonte"])
+    metadatos = dict(metadatos)
+    metadatos.setdefault("entrenado_en", datetime.now().isoformat(timespec="seconds"))
+    metadatos.setdefault(
+        "version_modelo",
+        f"{metadatos['ticker']}_{metadatos['horizonte']}d_{datetime.now():%Y%m%d%H%M%S}",
+    )
+
+    # Escribimos a temporales (nombres únicos) y renombramos: un lector nunca
+    # ve un modelo a medias. El bloqueo mantiene el par .ubj/.json consistente.
+    tmp_ubj, tmp_json = _temporal(base, "ubj"), _temporal(base, "json")
+    try:
+        modelo.save_model(tmp_ubj)
+        with open(tmp_json, "w", encoding="utf-8") as f:
+            json.dump(metadatos, f, indent=2)
+        with _bloqueo(base):
+            os.replace(tmp_ubj, f"{base}.ubj")
+            os.replace(tmp_json, f"{base}.json")
+    finally:
+        for ruta in (tmp_ubj, tmp_json):
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(ruta)
+    print(f"[Registro Modelos] Guardado {metadatos['version_modelo']}")
+    return metadatos
+
+def leer_metadatos(ticker, horizonte):
+    ruta = f"{_nombre_base(ticker, horizonte)}.json"
+    if not os.path.exists(ruta):
+        return None
+    with open(ruta, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def actualizar_metadatos(ticker, horizonte, **campos):
+    """Añade o cambia campos en los metadatos de un modelo (ej. el resultado de una búsqueda)."""
+    os.makedirs(DIRECTORIO_MODELOS, exist_ok=True)
+    base = _nombre_base(ticker, horizonte)
+    # Leer-modificar-escribir bajo el bloqueo: no pisa un guardado simultáneo
+    with _bloqueo(base):
+        metadatos = leer_metadatos(ticker, horizonte) or {"ticker": ticker.upper(), "horizonte": horizonte}
+        metadatos.update(campos)
+        tmp_json = _temporal(base, "json")
+        try:
+            with open(tmp_json, "w", encoding="utf-8") as f:
+                json.dump(metadatos, f, indent=2)
+            os.replace(tmp_json, f"{base}.json")
+        finally:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(tmp_json)
+    return metadatos
+
+def cargar_modelo(ticker, horizonte):
+    """Devuelve (XGBClassifier, metadatos) o (None, None) si no hay modelo guardado."""
+    base = _nombre_base(ticker, horizonte)
+    metadatos = leer_metadatos(ticker, horizonte)
+    if metadatos is None or not os.path.exists(f"{base}.ubj"):
+        return None, metadatos
+    modelo = xgb.XGBClassifier()
+    modelo.load_model(f"{base}.ubj")
+    return modelo, metadatos
+
+def listar_modelos():
+    """Metadatos de todos los modelos guardados."""
+    if not os.path.isdir(DIRECTORIO_MODELOS):
+        return []
+    modelos = []
+    for archivo in sorted(os.listdir(DIRECTORIO_MODELOS)):
+        if archivo.endswith(".json") and ".tmp." not in archivo:
+            with open(os.path.join(DIRECTORIO_MODELOS, archivo), "r", encoding="utf-8") as f:
+                modelos.append(json.load(f))
+    return modelos
+
+
+def hiperparametros_de(ticker, horizonte):
+    """
+    Hiperparámetros a usar para (ticker, horizonte): los por defecto,
+    reemplazados por los que haya guardado una búsqueda en los metadatos.
+    """
+    metadatos = leer_metadatos(ticker, horizonte) or {}
+    return {**HIPERPARAMETROS_MODELO, **metadatos.get("mejores_hiperparametros", {})}
+
+def motivo_obsolescencia(metadatos, X: pd.DataFrame, hiperparametros: dict, politica=None):
+    """
+    Devuelve por qué hay que reentrenar (texto) o None si el modelo sirve.
+    'X' son las filas de entrenamiento disponibles hoy.
+    """
+    politica = {**POLITICA_OBSOLESCENCIA, **(politica or {})}
+    if metadatos is None or "fin_entrenamiento" not in metadatos:
+        return "no hay modelo guardado"
+    if metadatos.get("features") != list(X.columns):
+        return "cambió la lista de features"
+    if metadatos.get("version_features") != VERSION_FEATURES:
+        return "cambió la versión de las features"
+    if metadatos.get("hiperparametros") != hiperparametros:
+        return "cambiaron los hiperparámetros"
+
+    fin = pd.Timestamp(metadatos["fin_entrenamiento"])
+    anteriores = X[X.index <= fin]
+    if len(anteriores) != metadatos.get("filas") or huella_matriz(anteriores) != metadatos.get("huella_datos"):
+        return "cambiaron los datos ya usados (ej. re-ajuste por split/dividendo)"
+
+    nuevas = int((X.index > fin).sum())
+    if nuevas > politica["max_barras_nuevas"]:
+        return f"hay {nuevas} barras nuevas (máximo {politica['max_barras_nuevas']})"
+
+    antiguedad = (datetime.now() - datetime.fromisoformat(metadatos["entrenado_en"])).days
+    if antiguedad > politica["max_dias_antiguedad"]:
+        return f"el modelo tiene {antiguedad} días"
+    return None
+
+def obtener_o_entrenar(dias_a_predecir, X, y, ticker=TARGET_PREDICCION, politica=None, forzar=False,
+                       n_jobs=None, matriz=None):
+    """
+    Devuelve (modelo, metadatos) para el horizonte pedido: el guardado si
+    sigue vigente, o uno recién entrenado (y guardado) si no.
+
+    Args:
+        X, y: Filas de entrenamiento (con target válido).
+        forzar: Reentrena siempre.
+        n_jobs: Hilos de XGBoost para este entrenamiento (ver
+            planificador_entrenamiento).
+        matriz: MatrizCuantizada compartida entre horizontes (opcional).
+    """
+    hiperparametros = hiperparametros_de(ticker, dias_a_predecir)
+    modelo, metadatos = cargar_modelo(ticker, dias_a_predecir)
+    motivo = "entrenamiento forzado" if forzar else motivo_obsolescencia(metadatos, X, hiperparametros, politica)
+
+    if modelo is not None and motivo is None:
+        print(f"[Registro Modelos] Reutilizando {metadatos['version_modelo']} (sigue vigente).")
+        return modelo, metadatos
+
+    print(f"[Registro Modelos] Entrenando {ticker} {dias_a_predecir}d: {motivo}.")
+    inicio = time.perf_counter()
+    modelo, metricas = entrenar_y_evaluar(
+        X, y, dias_a_predecir, hiperparametros=hiperparametros, n_jobs=n_jobs, matriz=matriz,
+    )
+    if modelo is None:
+        return None, None
+
+    anteriores = metadatos or {}
+    metadatos = {
+        "ticker": ticker.upper(),
+        "horizonte": dias_a_predecir,
+        "features": list(X.columns),
+        "version_features": VERSION_FEATURES,
+        "hiperparametros": hiperparametros,
+        "huella_datos": huella_matriz(X),
+        "inicio_entrenamiento": X.index[0].strftime('%Y-%m-%d'),
+        "fin_entrenamiento": X.index[-1].strftime('%Y-%m-%d'),
+        "filas": int(len(X)),
+        "metricas": metricas,
+        "segundos_entrenamiento": round(time.perf_counter() - inicio, 3),
+    }
+    # Conservamos el resultado de una búsqueda de hiperparámetros previa
+    if "mejores_hiperparametros" in anteriores:
+        metadatos["mejores_hiperparametros"] = anteriores["mejores_hiperparametros"]
+        metadatos["busqueda"] = anteriores.get("busqueda")
+    return modelo, guardar_modelo(modelo, metadatos)
@@ -0,0 +1,201 @@
+import os
+import sys
+import sqlite3
+import threading
+from datetime import datetime
+from contextlib import closing
+
+import pandas as pd
+
+# --- Configuración de Ruta (Path) ---
+script_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.abspath(os.path.join(script_dir, os.pardir))
+if parent_dir not in sys.path:
+    sys.path.append(parent_dir)
+# --- Fin de Configuración ---
+
+# Almacén de predicciones (SQLite).
+# Reemplaza el append al CSV: una fila por (ticker, fecha del último
+# cierre, horizonte, versión del modelo), con tipos de verdad (la
+# confianza es un número entre 0 y 1, no el texto "54.49%").
+# - Volver a correr el mismo día con el mismo modelo ACTUALIZA la fila
+#   (upsert) en lugar de duplicarla.
+# - La clave primaria sirve para buscar por ticker (y fecha); un índice
+#   aparte sirve para buscar por fecha sin importar el ticker.
+# - Modo WAL: los lectores no bloquean a los escritores, y varios
+#   procesos pueden escribir a la vez (cada escritura es una transacción
+#   corta; si la base está ocupada se espera, no se falla).
+
+RUTA_ALMACEN_PREDICCIONES = os.environ.get(
+    "MODELO_RUTA_PREDICCIONES", os.path.join(script_dir, "predicciones.sqlite")
+)
+RUTA_CSV_HEREDADO = os.path.join(script_dir, "registro_predicciones.csv")
+SEGUNDOS_ESPERA_BLOQUEO = 30  # Cuánto espera un escritor si otro tiene la base tomada
+VERSION_DESCONOCIDA = "desconocida"  # Filas importadas del CSV (no guardaba la versión del modelo)
+
+COLUMNAS = [
+    "ticker", "fecha_ultimo_cierre", "horizonte", "version_modelo",
+    "fecha_prediccion", "precio_ultimo_cierre", "prediccion", "probabilidad_sube", "confianza",
+]
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS predicciones (
+    ticker               TEXT    NOT NULL,
+    fecha_ultimo_cierre  TEXT    NOT NULL,  -- AAAA-MM-DD
+    horizonte            INTEGER NOT NULL,
+    version_modelo       TEXT    NOT NULL,
+    fecha_prediccion     TEXT    NOT NULL,
+    precio_ultimo_cierre REAL,
+    prediccion           INTEGER NOT NULL CHECK (prediccion IN (0, 1)),
+    probabilidad_sube    REAL    CHECK (probabilidad_sube BETWEEN 0 AND 1),
+    confianza            REAL    NOT NULL CHECK (confianza BETWEEN 0 AND 1),
+    actualizado_en       TEXT    NOT NULL,
+    PRIMARY KEY (ticker, fecha_ultimo_cierre, horizonte, version_modelo)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_predicciones_fecha ON predicciones (fecha_ultimo_cierre, ticker);
+"""
+
+_UPSERT = f"""
+INSERT INTO predicciones ({", ".join(COLUMNAS)}, actualizado_en)
+VALUES ({", ".join("?" * (len(COLUMNAS) + 1))})
+ON CONFLICT (ticker, fecha_ultimo_cierre, horizonte, version_modelo) DO UPDATE SET
+    fecha_prediccion = excluded.fecha_prediccion,
+    precio_ultimo_cierre = excluded.precio_ultimo_cierre,
+    prediccion = excluded.prediccion,
+    probabilidad_sube = excluded.probabilidad_sube,
+    confianza = excluded.confianza,
+    actualizado_en = excluded.actualizado_en
+"""
+
+
+# (ruta, esquema) ya preparados por este proceso: cada lectura abre su
+# conexión y no tiene por qué repetir el CREATE ni el cambio a WAL
+_PREPARADAS = set()
+_CANDADO_PREPARADAS = threading.Lock()
+
+def conectar(ruta=None, esquema_adicional=None):
+    """
+    Conexión con espera por bloqueo. La primera vez por ruta (en cada
+    proceso) pasa la base a WAL, que queda guardado en el archivo, y crea
+    el esquema (y 'esquema_adicional', ej. el de conciliacion).
+    """
+    ruta = os.path.abspath(ruta or RUTA_ALMACEN_PREDICCIONES)
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    with _CANDADO_PREPARADAS:
+        if not os.path.exists(ruta):
+            # Base nueva (o borrada desde la última vez): hay que prepararla de nuevo
+            _PREPARADAS.difference_update({p for p in _PREPARADAS if p[0] == ruta})
+        pendientes = [e for e in (_ESQUEMA, esquema_adicional) if e and (ruta, e) not in _PREPARADAS]
+    conexion = sqlite3.connect(ruta, timeout=SEGUNDOS_ESPERA_BLOQUEO, isolation_level=None)
+    conexion.execute(f"PRAGMA busy_timeout = {SEGUNDOS_ESPERA_BLOQUEO * 1000}")
+    conexion.execute("PRAGMA synchronous = NORMAL")  # Con WAL sigue siendo seguro ante cortes del proceso
+    if pendientes:
+        if _ESQUEMA in pendientes:
+            conexion.execute("PRAGMA journal_mode = WAL")
+        for esquema in pendientes:
+            conexion.executescript(esquema)
+        with _CANDADO_PREPARADAS:
+            _PREPARADAS.update((ruta, e) for e in pendientes)
+    return conexion
+
+def _fila(p: dict, ahora: str):
+    confianza = float(p["confianza"])
+    prob = p.get("probabilidad_sube")
+    if prob is None or pd.isna(prob):
+        # La confianza es la probabilidad de la clase predicha
+        prob = confianza if int(p["prediccion"]) == 1 else 1 - confianza
+    precio = p.get("precio_ultimo_cierre")
+    return (
+        str(p["ticker"]).upper(),
+        pd.Timestamp(p["fecha_ultimo_cierre"]).strftime("%Y-%m-%d"),
+        int(p["horizonte"]),
+        str(p.get("version_modelo") or VERSION_DESCONOCIDA),
+        pd.Timestamp(p.get("fecha_prediccion") or ahora).strftime("%Y-%m-%d"),
+        None if precio is None or pd.isna(precio) else float(precio),
+        int(p["prediccion"]),
+        float(prob),
+        confianza,
+        ahora,
+    )
+
+def guardar_predicciones(predicciones, ruta=None):
+    """
+    Guarda (upsert) predicciones: lista de dicts o DataFrame con las
+    COLUMNAS (probabilidad_sube, precio y fecha_prediccion son opcionales).
+    Todo va en una sola transacción. Devuelve cuántas predicciones
+    distintas (claves) quedaron escritas: las repetidas cuentan una vez.
+    """
+    if isinstance(predicciones, pd.DataFrame):
+        predicciones = predicciones.to_dict("records")
+    ahora = datetime.now().isoformat(timespec="seconds")
+    filas = [_fila(p, ahora) for p in predicciones]
+    with closing(conectar(ruta)) as conexion:
+        # IMMEDIATE toma el bloqueo de escritura al empezar: dos escritores
+        # no pueden quedar los dos esperando a que el otro suelte la lectura
+        conexion.execute("BEGIN IMMEDIATE")
+        try:
+            conexion.executemany(_UPSERT, filas)
+            conexion.execute("COMMIT")
+        except Exception:
+            conexion.execute("ROLLBACK")
+            raise
+    return len({fila[:4] for fila in filas})  # (ticker, fecha_ultimo_cierre, horizonte, version_modelo)
+
+def leer_predicciones(ticker=None, desde=None, hasta=None, horizonte=None, version_modelo=None, ruta=None):
+    """
+    Predicciones filtradas (todas las condiciones son opcionales) como
+    DataFrame tipado. 'desde'/'hasta' filtran la fecha del último cierre
+    (inclusive) y usan los índices.
+    """
+    condiciones, parametros = [], []
+    for columna, operador, valor in (
+        ("ticker", "=", ticker.upper() if ticker else None),
+        ("fecha_ultimo_cierre", ">=", desde),
+        ("fecha_ultimo_cierre", "<=", hasta),
+        ("horizonte", "=", horizonte),
+        ("version_modelo", "=", version_modelo),
+    ):
+        if valor is not None:
+            if columna == "fecha_ultimo_cierre":
+                valor = pd.Timestamp(valor).strftime("%Y-%m-%d")
+            condiciones.append(f"{columna} {operador} ?")
+            parametros.append(valor)
+    consulta = f"SELECT {', '.join(COLUMNAS)} FROM predicciones"
+    if condiciones:
+        consulta += " WHERE " + " AND ".join(condiciones)
+    consulta += " ORDER BY fecha_ultimo_cierre, ticker, horizonte, version_modelo"
+
+    with closing(conectar(ruta)) as conexion:
+        df = pd.read_sql_query(consulta, conexion, params=parametros)
+    df["fecha_ultimo_cierre"] = pd.to_datetime(df["fecha_ultimo_cierre"])
+    df["fecha_prediccion"] = pd.to_datetime(df["fecha_prediccion"])
+    return df.astype({"horizonte": "int64", "prediccion": "int8"})
+
+def importar_csv(ruta_csv=RUTA_CSV_HEREDADO, ticker="AAPL", ruta=None):
+    """
+    Pasa el registro CSV heredado (una fila por ejecución, columnas
+    pred_Nd/conf_Nd con la confianza como "54.49%") al almacén.
+    Las filas repetidas del mismo cierre quedan en una sola (la última).
+    Devuelve cuántas predicciones se escribieron.
+    """
+    if not os.path.exists(ruta_csv):
+        return 0
+    try:
+        csv = pd.read_csv(ruta_csv)
+    except Exception as e:
+        print(f"*** [almacen_predicciones] No se pudo leer {ruta_csv}: {e} ***")
+        return 0
+    horizontes = sorted(int(c[len("pred_"):-1]) for c in csv.columns if c.startswith("pred_") and c.endswith("d"))
+    largo = []
+    for h in horizontes:
+        parte = csv[["fecha_prediccion", "fecha_ultimo_cierre", "precio_ultimo_cierre"]].copy()
+        parte["ticker"] = ticker
+        parte["horizonte"] = h
+        parte["prediccion"] = csv[f"pred_{h}d"]
+        parte["confianza"] = csv[f"conf_{h}d"].astype(str).str.rstrip("%").astype(float) / 100
+        largo.append(parte.dropna(subset=["prediccion", "confianza"]))
+    if not largo:
+        return 0
+    n = guardar_predicciones(pd.concat(largo, ignore_index=True), ruta)
+    print(f"[almacen_predicciones] {n} predicciones importadas de {ruta_csv}.")
+    return n
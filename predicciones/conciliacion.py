@@ -0,0 +1,286 @@
+import os
+import sys
+from datetime import datetime
+from contextlib import closing
+
+import numpy as np
+import pandas as pd
+
+# --- Configuración de Ruta (Path) ---
+script_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.abspath(os.path.join(script_dir, os.pardir))
+if parent_dir not in sys.path:
+    sys.path.append(parent_dir)
+# --- Fin de Configuración ---
+
+from predicciones.almacen_predicciones import conectar
+from datos import almacen_precios
+
+# Conciliación de predicciones contra lo que hizo el precio.
+# Una predicción a N días del cierre t "madura" cuando el histórico tiene
+# N barras después de t; entonces real = cierre[t+N] > cierre[t] (la misma
+# definición que el target de procesador_features).
+#
+# Cada corrida procesa solo lo nuevo:
+# - Una marca de agua por ticker (la fecha de la predicción pendiente más
+#   antigua) acota la búsqueda con el índice por fecha; lo ya conciliado
+#   queda fuera por un anti-join contra 'resultados'.
+# - Las fechas se ubican en el histórico con un merge_asof vectorizado.
+# - Las estadísticas (aciertos, calibración por tramos de probabilidad,
+#   Brier) son sumas por (ticker, horizonte, versión, tramo) que se
+#   incrementan: no hace falta releer la historia para actualizarlas.
+# Predicciones cargadas con fechas anteriores a la marca de agua (ej. un
+# import tardío) se concilian con reconstruir=True.
+
+TRAMOS_CALIBRACION = 10       # Tramos de probabilidad_sube: [0, 0.1), [0.1, 0.2)...
+VENTANA_ACIERTO_MOVIL = 60    # Últimas predicciones conciliadas para la tasa de acierto móvil
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS resultados (
+    ticker              TEXT    NOT NULL,
+    fecha_ultimo_cierre TEXT    NOT NULL,
+    horizonte           INTEGER NOT NULL,
+    version_modelo      TEXT    NOT NULL,
+    fecha_resolucion    TEXT    NOT NULL,
+    precio_base         REAL    NOT NULL,
+    precio_resolucion   REAL    NOT NULL,
+    real                INTEGER NOT NULL,
+    acierto             INTEGER NOT NULL,
+    probabilidad_sube   REAL,
+    conciliado_en       TEXT    NOT NULL,
+    PRIMARY KEY (ticker, fecha_ultimo_cierre, horizonte, version_modelo)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_resultados_modelo
+    ON resultados (ticker, horizonte, version_modelo, fecha_ultimo_cierre);
+CREATE TABLE IF NOT EXISTS calidad_modelos (
+    ticker          TEXT    NOT NULL,
+    horizonte       INTEGER NOT NULL,
+    version_modelo  TEXT    NOT NULL,
+    tramo           INTEGER NOT NULL,
+    n               INTEGER NOT NULL,
+    aciertos        INTEGER NOT NULL,
+    suma_prob       REAL    NOT NULL,
+    suma_real       INTEGER NOT NULL,
+    suma_brier      REAL    NOT NULL,
+    PRIMARY KEY (ticker, horizonte, version_modelo, tramo)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS marcas_conciliacion (
+    ticker          TEXT PRIMARY KEY,
+    marca_agua      TEXT NOT NULL,
+    actualizado_en  TEXT NOT NULL
+);
+"""
+
+_PENDIENTES = """
+SELECT p.ticker, p.fecha_ultimo_cierre, p.horizonte, p.version_modelo, p.prediccion, p.probabilidad_sube
+FROM predicciones p
+LEFT JOIN resultados r
+    ON r.ticker = p.ticker AND r.fecha_ultimo_cierre = p.fecha_ultimo_cierre
+   AND r.horizonte = p.horizonte AND r.version_modelo = p.version_modelo
+WHERE p.ticker = ? AND p.fecha_ultimo_cierre >= ? AND r.ticker IS NULL
+"""
+
+_SUMAR_CALIDAD = """
+INSERT INTO calidad_modelos (ticker, horizonte, version_modelo, tramo, n, aciertos, suma_prob, suma_real, suma_brier)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (ticker, horizonte, version_modelo, tramo) DO UPDATE SET
+    n = n + excluded.n,
+    aciertos = aciertos + excluded.aciertos,
+    suma_prob = suma_prob + excluded.suma_prob,
+    suma_real = suma_real + excluded.suma_real,
+    suma_brier = suma_brier + excluded.suma_brier
+"""
+
+
+def _conectar(ruta=None):
+    return conectar(ruta, esquema_adicional=_ESQUEMA)
+
+def _cierres(snapshot, ticker):
+    """Serie de cierres del ticker: del snapshot si está, si no del almacén local de precios."""
+    df = snapshot.get(ticker) if snapshot else None
+    if df is None:
+        df, _ = almacen_precios.leer_precios(ticker)
+    if df is None or df.empty:
+        return None
+    columna = 'Adj Close' if 'Adj Close' in df.columns else 'Close'
+    cierres = df[columna].dropna().sort_index()
+    if getattr(cierres.index, "tz", None) is not None:
+        cierres.index = cierres.index.tz_localize(None)  # Las fechas guardadas no tienen zona horaria
+    return cierres
+
+def resolver(pendientes: pd.DataFrame, cierres: pd.Series):
+    """
+    Ubica cada predicción en el histórico (as-of: la última barra <= su
+    fecha) y resuelve las que ya tienen N barras por delante.
+
+    Returns:
+        (resueltas, sin_madurar): 'resueltas' suma fecha_resolucion,
+        precio_base, precio_resolucion, real y acierto.
+    """
+    pendientes = pendientes.assign(fecha=pd.to_datetime(pendientes["fecha_ultimo_cierre"])).sort_values("fecha")
+    barras = pd.DataFrame({"fecha": cierres.index.astype("datetime64[ns]"), "posicion": np.arange(len(cierres))})
+    ubicadas = pd.merge_asof(pendientes, barras, on="fecha", direction="backward")
+
+    posicion = ubicadas["posicion"].to_numpy()
+    destino = posicion + ubicadas["horizonte"].to_numpy()
+    maduras = ~np.isnan(posicion) & (destino < len(cierres))
+    resueltas = ubicadas[maduras].copy()
+    base = posicion[maduras].astype(np.intp)
+    final = destino[maduras].astype(np.intp)
+    valores = cierres.to_numpy()
+    resueltas["fecha_resolucion"] = cierres.index[final].strftime("%Y-%m-%d")
+    resueltas["precio_base"] = valores[base]
+    resueltas["precio_resolucion"] = valores[final]
+    resueltas["real"] = (valores[final] > valores[base]).astype(int)
+    resueltas["acierto"] = (resueltas["real"] == resueltas["prediccion"]).astype(int)
+    # Las anteriores a todo el histórico no se pueden resolver: no frenan la marca de agua
+    sin_madurar = ubicadas[~maduras & ~np.isnan(posicion)]
+    return resueltas.drop(columns=["fecha", "posicion"]), sin_madurar.drop(columns=["fecha", "posicion"])
+
+def _sumas_calidad(resueltas: pd.DataFrame):
+    """Sumas por (ticker, horizonte, versión, tramo) de las predicciones recién conciliadas."""
+    prob = resueltas["probabilidad_sube"].astype(float)
+    tabla = resueltas.assign(
+        tramo=np.minimum((prob * TRAMOS_CALIBRACION).astype(int), TRAMOS_CALIBRACION - 1),
+        prob=prob,
+        brier=(prob - resueltas["real"]) ** 2,
+    )
+    sumas = tabla.groupby(["ticker", "horizonte", "version_modelo", "tramo"]).agg(
+        n=("real", "size"), aciertos=("acierto", "sum"), suma_prob=("prob", "sum"),
+        suma_real=("real", "sum"), suma_brier=("brier", "sum"),
+    ).reset_index()
+    return [
+        (t, int(h), v, int(tr), int(n), int(a), float(sp), int(sr), float(sb))
+        for t, h, v, tr, n, a, sp, sr, sb in sumas.itertuples(index=False)
+    ]
+
+def conciliar(snapshot=None, tickers=None, ruta=None, reconstruir=False):
+    """
+    Concilia las predicciones que maduraron desde la última corrida.
+
+    Args:
+        snapshot (dict): Precios de la ejecución; los tickers que no estén
+            se leen del almacén local de precios.
+        tickers (list): Por defecto, todos los que tienen predicciones.
+        reconstruir (bool): Ignora la marca de agua (busca desde el inicio).
+
+    Returns:
+        {ticker: {'conciliadas': n, 'pendientes': m, 'marca_agua': fecha}}
+    """
+    ahora = datetime.now().isoformat(timespec="seconds")
+    resumen = {}
+    with closing(_conectar(ruta)) as conexion:
+        if tickers is None:
+            tickers = [t for (t,) in conexion.execute("SELECT DISTINCT ticker FROM predicciones")]
+        marcas = dict(conexion.execute("SELECT ticker, marca_agua FROM marcas_conciliacion"))
+
+        for ticker in (t.upper() for t in tickers):
+            cierres = _cierres(snapshot, ticker)
+            if cierres is None:
+                print(f"*** [Conciliación] Sin precios de {ticker}: no se concilia. ***")
+                continue
+            # IMMEDIATE: dos conciliaciones a la vez no pueden contar dos veces la misma predicción
+            conexion.execute("BEGIN IMMEDIATE")
+            try:
+                marca = "0000-00-00" if reconstruir else marcas.get(ticker, "0000-00-00")
+                pendientes = pd.read_sql_query(_PENDIENTES, conexion, params=(ticker, marca))
+                resueltas, sin_madurar = resolver(pendientes, cierres) if len(pendientes) else (pendientes, pendientes)
+                if len(resueltas):
+                    resueltas["conciliado_en"] = ahora
+                    columnas = ["ticker", "fecha_ultimo_cierre", "horizonte", "version_modelo", "fecha_resolucion",
+                                "precio_base", "precio_resolucion", "real", "acierto", "probabilidad_sube", "conciliado_en"]
+                    conexion.executemany(
+                        f"INSERT INTO resultados ({', '.join(columnas)}) VALUES ({', '.join('?' * len(columnas))})",
+                        resueltas[columnas].astype(object).itertuples(index=False, name=None),
+                    )
+                    conexion.executemany(_SUMAR_CALIDAD, _sumas_calidad(resueltas))
+                # La próxima corrida arranca en la pendiente más antigua (o después de todo lo visto)
+                if len(sin_madurar):
+                    nueva_marca = sin_madurar["fecha_ultimo_cierre"].min()
+                elif len(pendientes):
+                    nueva_marca = (pd.Timestamp(pendientes["fecha_ultimo_cierre"].max()) + pd.Timedelta(days=1)).strftime("%Y-%m-%d")
+                else:
+                    nueva_marca = marcas.get(ticker, "0000-00-00")
+                conexion.execute(
+                    "INSERT INTO marcas_conciliacion (ticker, marca_agua, actualizado_en) VALUES (?, ?, ?) "
+                    "ON CONFLICT (ticker) DO UPDATE SET marca_agua = excluded.marca_agua, actualizado_en = excluded.actualizado_en",
+                    (ticker, nueva_marca, ahora),
+                )
+                conexion.execute("COMMIT")
+            except Exception:
+                conexion.execute("ROLLBACK")
+                raise
+            resumen[ticker] = {"conciliadas": len(resueltas), "pendientes": len(sin_madurar), "marca_agua": nueva_marca}
+            print(f"[Conciliación] {ticker}: {len(resueltas)} conciliadas, {len(sin_madurar)} sin madurar.")
+    return resumen
+
+def calidad_modelos(ticker=None, ruta=None):
+    """
+    Tasa de acierto y calibración acumuladas por (ticker, horizonte, versión).
+    'ece' es el error de calibración esperado: la distancia media (pesada
+    por n) entre la probabilidad predicha y la frecuencia real de cada tramo.
+    """
+    consulta = "SELECT * FROM calidad_modelos" + (" WHERE ticker = ?" if ticker else "")
+    with closing(_conectar(ruta)) as conexion:
+        tramos = pd.read_sql_query(consulta, conexion, params=(ticker.upper(),) if ticker else ())
+    if tramos.empty:
+        return pd.DataFrame(columns=["ticker", "horizonte", "version_modelo", "n", "tasa_acierto",
+                                     "prob_media", "frecuencia_real", "brier", "ece"])
+    tramos["desvio"] = (tramos["suma_prob"] - tramos["suma_real"]).abs()
+    grupos = tramos.groupby(["ticker", "horizonte", "version_modelo"])
+    sumas = grupos[["n", "aciertos", "suma_prob", "suma_real", "suma_brier", "desvio"]].sum()
+    return pd.DataFrame({
+        "n": sumas["n"],
+        "tasa_acierto": sumas["aciertos"] / sumas["n"],
+        "prob_media": sumas["suma_prob"] / sumas["n"],
+        "frecuencia_real": sumas["suma_real"] / sumas["n"],
+        "brier": sumas["suma_brier"] / sumas["n"],
+        "ece": sumas["desvio"] / sumas["n"],
+    }).reset_index()
+
+def curva_calibracion(ticker, horizonte, version_modelo=None, ruta=None):
+    """Por tramo: n, probabilidad media predicha y frecuencia real de 'Sube'."""
+    consulta = "SELECT tramo, SUM(n) AS n, SUM(suma_prob) AS suma_prob, SUM(suma_real) AS suma_real " \
+               "FROM calidad_modelos WHERE ticker = ? AND horizonte = ?"
+    parametros = [ticker.upper(), horizonte]
+    if version_modelo is not None:
+        consulta += " AND version_modelo = ?"
+        parametros.append(version_modelo)
+    with closing(_conectar(ruta)) as conexion:
+        tramos = pd.read_sql_query(consulta + " GROUP BY tramo ORDER BY tramo", conexion, params=parametros)
+    return pd.DataFrame({
+        "tramo": tramos["tramo"],
+        "n": tramos["n"],
+        "prob_media": tramos["suma_prob"] / tramos["n"],
+        "frecuencia_real": tramos["suma_real"] / tramos["n"],
+    })
+
+def acierto_movil(ventana=VENTANA_ACIERTO_MOVIL, ticker=None, ruta=None):
+    """Tasa de acierto de las últimas 'ventana' predicciones conciliadas de cada (ticker, horizonte, versión)."""
+    filas = []
+    with closing(_conectar(ruta)) as conexion:
+        grupos = conexion.execute(
+            "SELECT DISTINCT ticker, horizonte, version_modelo FROM calidad_modelos"
+            + (" WHERE ticker = ?" if ticker else ""), (ticker.upper(),) if ticker else ()
+        ).fetchall()
+        for t, h, v in grupos:
+            # Usa idx_resultados_modelo: lee solo las últimas 'ventana' filas del grupo
+            aciertos = [a for (a,) in conexion.execute(
+                "SELECT acierto FROM resultados WHERE ticker = ? AND horizonte = ? AND version_modelo = ? "
+                "ORDER BY fecha_ultimo_cierre DESC LIMIT ?", (t, h, v, ventana))]
+            filas.append({"ticker": t, "horizonte": h, "version_modelo": v,
+                          "n": len(aciertos), "tasa_acierto": float(np.mean(aciertos))})
+    return pd.DataFrame(filas, columns=["ticker", "horizonte", "version_modelo", "n", "tasa_acierto"])
+
+def imprimir_calidad(ticker=None, ruta=None):
+    calidad = calidad_modelos(ticker, ruta)
+    if calidad.empty:
+        print("[Conciliación] Todavía no hay predicciones conciliadas.")
+        return
+    movil = acierto_movil(ticker=ticker, ruta=ruta).set_index(["ticker", "horizonte", "version_modelo"])
+    print("\n--- Calidad de los Modelos (predicciones conciliadas) ---")
+    print(f"{'Ticker':<7}{'Horiz.':>7}  {'Versión':<26}{'N':>6}{'Acierto':>9}{f'Últ.{VENTANA_ACIERTO_MOVIL}':>9}{'Brier':>8}{'ECE':>7}")
+    for f in calidad.itertuples(index=False):
+        reciente = movil["tasa_acierto"].get((f.ticker, f.horizonte, f.version_modelo), np.nan)
+        print(f"{f.ticker:<7}{f.horizonte:>6}d  {f.version_modelo:<26}{f.n:>6}{f.tasa_acierto:>9.1%}"
+              f"{reciente:>9.1%}{f.brier:>8.3f}{f.ece:>7.3f}")
@@ -0,0 +1,87 @@
+import os
+import sys
+import json
+import time
+import signal
+import threading
+from datetime import datetime
+
+# --- Configuración de Ruta (Path) ---
+script_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.abspath(os.path.join(script_dir, os.pardir))
+if parent_dir not in sys.path:
+    sys.path.append(parent_dir)
+# --- Fin de Configuración ---
+
+from datos.calendario_mercado import proxima_ejecucion, ZONA_MERCADO, MINUTOS_TRAS_CIERRE
+
+# Modo demonio: el proceso queda vivo (intérprete, imports, XGBoost y
+# modelos ya cargados) y corre la tarea después de cada cierre de la
+# NYSE. Cada ejecución deja una línea JSON en 'salida' (por defecto
+# stdout), para que un supervisor (systemd, docker...) la recoja.
+# SIGTERM / SIGINT terminan la espera sin cortar una ejecución a medias.
+
+SEGUNDOS_MAX_ESPERA = 60  # Se despierta al menos cada minuto (cambios de hora, suspensión del equipo)
+
+
+def ejecutar_demonio(tarea, minutos_tras_cierre: int = MINUTOS_TRAS_CIERRE, max_ejecuciones: int = None,
+                     detener: threading.Event = None, reloj=None, salida=None):
+    """
+    Corre 'tarea()' después de cada cierre hasta que se pida detener.
+
+    Args:
+        tarea: Función sin argumentos; su resultado (dict o None = falló)
+            va a la línea JSON de la ejecución.
+        max_ejecuciones (int): Sale después de N ejecuciones (None = nunca).
+        detener (threading.Event): Para detenerlo desde otro hilo.
+        reloj: Devuelve el 'ahora' con zona horaria (para pruebas).
+
+    Returns:
+        Cantidad de ejecuciones fallidas.
+    """
+    detener = detener or threading.Event()
+    reloj = reloj or (lambda: datetime.now(ZONA_MERCADO))
+    salida = salida or sys.stdout
+    anteriores = _instalar_senales(detener)
+    try:
+        return _bucle(tarea, minutos_tras_cierre, max_ejecuciones, detener, reloj, salida)
+    finally:
+        for senal, manejador in anteriores.items():
+            signal.signal(senal, manejador)
+
+def _bucle(tarea, minutos_tras_cierre, max_ejecuciones, detener, reloj, salida):
+    ejecuciones = fallidas = 0
+    while not detener.is_set() and (max_ejecuciones is None or ejecuciones < max_ejecuciones):
+        momento = proxima_ejecucion(reloj(), minutos_tras_cierre)
+        print(f"[Demonio] Próxima ejecución: {momento.isoformat()}", file=sys.stderr)
+        while not detener.is_set():
+            faltan = (momento - reloj()).total_seconds()
+            if faltan <= 0:
+                break
+            detener.wait(min(faltan, SEGUNDOS_MAX_ESPERA))
+        if detener.is_set():
+            break
+
+        inicio = time.perf_counter()
+        registro = {"inicio": reloj().isoformat(timespec="seconds"), "programada": momento.isoformat()}
+        try:
+            resultado = tarea()
+            registro.update(ok=resultado is not None, resultado=resultado)
+        except Exception as e:
+            registro.update(ok=False, error=f"{type(e).__name__}: {e}")
+        registro["segundos"] = round(time.perf_counter() - inicio, 3)
+        ejecuciones += 1
+        fallidas += not registro["ok"]
+        salida.write(json.dumps(registro, default=str) + "\n")
+        salida.flush()
+    print(f"[Demonio] Detenido tras {ejecuciones} ejecución(es), {fallidas} fallida(s).", file=sys.stderr)
+    return fallidas
+
+def _instalar_senales(detener):
+    """SIGTERM/SIGINT -> detener. Devuelve los manejadores anteriores, para restaurarlos."""
+    if threading.current_thread() is not threading.main_thread():
+        return {}  # Las señales solo se pueden atender desde el hilo principal
+    anteriores = {}
+    for senal in (signal.SIGTERM, signal.SIGINT):
+        anteriores[senal] = signal.signal(senal, lambda *_: detener.set())
+    return anteriores
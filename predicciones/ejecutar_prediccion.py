@@ -1,6 +1,6 @@
 import sys
 import os
-import pandas as pd
+import numpy as np
 from datetime import datetime
 
 # --- Configuración de Ruta (Path) ---
@@ -11,54 +11,115 @@ if parent_dir not in sys.path:
 # --- Fin de Configuración ---
 
 try:
-    from modelo.gestor_modelo import entrenar_nuevo_modelo
-    from modelo.procesador_features import crear_features_y_target
-    from datos import gestor_aapl # Para obtener el último precio
+    from modelo.registro_modelos import obtener_o_entrenar
+    from modelo.gestor_modelo import filas_entrenamiento
+    from modelo.procesador_features import crear_features_multihorizonte
+    from modelo.matriz_cuantizada import MatrizCuantizada
+    from modelo.puntuador_compilado import PuntuadorCompilado
+    from datos.snapshot import cargar_snapshot # Una sola carga de datos por ejecución
+    from modelo.instrumentacion import Traza, etapa # Tiempos y memoria por etapa
+    from predicciones import almacen_predicciones # Registro de predicciones (SQLite)
+    from predicciones import conciliacion # Predicciones pasadas vs. lo que hizo el precio
 except ImportError as e:
     print("--- ERROR FATAL AL IMPORTAR ---")
     print(f"Error: {e}")
-    input("Presiona Enter para salir.")
+    if sys.stdin.isatty():
+        input("Presiona Enter para salir.")
     sys.exit(1)
 
 # --- Configuración del Script ---
 HORIZONTES_DE_PREDICCION = [1, 5, 21] # Diario, Semanal, Mensual
-LOG_FILE_PATH = os.path.join(script_dir, 'registro_predicciones.csv')
+LOG_FILE_PATH = os.path.join(script_dir, 'registro_predicciones.csv') # Registro heredado (se importa al almacén)
 
 
-def ejecutar_predicciones():
+def ejecutar_predicciones(interactivo=True, snapshot=None):
     """
     Script principal que entrena, predice y guarda un registro.
-    Esta función es llamada por main.py O por este script.
+    Esta función es llamada por main.py, por cli.py O por este script.
+
+    Args:
+        interactivo (bool): Limpia la pantalla al empezar (menú). La CLI
+            y el demonio lo llaman con False.
+        snapshot (dict): Datos ya cargados (por defecto se cargan acá).
+
+    Returns:
+        dict con 'fecha_ultimo_cierre', 'precio_ultimo_cierre',
+        'predicciones' (una por horizonte), 'conciliacion' y 'traza'
+        (ruta del JSON de tiempos), o None si la ejecución falló.
     """
-    limpiar_pantalla()
+    if interactivo:
+        limpiar_pantalla()
     print("==============================================")
     print("    INICIANDO SCRIPT DE PREDICCIÓN DIARIA    ")
     print("==============================================")
-    
+
+    # Cada fase queda medida (reloj, CPU, memoria, filas) en una traza
+    # JSON por ejecución, también si la ejecución termina antes de tiempo.
+    with Traza("ejecutar_predicciones") as traza:
+        resultado = None
+        try:
+            resultado = _ejecutar_fases(snapshot)
+        finally:
+            traza.imprimir()
+            ruta_traza = traza.exportar()
+    if resultado is not None:
+        resultado["traza"] = ruta_traza
+    return resultado
+
+def _ejecutar_fases(snapshot=None):
     modelos_entrenados = {}
     
-    # --- 1. Entrenar los Modelos ---
-    print("\n--- Fase 1: Entrenando Modelos ---")
+    # --- 0. Cargar los Datos (una sola vez) ---
+    # Todas las fases usan este mismo snapshot: cada ticker se carga
+    # una vez y todos los modelos ven exactamente las mismas barras.
+    print("\n--- Fase 0: Cargando Datos ---")
+    with etapa("carga_datos") as e:
+        if snapshot is None:
+            snapshot = cargar_snapshot()
+        e.anotar(filas=sum(len(df) for df in (snapshot or {}).values()))
+    if snapshot is None:
+        print("¡Error fatal! No se pudieron cargar los datos.")
+        return None
+    
+    # --- 1. Crear Features (una sola pasada para todos los horizontes) ---
+    print("\n--- Fase 1: Creando Features ---")
+    with etapa("features") as e:
+        X_full, targets = crear_features_multihorizonte(HORIZONTES_DE_PREDICCION, snapshot=snapshot)
+        e.anotar(filas=0 if X_full is None else len(X_full))
+    
+    if X_full is None or X_full.empty:
+        print("¡Error fatal! No se pudieron generar las features.")
+        return None
+    
+    # --- 2. Entrenar (o Cargar) los Modelos ---
+    # El registro reutiliza el modelo guardado si sigue vigente
+    # y solo reentrena cuando la política de obsolescencia lo pide.
+    # Si hay que reentrenar, los horizontes comparten una matriz cuantizada:
+    # se convierte a float32 recién cuando el primero la necesita, y los
+    # cortes salen de las filas de entrenamiento del horizonte con menos
+    # datos (ninguno ve filas de prueba ajenas): un solo sketch para los 3.
+    print("\n--- Fase 2: Preparando Modelos ---")
+    versiones_modelos = {}
+    fin_cortes = filas_entrenamiento(min(int(mascara.sum()) for _, mascara in targets.values()))
+    matriz = MatrizCuantizada(X_full, fin_cortes=fin_cortes or None)
     for dias in HORIZONTES_DE_PREDICCION:
-        print(f"\nEntrenando modelo de {dias} día(s)...")
-        modelo = entrenar_nuevo_modelo(dias_a_predecir=dias)
+        print(f"\nModelo de {dias} día(s)...")
+        y, mascara = targets[dias]
+        with etapa("modelo", horizonte=dias, filas=int(mascara.sum())):
+            modelo, metadatos = obtener_o_entrenar(dias, X_full[mascara], y[mascara], matriz=matriz)
         if modelo is None:
             print(f"¡Error fatal! No se pudo entrenar el modelo de {dias} días.")
-            return
+            return None
         modelos_entrenados[dias] = modelo
+        versiones_modelos[dias] = metadatos["version_modelo"]
         print(f"Modelo de {dias} días listo.")
 
-    # --- 2. Obtener Datos para Predecir ---
-    print("\n--- Fase 2: Obteniendo Datos Frescos para Predecir ---")
-    
-    X_full, _ = crear_features_y_target(dias_a_predecir=1)
+    # --- 3. Datos para Predecir ---
+    # La última fila de X_full (sin target todavía) es la del último cierre.
+    print("\n--- Fase 3: Preparando Datos para Predecir ---")
     
-    if X_full is None or X_full.empty:
-        print("¡Error fatal! No se pudieron generar las features.")
-        return
-        
     ultimo_dato_features = X_full.tail(1)
-    df_aapl_raw = gestor_aapl.cargar_datos_modelo()
+    df_aapl_raw = snapshot["AAPL"]
     col_aapl = 'Adj Close' if 'Adj Close' in df_aapl_raw.columns else 'Close'
     ultimo_cierre = df_aapl_raw[col_aapl].iloc[-1]
     fecha_ultimo_cierre = df_aapl_raw.index[-1].strftime('%Y-%m-%d')
@@ -68,61 +129,87 @@ def ejecutar_predicciones():
     print("\nFeatures de entrada para el modelo:")
     print(ultimo_dato_features.to_string())
 
-    # --- 3. Realizar Predicciones ---
-    print("\n--- Fase 3: Generando Predicciones ---")
+    # --- 4. Realizar Predicciones ---
+    # Los árboles de los 3 modelos se puntúan juntos, en una sola llamada.
+    print("\n--- Fase 4: Generando Predicciones ---")
+    with etapa("puntuacion", filas=1):
+        puntuador = PuntuadorCompilado(modelos_entrenados)
+        fila = ultimo_dato_features[puntuador.features or list(X_full.columns)].to_numpy(np.float32)[0]
+        resultados = puntuador.puntuar_dict(fila)
     predicciones = {}
     for dias in HORIZONTES_DE_PREDICCION:
-        modelo = modelos_entrenados[dias]
-        pred_binaria = modelo.predict(ultimo_dato_features)[0]
-        probabilidad = modelo.predict_proba(ultimo_dato_features)[0]
-        confianza = probabilidad[pred_binaria] * 100
+        pred_binaria, prob_sube = resultados[dias]
+        confianza = prob_sube if pred_binaria == 1 else 1 - prob_sube
         predicciones[dias] = {
             "prediccion": int(pred_binaria),
-            "confianza_pct": f"{confianza:.2f}%"
+            "probabilidad_sube": prob_sube,
+            "confianza": confianza,
         }
 
-    # --- 4. Mostrar Reporte y Guardar Log ---
-    print("\n--- Fase 4: Reporte y Registro ---")
+    # --- 5. Mostrar Reporte y Guardar Log ---
+    print("\n--- Fase 5: Reporte y Registro ---")
     print(f"\nPredicciones generadas el: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print(f"Basado en el cierre de {fecha_ultimo_cierre} (${ultimo_cierre:.2f})")
-    
-    reporte_log = {
-        "fecha_prediccion": datetime.now().strftime('%Y-%m-%d'),
-        "fecha_ultimo_cierre": fecha_ultimo_cierre,
-        "precio_ultimo_cierre": round(ultimo_cierre, 2)
-    }
-    
+
+    filas_registro = []
     for dias, pred_info in predicciones.items():
         resultado = "SUBE" if pred_info['prediccion'] == 1 else "NO SUBE"
-        confianza = pred_info['confianza_pct']
         print(f"\n - Predicción a {dias} día(s):")
         print(f"   Resultado: {resultado} ({pred_info['prediccion']})")
-        print(f"   Confianza: {confianza}")
-        
-        reporte_log[f'pred_{dias}d'] = pred_info['prediccion']
-        reporte_log[f'conf_{dias}d'] = confianza
-
-    try:
-        df_log = pd.DataFrame([reporte_log])
-        if not os.path.exists(LOG_FILE_PATH):
-            df_log.to_csv(LOG_FILE_PATH, index=False)
-            print(f"\nSe creó el registro en: {LOG_FILE_PATH}")
-        else:
-            df_log.to_csv(LOG_FILE_PATH, mode='a', header=False, index=False)
-            print(f"\nPredicción añadida al registro: {LOG_FILE_PATH}")
-            
-    except Exception as e:
-        print(f"\nError al guardar el registro CSV: {e}")
+        print(f"   Confianza: {pred_info['confianza'] * 100:.2f}%")
+        print(f"   Modelo: {versiones_modelos[dias]}")
+
+        filas_registro.append({
+            "ticker": "AAPL",
+            "fecha_ultimo_cierre": fecha_ultimo_cierre,
+            "horizonte": dias,
+            "version_modelo": versiones_modelos[dias],
+            "fecha_prediccion": datetime.now().strftime('%Y-%m-%d'),
+            "precio_ultimo_cierre": round(float(ultimo_cierre), 2),
+            **pred_info,
+        })
+
+    # Una fila por horizonte en el almacén SQLite (upsert: volver a correr
+    # el mismo día con el mismo modelo no duplica). La primera vez se
+    # importa el CSV que se usaba antes.
+    with etapa("registro", filas=len(filas_registro)):
+        try:
+            if not os.path.exists(almacen_predicciones.RUTA_ALMACEN_PREDICCIONES):
+                almacen_predicciones.importar_csv(LOG_FILE_PATH)
+            almacen_predicciones.guardar_predicciones(filas_registro)
+            print(f"\nPredicciones guardadas en: {almacen_predicciones.RUTA_ALMACEN_PREDICCIONES}")
+        except Exception as e:
+            print(f"\nError al guardar las predicciones: {e}")
+
+    # --- 6. Conciliar Predicciones Pasadas ---
+    # Solo las que maduraron desde la corrida anterior (ver conciliacion.py).
+    print("\n--- Fase 6: Conciliando Predicciones Pasadas ---")
+    resumen = {}
+    with etapa("conciliacion") as e:
+        try:
+            resumen = conciliacion.conciliar(snapshot)
+            e.anotar(filas=sum(r["conciliadas"] for r in resumen.values()))
+            conciliacion.imprimir_calidad()
+        except Exception as error:
+            print(f"Error al conciliar las predicciones: {error}")
 
     print("\n==============================================")
     print("    SCRIPT DE PREDICCIÓN COMPLETADO    ")
     print("==============================================")
+    return {
+        "fecha_ultimo_cierre": fecha_ultimo_cierre,
+        "precio_ultimo_cierre": round(float(ultimo_cierre), 2),
+        "predicciones": filas_registro,
+        "conciliacion": resumen,
+    }
 
 def limpiar_pantalla():
     os.system('cls' if os.name == 'nt' else 'clear')
 
 # --- Punto de Entrada ---
 if __name__ == "__main__":
-    ejecutar_predicciones()
+    ejecutar_predicciones(interactivo=sys.stdin.isatty())
     # ¡CAMBIO CLAVE! El input() solo se ejecuta si corremos el script directo
-    input("\nPresiona Enter para salir.")
\ No newline at end of file
+    # (y desde una terminal: en cron o un servicio no hay nadie para apretar Enter)
+    if sys.stdin.isatty():
+        input("\nPresiona Enter para salir.")
\ No newline at end of file
@@ -0,0 +1,410 @@
+import sys
+import os
+import json
+import time
+import threading
+from collections import deque
+from datetime import datetime
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+import numpy as np
+import pandas as pd
+
+# --- Configuración de Ruta (Path) ---
+script_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.abspath(os.path.join(script_dir, os.pardir))
+if parent_dir not in sys.path:
+    sys.path.append(parent_dir)
+# --- Fin de Configuración ---
+
+from modelo import registro_modelos
+from modelo.procesador_features import crear_features_multihorizonte, features_para_par, FACTOR_PREDICTOR
+from modelo.registro_features import periodo_minimo
+from modelo.puntuador_compilado import PuntuadorCompilado
+from datos.snapshot import cargar_snapshot
+
+# Servicio local de predicción (HTTP en localhost).
+# Carga UNA vez los modelos del registro y la última fila de features de
+# cada ticker, y responde en milisegundos sin reimportar nada, sin
+# descargar datos y sin reentrenar:
+#
+#   GET  /prediccion?ticker=AAPL&horizonte=5   (sin horizonte = todos)
+#   POST /puntuar    {"ticker": "AAPL", "filas": [[...], ...]}  (features propias)
+#   POST /actualizar_datos                      (recarga precios y features)
+#   GET  /estado                                (modelos y versiones cargadas)
+#   GET  /metricas                              (solicitudes, QPS, latencias)
+#
+# Un hilo vigila el directorio del registro: si un modelo cambia (ej. lo
+# reentrenó el planificador), se recarga sin cortar el servicio. Si el
+# modelo nuevo se entrenó con barras que el servicio todavía no tiene (ej.
+# el demonio tras un cierre), también se recargan precios y features: nunca
+# se puntúa un modelo nuevo con la fila de ayer. El estado se reemplaza
+# entero (una referencia), así las solicitudes en curso nunca ven una
+# mezcla de versiones.
+
+HOST_SERVICIO = "127.0.0.1"
+PUERTO_SERVICIO = int(os.environ.get("MODELO_PUERTO_SERVICIO", "8765"))
+SEGUNDOS_VIGILANCIA_REGISTRO = 2.0  # Cada cuánto se mira si el registro cambió
+MUESTRAS_LATENCIA = 10_000          # Últimas latencias guardadas para los percentiles
+VENTANA_QPS_SEGUNDOS = 60
+
+
+def _firma_registro():
+    """(archivo, mtime, tamaño) de cada modelo del registro: cambia si algo se reescribe."""
+    directorio = registro_modelos.DIRECTORIO_MODELOS
+    if not os.path.isdir(directorio):
+        return frozenset()
+    firma = set()
+    for archivo in os.listdir(directorio):
+        if archivo.endswith((".json", ".ubj")) and ".tmp." not in archivo:
+            info = os.stat(os.path.join(directorio, archivo))
+            firma.add((archivo, info.st_mtime_ns, info.st_size))
+    return frozenset(firma)
+
+
+class Contadores:
+    """Solicitudes, errores y latencias del servicio (seguro entre hilos)."""
+
+    def __init__(self):
+        self._candado = threading.Lock()
+        self.inicio = time.time()
+        self.solicitudes = 0
+        self.errores = 0
+        self.por_ruta = {}
+        self.recargas = 0
+        self._latencias = deque(maxlen=MUESTRAS_LATENCIA)
+        self._momentos = deque()
+
+    def registrar(self, ruta, segundos, error=False):
+        ahora = time.time()
+        with self._candado:
+            self.solicitudes += 1
+            self.errores += int(error)
+            self.por_ruta[ruta] = self.por_ruta.get(ruta, 0) + 1
+            self._latencias.append(segundos)
+            self._momentos.append(ahora)
+            while self._momentos and self._momentos[0] < ahora - VENTANA_QPS_SEGUNDOS:
+                self._momentos.popleft()
+
+    def resumen(self):
+        with self._candado:
+            latencias = np.array(self._latencias) * 1e6
+            ventana = min(VENTANA_QPS_SEGUNDOS, max(time.time() - self.inicio, 1e-9))
+            resumen = {
+                "solicitudes": self.solicitudes,
+                "errores": self.errores,
+                "por_ruta": dict(self.por_ruta),
+                "recargas_modelos": self.recargas,
+                "qps_ultimo_minuto": round(len(self._momentos) / ventana, 2),
+                "segundos_activo": round(time.time() - self.inicio, 1),
+            }
+        if len(latencias):
+            p50, p95, p99 = np.percentile(latencias, [50, 95, 99])
+            resumen["latencia_us"] = {
+                "p50": round(float(p50), 1), "p95": round(float(p95), 1),
+                "p99": round(float(p99), 1), "max": round(float(latencias.max()), 1),
+            }
+        return resumen
+
+
+class ModeloNoEncontrado(KeyError):
+    """No hay modelo cargado para el ticker u horizonte pedido (HTTP 404)."""
+
+
+class ServicioPrediccion:
+    """
+    Modelos y features residentes en memoria. Se puede usar sin HTTP
+    (predecir / puntuar) o servirlo con iniciar().
+    """
+
+    def __init__(self, snapshot=None, tickers=None, factor=FACTOR_PREDICTOR,
+                 host=HOST_SERVICIO, puerto=PUERTO_SERVICIO,
+                 segundos_vigilancia=SEGUNDOS_VIGILANCIA_REGISTRO):
+        self.factor = factor
+        self.tickers = tickers
+        self.host, self.puerto = host, puerto
+        self.segundos_vigilancia = segundos_vigilancia
+        self.contadores = Contadores()
+        self._snapshot = snapshot
+        self._candado_recarga = threading.Lock()
+        self._detener = threading.Event()
+        self._servidor = None
+        self._hilos = []
+        self._estado = {}
+        self._features = {}
+        self._fechas = {}        # Índice de las features de cada ticker (ver _datos_atrasados)
+        self._firma = None
+        self.actualizar_datos()
+
+    # --- Carga de modelos y features ---
+
+    def _modelos_por_ticker(self):
+        """{ticker: {horizonte: metadatos}} de los modelos registrados."""
+        por_ticker = {}
+        for meta in registro_modelos.listar_modelos():
+            if "version_modelo" not in meta:
+                continue  # Solo metadatos (ej. una búsqueda sin modelo entrenado)
+            if self.tickers and meta["ticker"] not in self.tickers:
+                continue
+            por_ticker.setdefault(meta["ticker"], {})[meta["horizonte"]] = meta
+        return por_ticker
+
+    def actualizar_datos(self, recargar_precios=False):
+        """Recalcula la última fila de features de cada ticker y recarga los modelos."""
+        with self._candado_recarga:
+            por_ticker = self._modelos_por_ticker()
+            tickers = sorted(por_ticker)
+            if recargar_precios or self._snapshot is None:
+                # Sin entrenar no hace falta toda la historia: solo la que
+                # necesitan las features para completar la última fila
+                nombres = [f for t in tickers for f in features_para_par(t, self.factor)]
+                periodo = periodo_minimo(nombres, filas=1) if nombres else None
+                self._snapshot = cargar_snapshot(sorted(set(tickers) | {self.factor}), periodo=periodo)
+
+            features, fechas = {}, {}
+            for ticker in tickers:
+                horizontes = sorted(por_ticker[ticker])
+                X, _ = crear_features_multihorizonte(horizontes, snapshot=self._snapshot, target=ticker, factor=self.factor)
+                if X is None or X.empty:
+                    print(f"*** [Servicio] Sin features para {ticker}. ***")
+                    continue
+                features[ticker] = X.tail(1)
+                fechas[ticker] = X.index
+            self._features = features
+            self._fechas = fechas
+            self._recargar_modelos(por_ticker)
+
+    def _recargar_modelos(self, por_ticker=None):
+        firma = _firma_registro()
+        por_ticker = por_ticker if por_ticker is not None else self._modelos_por_ticker()
+        estado = {}
+        for ticker, metas in por_ticker.items():
+            ultima = self._features.get(ticker)
+            if ultima is None:
+                continue
+            modelos = {}
+            for h in sorted(metas):
+                modelo, meta = registro_modelos.cargar_modelo(ticker, h)
+                if modelo is None or meta.get("features") != list(ultima.columns):
+                    print(f"*** [Servicio] El modelo {ticker} {h}d no coincide con las features actuales. Se omite. ***")
+                    continue
+                modelos[h] = (modelo, meta)
+            if not modelos:
+                continue
+            puntuador = PuntuadorCompilado({h: m for h, (m, _) in modelos.items()})
+            columnas = puntuador.features or list(ultima.columns)
+            estado[ticker] = {
+                "puntuador": puntuador,
+                "columnas": columnas,
+                "fila": ultima[columnas].to_numpy(np.float32)[0],
+                "fecha_ultimo_cierre": ultima.index[-1].strftime('%Y-%m-%d'),
+                "versiones": {h: meta["version_modelo"] for h, (_, meta) in modelos.items()},
+            }
+        self._estado = estado  # Reemplazo atómico: las solicitudes en curso siguen con el anterior
+        self._firma = firma
+        self.cargado_en = datetime.now().isoformat(timespec="seconds")
+        cargados = ", ".join(f"{t} {sorted(e['versiones'])}" for t, e in estado.items())
+        print(f"[Servicio] Modelos cargados: {cargados or 'ninguno'}")
+
+    def _datos_atrasados(self, por_ticker):
+        """
+        True si algún modelo se entrenó con barras posteriores a las que
+        tiene el servicio. Un modelo de h días entrenado hasta la fecha F
+        vio precios hasta h barras después de F; con las features actuales
+        eso da, como mucho, la fecha h barras antes de la última fila.
+        """
+        for ticker, metas in por_ticker.items():
+            fechas = self._fechas.get(ticker)
+            if fechas is None:
+                continue
+            for h, meta in metas.items():
+                if "fin_entrenamiento" not in meta:
+                    continue
+                limite = fechas[-1 - h] if len(fechas) > h else fechas[0]
+                if pd.Timestamp(meta["fin_entrenamiento"]) > limite:
+                    return True
+        return False
+
+    def recargar_si_cambio(self):
+        """Recarga los modelos si el registro cambió. True si recargó."""
+        if _firma_registro() == self._firma:
+            return False
+        with self._candado_recarga:
+            if _firma_registro() == self._firma:
+                return False
+            por_ticker = self._modelos_por_ticker()
+            # Apareció un ticker nuevo, o un modelo vio barras que acá no
+            # están: hacen falta precios y features nuevos
+            recargar_datos = bool(set(por_ticker) - set(self._features)) or self._datos_atrasados(por_ticker)
+            if not recargar_datos:
+                self._recargar_modelos(por_ticker)
+        if recargar_datos:
+            self.actualizar_datos(recargar_precios=True)
+        with self._candado_recarga:
+            self.contadores.recargas += 1
+        return True
+
+    def _vigilar_registro(self):
+        while not self._detener.wait(self.segundos_vigilancia):
+            try:
+                if self.recargar_si_cambio():
+                    print("[Servicio] Registro de modelos cambió: modelos recargados.")
+            except Exception as e:
+                print(f"*** [Servicio] Falló la recarga de modelos: {e} ***")
+
+    # --- Consultas ---
+
+    def predecir(self, ticker, horizontes=None):
+        """Predicción con la última fila de features del ticker."""
+        entrada = self._estado.get(ticker.upper())
+        if entrada is None:
+            raise ModeloNoEncontrado(f"No hay modelos cargados para {ticker}")
+        clases, probabilidades = entrada["puntuador"].puntuar(entrada["fila"])
+        return {
+            "ticker": ticker.upper(),
+            "fecha_ultimo_cierre": entrada["fecha_ultimo_cierre"],
+            "predicciones": self._formatear(entrada, clases, probabilidades, horizontes),
+        }
+
+    def puntuar(self, ticker, filas, horizontes=None):
+        """Predicción para filas de features propias (en el orden de 'columnas' del estado)."""
+        entrada = self._estado.get(ticker.upper())
+        if entrada is None:
+            raise ModeloNoEncontrado(f"No hay modelos cargados para {ticker}")
+        filas = np.asarray(filas, dtype=np.float32)
+        if filas.ndim != 2 or filas.shape[1] != len(entrada["columnas"]):
+            raise ValueError(f"Se esperan filas de {len(entrada['columnas'])} features: {entrada['columnas']}")
+        clases, probabilidades = entrada["puntuador"].puntuar(filas)
+        return {
+            "ticker": ticker.upper(),
+            "predicciones": [self._formatear(entrada, c, p, horizontes) for c, p in zip(clases, probabilidades)],
+        }
+
+    def _formatear(self, entrada, clases, probabilidades, horizontes):
+        puntuador = entrada["puntuador"]
+        if horizontes:
+            faltantes = set(horizontes) - set(puntuador.horizontes)
+            if faltantes:
+                raise ModeloNoEncontrado(f"No hay modelo de {sorted(faltantes)} días")
+        resultado = []
+        for i, h in enumerate(puntuador.horizontes):
+            if horizontes and h not in horizontes:
+                continue
+            prob = float(probabilidades[i])
+            resultado.append({
+                "horizonte": h,
+                "prediccion": int(clases[i]),
+                "probabilidad_sube": round(prob, 6),
+                "confianza": round(prob if clases[i] == 1 else 1 - prob, 6),
+                "version_modelo": entrada["versiones"][h],
+            })
+        return resultado
+
+    def estado(self):
+        return {
+            "cargado_en": self.cargado_en,
+            "modelos": {
+                t: {"fecha_ultimo_cierre": e["fecha_ultimo_cierre"], "features": e["columnas"],
+                    "versiones": {str(h): v for h, v in e["versiones"].items()}}
+                for t, e in self._estado.items()
+            },
+        }
+
+    # --- Servidor HTTP ---
+
+    def iniciar(self, bloquear=True):
+        """Levanta el servidor (y el vigilante del registro). Devuelve el puerto real."""
+        self._servidor = ThreadingHTTPServer((self.host, self.puerto), _Manejador)
+        self._servidor.daemon_threads = True
+        self._servidor.servicio = self
+        self.puerto = self._servidor.server_address[1]
+        self._detener.clear()
+        vigilante = threading.Thread(target=self._vigilar_registro, daemon=True)
+        vigilante.start()
+        self._hilos = [vigilante]
+        print(f"[Servicio] Escuchando en http://{self.host}:{self.puerto}")
+        if bloquear:
+            try:
+                self._servidor.serve_forever()
+            except KeyboardInterrupt:
+                print("\n[Servicio] Deteniendo...")
+            finally:
+                self.detener()
+        else:
+            hilo = threading.Thread(target=self._servidor.serve_forever, daemon=True)
+            hilo.start()
+            self._hilos.append(hilo)
+        return self.puerto
+
+    def detener(self):
+        self._detener.set()
+        if self._servidor is not None:
+            self._servidor.shutdown()
+            self._servidor.server_close()
+            self._servidor = None
+
+
+class _Manejador(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Conexiones persistentes: clave para muchas consultas por segundo
+    # Encabezados y cuerpo salen en dos escrituras: con Nagle + ACK
+    # demorado del cliente cada respuesta esperaba ~40 ms
+    disable_nagle_algorithm = True
+
+    def log_message(self, formato, *args):
+        pass  # Un print por solicitud mata el rendimiento; ver /metricas
+
+    def _responder(self, codigo, cuerpo):
+        datos = json.dumps(cuerpo).encode("utf-8")
+        self.send_response(codigo)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(datos)))
+        self.end_headers()
+        self.wfile.write(datos)
+
+    def _atender(self, metodo):
+        inicio = time.perf_counter()
+        servicio = self.server.servicio
+        url = urlparse(self.path)
+        try:
+            codigo, cuerpo = self._despachar(servicio, metodo, url)
+        except ModeloNoEncontrado as e:
+            codigo, cuerpo = 404, {"error": str(e).strip("'\"")}
+        except (ValueError, json.JSONDecodeError) as e:
+            codigo, cuerpo = 400, {"error": str(e)}
+        except Exception as e:
+            codigo, cuerpo = 500, {"error": str(e)}
+        self._responder(codigo, cuerpo)
+        servicio.contadores.registrar(url.path, time.perf_counter() - inicio, error=codigo >= 400)
+
+    def _despachar(self, servicio, metodo, url):
+        if metodo == "GET" and url.path == "/prediccion":
+            parametros = parse_qs(url.query)
+            if "ticker" not in parametros:
+                raise ValueError("Falta el parámetro 'ticker'")
+            horizontes = [int(h) for h in parametros.get("horizonte", [])] or None
+            return 200, servicio.predecir(parametros["ticker"][0], horizontes)
+        if metodo == "POST" and url.path == "/puntuar":
+            largo = int(self.headers.get("Content-Length", 0))
+            pedido = json.loads(self.rfile.read(largo) or b"{}")
+            if not isinstance(pedido, dict) or "ticker" not in pedido or "filas" not in pedido:
+                raise ValueError("El cuerpo debe ser un objeto con 'ticker' y 'filas'")
+            return 200, servicio.puntuar(pedido["ticker"], pedido["filas"], pedido.get("horizontes"))
+        if metodo == "POST" and url.path == "/actualizar_datos":
+            servicio.actualizar_datos(recargar_precios=True)
+            return 200, servicio.estado()
+        if metodo == "GET" and url.path == "/estado":
+            return 200, servicio.estado()
+        if metodo == "GET" and url.path == "/metricas":
+            return 200, servicio.contadores.resumen()
+        return 404, {"error": f"Ruta desconocida: {metodo} {url.path}"}
+
+    def do_GET(self):
+        self._atender("GET")
+
+    def do_POST(self):
+        self._atender("POST")
+
+
+if __name__ == "__main__":
+    ServicioPrediccion().iniciar()
@@ -0,0 +1,344 @@
+import sys
+import os
+import io
+import json
+import time
+import shutil
+import platform
+import argparse
+import tempfile
+import warnings
+import statistics
+import contextlib
+import multiprocessing
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import matplotlib
+matplotlib.use("Agg")  # Sin ventanas: plt.show() no bloquea
+import matplotlib.pyplot as plt
+import xgboost as xgb
+
+# --- Configuración de Ruta (Path) ---
+script_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.abspath(os.path.join(script_dir, os.pardir))
+if parent_dir not in sys.path:
+    sys.path.append(parent_dir)
+# --- Fin de Configuración ---
+
+from datos.fuente_sintetica import generar_panel_sintetico
+from modelo import almacen_features
+from modelo.procesador_features import crear_features_y_target, crear_features_multihorizonte, FACTOR_PREDICTOR
+from modelo.gestor_modelo import entrenar_nuevo_modelo, entrenar_y_evaluar, filas_entrenamiento
+from modelo.matriz_cuantizada import MatrizCuantizada
+from modelo.panel_features import crear_features_panel
+from modelo.puntuador_compilado import PuntuadorCompilado
+from graficos.plot_modelo import graficar_importancia_features, graficar_matriz_confusion
+from graficos.plot_prediccion import graficar_predicciones_vs_realidad
+from graficos.plot_velas import graficar_velas_ventana
+
+# Suite de benchmarks sobre datos sintéticos (sin red, deterministas).
+#
+#   python pruebas/benchmarks.py                          # escenarios rápidos
+#   python pruebas/benchmarks.py -e diario_10y panel_1000 # los pedidos
+#   python pruebas/benchmarks.py --guardar-base           # fija la línea base
+#   python pruebas/benchmarks.py --comparar               # marca regresiones (sale con 1)
+#
+# Cada escenario fija el largo (años, diario o de 1 minuto) y el ancho
+# (tickers) del panel. Los casos miden las etapas del pipeline:
+# features (con el almacén vacío y lleno), entrenar_nuevo_modelo, el
+# reentrenamiento de los 3 horizontes (fit() sobre pandas contra la
+# matriz cuantizada compartida, con su pico de memoria), la puntuación
+# de ejecutar_predicciones (fase 4) y los gráficos. Con más de 2 tickers
+# se miden las features del panel (cada ticker contra SMH).
+#
+# De cada caso se guardan todas las repeticiones y su mediana; la
+# comparación usa la mediana y solo marca regresión si además supera un
+# piso de ruido absoluto.
+
+ESCENARIOS = {
+    "diario_10y":  {"anios": 10, "frecuencia": "1D", "tickers": 2},
+    "diario_20y":  {"anios": 20, "frecuencia": "1D", "tickers": 2},
+    "intradia_1y": {"anios": 1, "frecuencia": "1min", "tickers": 2},
+    "intradia_5y": {"anios": 5, "frecuencia": "1min", "tickers": 2},
+    "panel_100":   {"anios": 10, "frecuencia": "1D", "tickers": 100},
+    "panel_1000":  {"anios": 10, "frecuencia": "1D", "tickers": 1000},
+}
+ESCENARIOS_RAPIDOS = ["diario_10y", "panel_100"]  # intradia_*: el gráfico de velas solo tarda ~40 s
+HORIZONTES_BENCHMARK = [1, 5, 21]
+REPETICIONES = 3
+TOLERANCIA_REGRESION = 0.15   # +15% sobre la mediana de la línea base
+PISO_RUIDO_SEGUNDOS = 0.005   # Diferencias menores no cuentan como regresión
+
+DIRECTORIO_RESULTADOS = os.path.join(script_dir, "resultados_benchmark")
+RUTA_BASE = os.path.join(DIRECTORIO_RESULTADOS, "base.json")
+
+
+@contextlib.contextmanager
+def _silencio():
+    """Los [Procesador]/[Gestor Modelo]... (y sus warnings) no se imprimen durante los casos."""
+    with contextlib.redirect_stdout(io.StringIO()), warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        yield
+
+@contextlib.contextmanager
+def _almacen_temporal():
+    """Almacén de features vacío, para medir el cálculo y no la lectura del caché."""
+    anterior = almacen_features.DIRECTORIO_ALMACEN_FEATURES
+    directorio = tempfile.mkdtemp(prefix="bench_features_")
+    almacen_features.DIRECTORIO_ALMACEN_FEATURES = directorio
+    try:
+        yield
+    finally:
+        almacen_features.DIRECTORIO_ALMACEN_FEATURES = anterior
+        shutil.rmtree(directorio, ignore_errors=True)
+
+def _medir(funcion, repeticiones, preparar=None):
+    """Segundos de cada repetición de funcion(); 'preparar' corre antes de cada una, fuera del reloj."""
+    tiempos = []
+    for _ in range(repeticiones):
+        if preparar is not None:
+            preparar()
+        with _silencio():
+            inicio = time.perf_counter()
+            funcion()
+            tiempos.append(time.perf_counter() - inicio)
+    return {
+        "mediana_s": round(statistics.median(tiempos), 6),
+        "min_s": round(min(tiempos), 6),
+        "repeticiones_s": [round(t, 6) for t in tiempos],
+    }
+
+def _memoria_kb(campo):
+    """VmRSS / VmHWM (pico) del proceso en KB; None donde no hay /proc (Windows, macOS)."""
+    try:
+        with open("/proc/self/status") as f:
+            for linea in f:
+                if linea.startswith(campo + ":"):
+                    return int(linea.split()[1])
+    except OSError:
+        pass
+    return None
+
+def _proceso_pico_memoria(funcion, argumentos, conexion):
+    """Corre funcion(*argumentos) y envía su pico de memoria (MB sobre la RSS al empezar)."""
+    with _silencio():
+        base = _memoria_kb("VmRSS")
+        try:
+            with open("/proc/self/clear_refs", "w") as f:
+                f.write("5")  # Reinicia VmHWM: el pico de los imports no cuenta
+        except OSError:
+            base = None
+        funcion(*argumentos)
+        pico = _memoria_kb("VmHWM")
+    conexion.send(None if base is None or pico is None else round((pico - base) / 1024, 1))
+
+def _pico_memoria_mb(funcion, *argumentos):
+    """
+    Pico de memoria de funcion(*argumentos) en un proceso nuevo ('spawn':
+    no hereda el pico de este). None si la plataforma no lo informa.
+    """
+    contexto = multiprocessing.get_context("spawn")
+    receptor, emisor = contexto.Pipe(duplex=False)
+    proceso = contexto.Process(target=_proceso_pico_memoria, args=(funcion, argumentos, emisor))
+    proceso.start()
+    try:
+        return receptor.recv()
+    finally:
+        proceso.join()
+
+
+# --- Casos ---
+
+def _reentrenar_horizontes(X_full, targets, cuantizada):
+    """La fase 2 de ejecutar_predicciones con los 3 modelos obsoletos."""
+    matriz = None
+    if cuantizada:
+        fin_cortes = filas_entrenamiento(min(int(mascara.sum()) for _, mascara in targets.values()))
+        matriz = MatrizCuantizada(X_full, fin_cortes=fin_cortes or None)
+    for h, (y, mascara) in targets.items():
+        entrenar_y_evaluar(X_full[mascara], y[mascara], h, matriz=matriz)
+
+def _casos_par(snapshot, repeticiones):
+    """Pipeline del par AAPL/SMH: features, entrenamiento, puntuación y gráficos."""
+    resultados = {}
+    with _almacen_temporal():
+        resultados["features"] = _medir(
+            lambda: crear_features_y_target(5, snapshot=snapshot), repeticiones,
+            preparar=lambda: shutil.rmtree(almacen_features.DIRECTORIO_ALMACEN_FEATURES, ignore_errors=True),
+        )
+        resultados["features_almacen"] = _medir(lambda: crear_features_y_target(5, snapshot=snapshot), repeticiones)
+
+        with _silencio():
+            X_full, targets = crear_features_multihorizonte(HORIZONTES_BENCHMARK, snapshot=snapshot)
+            X, y = X_full[targets[5][1]], targets[5][0][targets[5][1]]
+        resultados["entrenamiento"] = _medir(lambda: entrenar_nuevo_modelo(5, snapshot=snapshot, X=X, y=y), repeticiones)
+
+        # Los 3 horizontes: cada fit() re-lee pandas y calcula sus cortes,
+        # contra una matriz float32 con un solo sketch compartido
+        for caso, cuantizada in (("reentrenamiento_pandas", False), ("reentrenamiento_cuantizada", True)):
+            resultados[caso] = _medir(lambda: _reentrenar_horizontes(X_full, targets, cuantizada), repeticiones)
+            resultados[caso]["pico_mb"] = _pico_memoria_mb(_reentrenar_horizontes, X_full, targets, cuantizada)
+
+        # Fase 4 de ejecutar_predicciones: compilar los 3 modelos y puntuar la última fila
+        with _silencio():
+            modelos = {}
+            for h in HORIZONTES_BENCHMARK:
+                y_h, mascara = targets[h]
+                modelos[h], _ = entrenar_y_evaluar(X_full[mascara], y_h[mascara], h)
+        ultima = X_full.tail(1)
+
+        def puntuar():
+            puntuador = PuntuadorCompilado(modelos)
+            fila = ultima[puntuador.features or list(X_full.columns)].to_numpy(np.float32)[0]
+            return puntuador.puntuar_dict(fila)
+        resultados["puntuacion"] = _medir(puntuar, repeticiones)
+        puntuador = PuntuadorCompilado(modelos)
+        fila = ultima.to_numpy(np.float32)[0]
+        resultados["puntuacion_fila"] = _medir(lambda: [puntuador.puntuar(fila) for _ in range(1000)], repeticiones)
+        resultados["puntuacion_fila"]["nota"] = "1000 llamadas"
+
+        # Gráficos (backend Agg: se dibuja todo, sin ventana)
+        modelo = modelos[5]
+        corte = int(len(X) * 0.8)
+        X_test, y_test = X.iloc[corte:], y.iloc[corte:]
+        y_pred = modelo.predict(X_test)
+        for nombre, graficar in {
+            "grafico_importancia": lambda: graficar_importancia_features(modelo),
+            "grafico_confusion": lambda: graficar_matriz_confusion(y_test, y_pred),
+            "grafico_prediccion": lambda: graficar_predicciones_vs_realidad(modelo, X_test, y_test, y_pred, snapshot=snapshot),
+            "grafico_velas": lambda: graficar_velas_ventana(snapshot["AAPL"], "AAPL"),
+        }.items():
+            resultados[nombre] = _medir(lambda: (graficar(), plt.close("all")), repeticiones)
+    return resultados
+
+def _casos_panel(snapshot, repeticiones):
+    """Features de todos los tickers contra el factor, en una pasada."""
+    precios = pd.DataFrame({t: df["Close"] for t, df in snapshot.items()})
+    pares = [(t, FACTOR_PREDICTOR) for t in precios.columns if t != FACTOR_PREDICTOR]
+    return {
+        "panel_features": _medir(lambda: crear_features_panel(precios, pares, procesos=1), repeticiones),
+        "panel_features_pool": _medir(lambda: crear_features_panel(precios, pares), repeticiones),
+    }
+
+
+def _entorno():
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "xgboost": xgb.__version__,
+        "plataforma": platform.platform(),
+        "procesador": platform.processor() or platform.machine(),
+        "nucleos": os.cpu_count(),
+    }
+
+def ejecutar_benchmarks(escenarios=None, repeticiones: int = REPETICIONES, semilla: int = 42):
+    """
+    Corre los escenarios pedidos (por defecto ESCENARIOS_RAPIDOS).
+    Se aceptan nombres de ESCENARIOS o dicts {'anios', 'frecuencia', 'tickers'}.
+
+    Returns:
+        dict con el entorno y {escenario: {'config', 'filas', 'casos': {caso: tiempos}}}.
+    """
+    escenarios = escenarios or ESCENARIOS_RAPIDOS
+    resultado = {"fecha": datetime.now().isoformat(timespec="seconds"), "entorno": _entorno(), "escenarios": {}}
+    for escenario in escenarios:
+        nombre, config = (escenario, ESCENARIOS[escenario]) if isinstance(escenario, str) else (
+            f"{escenario['tickers']}x{escenario['anios']}y_{escenario['frecuencia']}", escenario)
+        print(f"[Benchmark] {nombre}: {config['tickers']} tickers, {config['anios']} años ({config['frecuencia']})...")
+        with _silencio():
+            snapshot = generar_panel_sintetico(config["tickers"], config["anios"], config["frecuencia"], semilla)
+        inicio = time.perf_counter()
+        casos = _casos_par(snapshot, repeticiones) if config["tickers"] <= 2 else _casos_panel(snapshot, repeticiones)
+        resultado["escenarios"][nombre] = {
+            "config": config,
+            "filas": len(snapshot["AAPL"]),
+            "casos": casos,
+        }
+        for caso, tiempos in casos.items():
+            memoria = f" | pico +{tiempos['pico_mb']} MB" if tiempos.get("pico_mb") is not None else ""
+            print(f"    {caso:<27}{tiempos['mediana_s']:>10.4f} s (mín. {tiempos['min_s']:.4f}){memoria}")
+        print(f"    ({time.perf_counter() - inicio:.1f} s en total)")
+    return resultado
+
+def comparar(actual: dict, base: dict, tolerancia: float = TOLERANCIA_REGRESION,
+             piso_segundos: float = PISO_RUIDO_SEGUNDOS):
+    """
+    Compara las medianas de 'actual' contra 'base' (casos presentes en ambos).
+
+    Returns:
+        Lista de dicts {escenario, caso, base_s, actual_s, cambio, regresion}.
+    """
+    filas = []
+    for escenario, datos in actual["escenarios"].items():
+        casos_base = base.get("escenarios", {}).get(escenario, {}).get("casos", {})
+        for caso, tiempos in datos["casos"].items():
+            if caso not in casos_base:
+                continue
+            antes, ahora = casos_base[caso]["mediana_s"], tiempos["mediana_s"]
+            filas.append({
+                "escenario": escenario,
+                "caso": caso,
+                "base_s": antes,
+                "actual_s": ahora,
+                "cambio": round(ahora / antes - 1, 4) if antes > 0 else None,
+                "regresion": ahora > antes * (1 + tolerancia) and ahora - antes > piso_segundos,
+            })
+    return filas
+
+def _imprimir_comparacion(filas):
+    print("\n--- Comparación contra la Línea Base ---")
+    print(f"{'Escenario':<14}{'Caso':<27}{'Base s':>10}{'Actual s':>10}{'Cambio':>9}")
+    for f in filas:
+        cambio = "-" if f["cambio"] is None else f"{f['cambio']:+.1%}"
+        marca = "  <-- REGRESIÓN" if f["regresion"] else ""
+        print(f"{f['escenario']:<14}{f['caso']:<27}{f['base_s']:>10.4f}{f['actual_s']:>10.4f}{cambio:>9}{marca}")
+
+def guardar_resultados(resultado, ruta=None):
+    if ruta is None:
+        os.makedirs(DIRECTORIO_RESULTADOS, exist_ok=True)
+        ruta = os.path.join(DIRECTORIO_RESULTADOS, f"benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(ruta, "w", encoding="utf-8") as f:
+        json.dump(resultado, f, indent=1)
+    print(f"[Benchmark] Resultados guardados en: {ruta}")
+    return ruta
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks del pipeline sobre datos sintéticos.")
+    parser.add_argument("-e", "--escenarios", nargs="+", choices=sorted(ESCENARIOS), default=None,
+                        help=f"Por defecto: {' '.join(ESCENARIOS_RAPIDOS)}")
+    parser.add_argument("-r", "--repeticiones", type=int, default=REPETICIONES)
+    parser.add_argument("-o", "--salida", help="Archivo JSON de resultados")
+    parser.add_argument("--base", default=RUTA_BASE, help="Línea base a guardar o comparar")
+    parser.add_argument("--guardar-base", action="store_true", help="Guarda estos resultados como línea base")
+    parser.add_argument("--comparar", action="store_true", help="Compara contra la línea base (sale con 1 si hay regresiones)")
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCIA_REGRESION)
+    args = parser.parse_args(argv)
+
+    resultado = ejecutar_benchmarks(args.escenarios, args.repeticiones)
+    guardar_resultados(resultado, args.salida)
+    if args.guardar_base:
+        os.makedirs(os.path.dirname(os.path.abspath(args.base)), exist_ok=True)
+        guardar_resultados(resultado, args.base)
+
+    if args.comparar:
+        if not os.path.exists(args.base):
+            print(f"*** [Benchmark] No hay línea base en {args.base} (usa --guardar-base). ***")
+            return 2
+        with open(args.base, encoding="utf-8") as f:
+            base = json.load(f)
+        filas = comparar(resultado, base, args.tolerancia)
+        _imprimir_comparacion(filas)
+        regresiones = [f for f in filas if f["regresion"]]
+        if regresiones:
+            print(f"\n*** {len(regresiones)} regresión(es) de más de {args.tolerancia:.0%} ***")
+            return 1
+        print("\nSin regresiones.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
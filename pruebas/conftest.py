@@ -0,0 +1,45 @@
+import sys
+import os
+
+import pytest
+
+# --- Configuración de Ruta (Path) ---
+script_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.abspath(os.path.join(script_dir, os.pardir))
+if parent_dir not in sys.path:
+    sys.path.append(parent_dir)
+# --- Fin de Configuración ---
+
+from datos.fuente_sintetica import FuenteSintetica
+from modelo import almacen_features, registro_modelos
+
+
+@pytest.fixture(autouse=True)
+def almacen_features_temporal(tmp_path, monkeypatch):
+    """
+    Cada prueba arranca con un almacén de features vacío y propio: los
+    resultados no dependen del caché del desarrollador y no dejan nada
+    en modelo/cache_features/.
+    """
+    monkeypatch.setattr(almacen_features, "DIRECTORIO_ALMACEN_FEATURES", str(tmp_path / "cache_features"))
+
+
+@pytest.fixture
+def snapshot_sintetico():
+    """
+    Fábrica de snapshots sintéticos (sin red, deterministas):
+    snapshot_sintetico(semilla, tickers=("AAPL", "SMH"), periodo="3y")
+    devuelve {ticker: OHLCV}. Cada módulo usa su propia semilla.
+    """
+    def crear(semilla, tickers=("AAPL", "SMH"), periodo="3y"):
+        fuente = FuenteSintetica(semilla=semilla)
+        return {t: fuente.obtener_datos_precios(t, periodo=periodo) for t in tickers}
+    return crear
+
+
+@pytest.fixture
+def registro_temporal(tmp_path, monkeypatch):
+    """Registro de modelos vacío y propio de la prueba. Devuelve su directorio."""
+    directorio = str(tmp_path / "modelos")
+    monkeypatch.setattr(registro_modelos, "DIRECTORIO_MODELOS", directorio)
+    return directorio
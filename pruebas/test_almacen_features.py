@@ -0,0 +1,64 @@
+import sys
+import os
+import pandas as pd
+import pytest
+
+# --- Configuración de Ruta (Path) ---
+script_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.abspath(os.path.join(script_dir, os.pardir))
+if parent_dir not in sys.path:
+    sys.path.append(parent_dir)
+# --- Fin de Configuración ---
+
+from modelo import almacen_features, procesador_features
+
+
+@pytest.fixture
+def llamadas(monkeypatch):
+    filas_calculadas = []
+    original = procesador_features.calcular_features
+
+    def calcular(df, features):
+        filas_calculadas.append(len(df))
+        return original(df, features)
+
+    monkeypatch.setattr(procesador_features, "calcular_features", calcular)
+    return filas_calculadas
+
+
+def test_datos_iguales_no_recalculan(llamadas, snapshot_sintetico):
+    snapshot = snapshot_sintetico(9)
+    X1, _ = procesador_features.crear_features_multihorizonte([5], snapshot=snapshot)
+    X2, _ = procesador_features.crear_features_multihorizonte([5], snapshot=snapshot)
+    assert len(llamadas) == 1
+    pd.testing.assert_frame_equal(X1, X2)
+
+
+def test_barras_nuevas_solo_calculan_la_cola(llamadas, snapshot_sintetico):
+    snapshot = snapshot_sintetico(9)
+    viejo = {t: df.iloc[:-10] for t, df in snapshot.items()}
+    procesador_features.crear_features_multihorizonte([5], snapshot=viejo)
+    X, _ = procesador_features.crear_features_multihorizonte([5], snapshot=snapshot)
+
+    calentamiento = procesador_features.historial_minimo(procesador_features.FEATURES_MODELO) - 1
+    assert llamadas[-1] == 10 + calentamiento
+
+    esperado = procesador_features._calcular_features(
+        procesador_features._cargar_precios(snapshot), usar_almacen=False
+    )[procesador_features.FEATURES_MODELO].dropna()
+    pd.testing.assert_frame_equal(X, esperado, rtol=1e-12)
+
+
+def test_cambio_de_version_invalida(llamadas, monkeypatch, snapshot_sintetico):
+    snapshot = snapshot_sintetico(9)
+    procesador_features.crear_features_multihorizonte([5], snapshot=snapshot)
+    monkeypatch.setattr(procesador_features, "VERSION_FEATURES", procesador_features.VERSION_FEATURES + 1)
+    procesador_features.crear_features_multihorizonte([5], snapshot=snapshot)
+    assert len(llamadas) == 2
+
+
+def test_expulsion_lru(llamadas, snapshot_sintetico):
+    procesador_features.crear_features_multihorizonte([5], snapshot=snapshot_sintetico(9, periodo="2y"))
+    procesador_features.crear_features_multihorizonte([5], snapshot=snapshot_sintetico(9, periodo="3y"))
+    assert almacen_features.expulsar_lru(max_mb=0) == 2
+    assert not any(a.endswith(".parquet") for a in os.listdir(almacen_features.DIRECTORIO_ALMACEN_FEATURES))
@@ -0,0 +1,92 @@
+import sys
+import os
+import pandas as pd
+import numpy as np
+import pytest
+
+# --- Configuración de Ruta (Path) ---
+script_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.abspath(os.path.join(script_dir, os.pardir))
+if parent_dir not in sys.path:
+    sys.path.append(parent_dir)
+# --- Fin de Configuración ---
+
+from datos import almacen_precios, fuente_yfinance
+
+
+def _barras(fechas, closes, dividendos=None):
+    df = pd.DataFrame({
+        'Open': closes, 'High': closes, 'Low': closes, 'Close': closes,
+        'Volume': np.ones(len(closes)),
+        'Dividends': dividendos if dividendos is not None else np.zeros(len(closes)),
+        'Stock Splits': np.zeros(len(closes)),
+    }, index=pd.DatetimeIndex(fechas))
+    return df
+
+
+@pytest.fixture
+def almacen_temporal(tmp_path, monkeypatch):
+    monkeypatch.setattr(almacen_precios, "DIRECTORIO_ALMACEN", str(tmp_path))
+    monkeypatch.setattr(almacen_precios, "MINUTOS_FRESCURA_ALMACEN", 0)
+    return tmp_path
+
+
+def _simular_yahoo(monkeypatch, historia):
+    """Reemplaza la descarga por un recorte de 'historia' y cuenta las llamadas."""
+    llamadas = []
+
+    def descargar(ticker, **kwargs):
+        llamadas.append(kwargs)
+        if 'start' in kwargs:
+            return historia[historia.index >= pd.Timestamp(kwargs['start'])].copy()
+        return historia.copy()
+
+    monkeypatch.setattr(fuente_yfinance, "_descargar_historia", descargar)
+    return llamadas
+
+
+def test_descarga_incremental_solo_pide_barras_nuevas(almacen_temporal, monkeypatch):
+    hoy = pd.Timestamp.today().normalize()
+    fechas = pd.bdate_range(end=hoy, periods=30)
+    historia = _barras(fechas, np.linspace(100, 130, 30))
+
+    llamadas = _simular_yahoo(monkeypatch, historia.iloc[:25])
+    fuente_yfinance.obtener_datos_precios("TEST", periodo="1y")
+    assert llamadas == [{'period': '1y'}]
+
+    llamadas = _simular_yahoo(monkeypatch, historia)
+    df = fuente_yfinance.obtener_datos_precios("TEST", periodo="1y")
+    assert list(llamadas[0]) == ['start']
+    pd.testing.assert_frame_equal(df, historia, check_freq=False)
+
+
+def test_reajuste_por_dividendo_fuerza_descarga_completa(almacen_temporal, monkeypatch):
+    hoy = pd.Timestamp.today().normalize()
+    fechas = pd.bdate_range(end=hoy, periods=30)
+    original = _barras(fechas[:25], np.linspace(100, 125, 25))
+
+    _simular_yahoo(monkeypatch, original)
+    fuente_yfinance.obtener_datos_precios("TEST", periodo="1y")
+
+    # Yahoo re-ajusta toda la historia hacia atrás tras un dividendo
+    dividendos = np.zeros(30)
+    dividendos[27] = 1.0
+    ajustada = _barras(fechas, np.linspace(100, 130, 30) * 0.99, dividendos)
+    llamadas = _simular_yahoo(monkeypatch, ajustada)
+    df = fuente_yfinance.obtener_datos_precios("TEST", periodo="1y")
+
+    assert {'period': '1y'} in llamadas
+    pd.testing.assert_frame_equal(df, ajustada, check_freq=False)
+
+
+def test_almacen_fresco_no_usa_la_red(almacen_temporal, monkeypatch):
+    hoy = pd.Timestamp.today().normalize()
+    historia = _barras(pd.bdate_range(end=hoy, periods=10), np.arange(10.0) + 1)
+    _simular_yahoo(monkeypatch, historia)
+    fuente_yfinance.obtener_datos_precios("TEST", periodo="1y")
+
+    monkeypatch.setattr(almacen_precios, "MINUTOS_FRESCURA_ALMACEN", 60)
+    llamadas = _simular_yahoo(monkeypatch, historia)
+    df = fuente_yfinance.obtener_datos_precios("TEST", periodo="1y")
+    assert llamadas == []
+    assert len(df) == 10
@@ -0,0 +1,116 @@
+import sys
+import os
+import sqlite3
+import multiprocessing
+import pandas as pd
+import pytest
+
+# --- Configuración de Ruta (Path) ---
+script_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.abspath(os.path.join(script_dir, os.pardir))
+if parent_dir not in sys.path:
+    sys.path.append(parent_dir)
+# --- Fin de Configuración ---
+
+from predicciones import almacen_predicciones as almacen
+
+
+def _prediccion(fecha, horizonte, version="AAPL_v1", confianza=0.6, prediccion=1, ticker="AAPL"):
+    return {"ticker": ticker, "fecha_ultimo_cierre": fecha, "horizonte": horizonte, "version_modelo": version,
+            "prediccion": prediccion, "confianza": confianza, "precio_ultimo_cierre": 100.0}
+
+
+def test_upsert_por_clave_y_tipos(tmp_path):
+    ruta = str(tmp_path / "p.sqlite")
+    almacen.guardar_predicciones([_prediccion("2025-01-02", 1), _prediccion("2025-01-02", 5)], ruta)
+    # Misma clave: se actualiza; otra versión del modelo: fila nueva
+    almacen.guardar_predicciones([_prediccion("2025-01-02", 1, confianza=0.7, prediccion=0),
+                                  _prediccion("2025-01-02", 1, version="AAPL_v2")], ruta)
+    df = almacen.leer_predicciones(ruta=ruta)
+    assert len(df) == 3
+    fila = df[(df.horizonte == 1) & (df.version_modelo == "AAPL_v1")].iloc[0]
+    assert fila.prediccion == 0 and fila.confianza == pytest.approx(0.7)
+    assert fila.probabilidad_sube == pytest.approx(0.3)
+    assert pd.api.types.is_datetime64_any_dtype(df["fecha_ultimo_cierre"])
+
+    with pytest.raises(Exception):  # Confianza fuera de [0, 1]
+        almacen.guardar_predicciones([_prediccion("2025-01-03", 1, confianza=54.49)], ruta)
+    assert len(almacen.leer_predicciones(ruta=ruta)) == 3  # La transacción fallida no dejó nada
+
+
+def test_consultas_usan_los_indices(tmp_path):
+    ruta = str(tmp_path / "p.sqlite")
+    fechas = pd.bdate_range("2024-01-01", periods=40)
+    almacen.guardar_predicciones(
+        [_prediccion(f, h, ticker=t) for f in fechas for h in (1, 5) for t in ("AAPL", "NVDA")], ruta)
+    df = almacen.leer_predicciones(ticker="nvda", desde=fechas[10], hasta=fechas[19], horizonte=5, ruta=ruta)
+    assert len(df) == 10 and set(df.ticker) == {"NVDA"}
+
+    conexion = almacen.conectar(ruta)
+    try:
+        planes = {
+            consulta: " ".join(r[-1] for r in conexion.execute(f"EXPLAIN QUERY PLAN {consulta}"))
+            for consulta in (
+                "SELECT * FROM predicciones WHERE ticker = 'AAPL' AND fecha_ultimo_cierre >= '2024-01-10'",
+                "SELECT * FROM predicciones WHERE fecha_ultimo_cierre = '2024-01-10'",
+            )
+        }
+        assert conexion.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    finally:
+        conexion.close()
+    assert all("SEARCH" in plan and "SCAN" not in plan for plan in planes.values()), planes
+
+
+def test_importa_el_csv_heredado_sin_duplicados(tmp_path):
+    csv = tmp_path / "registro.csv"
+    csv.write_text(
+        "fecha_prediccion,fecha_ultimo_cierre,precio_ultimo_cierre,pred_1d,conf_1d,pred_5d,conf_5d,pred_21d,conf_21d\n"
+        "2025-11-13,2025-11-13,272.95,0,54.49%,1,51.97%,1,66.99%\n"
+        "2025-11-13,2025-11-13,272.95,0,53.99%,1,57.74%,1,66.99%\n"
+    )
+    ruta = str(tmp_path / "p.sqlite")
+    assert almacen.importar_csv(str(csv), ruta=ruta) == 3  # 6 filas, 3 predicciones distintas
+    df = almacen.leer_predicciones(ruta=ruta).set_index("horizonte")
+    assert list(df.index) == [1, 5, 21]
+    assert df.loc[1, "confianza"] == pytest.approx(0.5399)  # La última de las repetidas
+    assert df.loc[5, "probabilidad_sube"] == pytest.approx(0.5774)
+    assert (df.version_modelo == almacen.VERSION_DESCONOCIDA).all()
+
+
+def _escritor(ruta, proceso, n):
+    for i in range(n):
+        almacen.guardar_predicciones([_prediccion(pd.Timestamp("2020-01-01") + pd.Timedelta(days=i), proceso)], ruta)
+
+
+def test_escritores_concurrentes(tmp_path):
+    ruta = str(tmp_path / "p.sqlite")
+    almacen.conectar(ruta).close()
+    procesos = [multiprocessing.Process(target=_escritor, args=(ruta, p, 50)) for p in range(4)]
+    for p in procesos:
+        p.start()
+    for p in procesos:
+        p.join()
+    assert all(p.exitcode == 0 for p in procesos)
+    assert len(almacen.leer_predicciones(ruta=ruta)) == 200
+
+
+def test_esquema_y_wal_una_vez_por_ruta(tmp_path, monkeypatch):
+    sentencias = []
+    conectar_sqlite = sqlite3.connect
+
+    def conectar_con_traza(*args, **kwargs):
+        conexion = conectar_sqlite(*args, **kwargs)
+        conexion.set_trace_callback(sentencias.append)
+        return conexion
+    monkeypatch.setattr(sqlite3, "connect", conectar_con_traza)
+
+    ruta = str(tmp_path / "p.sqlite")
+    almacen.guardar_predicciones([_prediccion("2025-01-02", 1)], ruta)
+    for _ in range(3):
+        almacen.leer_predicciones(ruta=ruta)
+    assert sum("CREATE TABLE" in s for s in sentencias) == 1
+    assert sum("journal_mode" in s for s in sentencias) == 1
+
+    # Si la base se borra, la próxima conexión la vuelve a crear
+    os.remove(ruta)
+    assert len(almacen.leer_predicciones(ruta=ruta)) == 0
@@ -0,0 +1,71 @@
+import sys
+import os
+import numpy as np
+import xgboost as xgb
+import pytest
+
+# --- Configuración de Ruta (Path) ---
+script_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.abspath(os.path.join(script_dir, os.pardir))
+if parent_dir not in sys.path:
+    sys.path.append(parent_dir)
+# --- Fin de Configuración ---
+
+from modelo.backtest import ejecutar_backtest, generar_pliegues, _cadena_pliegues
+from modelo.gestor_modelo import parametros_nativos
+from modelo.matriz_cuantizada import MatrizCuantizada
+from modelo.planificador_entrenamiento import _publicar_matriz
+from modelo.procesador_features import crear_features_multihorizonte
+
+
+@pytest.fixture
+def features(snapshot_sintetico):
+    return crear_features_multihorizonte([1, 5], snapshot=snapshot_sintetico(16))
+
+
+def test_pliegues_dejan_un_hueco_de_horizonte():
+    pliegues = generar_pliegues(300, horizonte=5, min_entrenamiento=100, paso=50)
+    assert pliegues[0] == (100, 105, 155)
+    assert pliegues[-1][2] == 300
+    for fin_entrenamiento, inicio_prueba, _ in pliegues:
+        assert inicio_prueba - fin_entrenamiento == 5
+
+
+def test_backtest_warm_start_y_pool(features):
+    X, targets = features
+    resumen, predicciones = ejecutar_backtest(
+        [1, 5], X=X, targets=targets, min_entrenamiento=300, paso=50, procesos=2, nucleos=2,
+    )
+    assert list(resumen.index) == [1, 5]
+    assert (resumen["accuracy"].between(0, 1)).all()
+    # Cada fila de prueba aparece una sola vez por horizonte
+    assert not predicciones.reset_index().duplicated(["fecha", "horizonte"]).any()
+    assert resumen.loc[5, "filas_prueba"] == targets[5][1].sum() - 305
+
+    # Sin warm start los pliegues son independientes: el pool no cambia el resultado
+    _, en_pool = ejecutar_backtest([5], X=X, targets=targets, min_entrenamiento=300, paso=50,
+                                   warm_start=False, procesos=2, nucleos=2)
+    _, local = ejecutar_backtest([5], X=X, targets=targets, min_entrenamiento=300, paso=50,
+                                 warm_start=False, procesos=1, nucleos=2)
+    np.testing.assert_allclose(en_pool["probabilidad"], local["probabilidad"], rtol=1e-6)
+
+
+def test_warm_start_equivale_a_continuar_con_xgb_model(features):
+    X, targets = features
+    y = targets[1][0][targets[1][1]].to_numpy()
+    hiperparametros = {"n_estimators": 20, "learning_rate": 0.1, "max_depth": 3}
+    pliegues = [(0, (300, 301, 350)), (1, (350, 351, 400))]
+    shm, descriptor = _publicar_matriz(X, {1: targets[1]})
+    try:
+        _, _, probabilidades, _ = _cadena_pliegues(descriptor, 1, pliegues, hiperparametros, 5, True, 1, 300)
+    finally:
+        shm.close()
+        shm.unlink()
+
+    parametros, _ = parametros_nativos(hiperparametros, 1)
+    matriz = MatrizCuantizada(X, fin_cortes=300)
+    booster = xgb.train(parametros, matriz.vista(300, etiquetas=y[:300]), 20)
+    esperado = [booster.inplace_predict(matriz.datos[301:350])]
+    booster = xgb.train(parametros, matriz.vista(350, etiquetas=y[:350]), 5, xgb_model=booster)
+    esperado.append(booster.inplace_predict(matriz.datos[351:400]))
+    np.testing.assert_allclose(probabilidades, np.concatenate(esperado), atol=1e-6)
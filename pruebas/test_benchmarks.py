@@ -0,0 +1,61 @@
+import sys
+import os
+import json
+import numpy as np
+import pandas as pd
+
+# --- Configuración de Ruta (Path) ---
+script_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.abspath(os.path.join(script_dir, os.pardir))
+if parent_dir not in sys.path:
+    sys.path.append(parent_dir)
+# --- Fin de Configuración ---
+
+from datos.fuente_sintetica import generar_panel_sintetico
+from pruebas import benchmarks
+
+
+def test_panel_sintetico_determinista_e_intradia():
+    a = generar_panel_sintetico(4, anios=0.1, frecuencia="1min", semilla=3)
+    b = generar_panel_sintetico(4, anios=0.1, frecuencia="1min", semilla=3)
+    assert list(a) == ["AAPL", "SMH", "T0002", "T0003"]
+    pd.testing.assert_frame_equal(a["T0003"], b["T0003"])
+    indice = a["AAPL"].index
+    assert len(indice) % 390 == 0 and indice[0].strftime("%H:%M") == "09:30" and indice[389].strftime("%H:%M") == "15:59"
+    df = a["SMH"]
+    assert (df["High"] >= df[["Open", "Close"]].max(axis=1)).all() and (df["Low"] <= df[["Open", "Close"]].min(axis=1)).all()
+    # Los tickers comparten el factor de mercado
+    retornos = pd.DataFrame({t: d["Close"] for t, d in a.items()}).pct_change().dropna()
+    assert retornos.corr().to_numpy()[np.triu_indices(4, 1)].min() > 0.3
+
+
+def test_comparacion_marca_regresiones_sobre_el_ruido():
+    def resultado(tiempos):
+        return {"escenarios": {"e": {"casos": {c: {"mediana_s": t} for c, t in tiempos.items()}}}}
+    base = resultado({"lento": 1.0, "rapido": 0.001, "igual": 0.5})
+    actual = resultado({"lento": 1.3, "rapido": 0.002, "igual": 0.52, "nuevo": 9.0})
+    filas = {f["caso"]: f for f in benchmarks.comparar(actual, base, tolerancia=0.15)}
+    assert set(filas) == {"lento", "rapido", "igual"}
+    assert filas["lento"]["regresion"] and filas["lento"]["cambio"] == 0.3
+    assert not filas["rapido"]["regresion"]  # +100%, pero por debajo del piso de ruido
+    assert not filas["igual"]["regresion"]
+
+
+def test_suite_chica_y_linea_base(tmp_path, monkeypatch):
+    monkeypatch.setitem(benchmarks.ESCENARIOS, "mini", {"anios": 3, "frecuencia": "1D", "tickers": 2})
+    monkeypatch.setitem(benchmarks.ESCENARIOS, "mini_panel", {"anios": 1, "frecuencia": "1D", "tickers": 5})
+    monkeypatch.setattr(benchmarks, "DIRECTORIO_RESULTADOS", str(tmp_path))
+    base = str(tmp_path / "base.json")
+    argumentos = ["-e", "mini", "mini_panel", "-r", "1", "--base", base]
+    assert benchmarks.main(argumentos + ["--comparar"]) == 2  # Todavía no hay línea base
+    assert benchmarks.main(argumentos + ["--guardar-base"]) == 0
+
+    with open(base, encoding="utf-8") as f:
+        guardado = json.load(f)
+    casos = guardado["escenarios"]["mini"]["casos"]
+    assert {"features", "entrenamiento", "puntuacion", "grafico_velas", "reentrenamiento_pandas",
+            "reentrenamiento_cuantizada"} <= set(casos)
+    assert "pico_mb" in casos["reentrenamiento_cuantizada"]
+    assert set(guardado["escenarios"]["mini_panel"]["casos"]) == {"panel_features", "panel_features_pool"}
+    assert all(c["mediana_s"] > 0 for c in casos.values())
+    assert guardado["entorno"]["xgboost"]
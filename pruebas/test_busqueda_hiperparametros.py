@@ -0,0 +1,47 @@
+import sys
+import os
+import pytest
+
+# --- Configuración de Ruta (Path) ---
+script_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.abspath(os.path.join(script_dir, os.pardir))
+if parent_dir not in sys.path:
+    sys.path.append(parent_dir)
+# --- Fin de Configuración ---
+
+from modelo import registro_modelos
+from modelo.busqueda_hiperparametros import (
+    buscar_hiperparametros, division_parada, muestrear_configuraciones, pliegues_validacion, presupuesto_arboles,
+)
+from modelo.procesador_features import crear_features_y_target
+
+
+@pytest.fixture
+def datos(snapshot_sintetico, registro_temporal):
+    return crear_features_y_target(dias_a_predecir=5, snapshot=snapshot_sintetico(17))
+
+
+def test_pliegues_y_presupuesto():
+    assert pliegues_validacion(1000, horizonte=5) == [(695, 700, 800), (795, 800, 900), (895, 900, 1000)]
+    # El early stopping usa la cola del entrenamiento, nunca el bloque de validación
+    assert division_parada(695, horizonte=5) == (621, 626)
+    # 27 x 30 + 9 x 90 + 3 x 270 + 1 x 810, por 3 pliegues
+    assert presupuesto_arboles(27) == 4 * 810 * 3
+    configuraciones = muestrear_configuraciones(10, semilla=1)
+    assert len({tuple(sorted(c.items())) for c in configuraciones}) == 10
+
+
+def test_busqueda_guarda_en_el_registro(datos):
+    X, y = datos
+    resultado = buscar_hiperparametros(5, X, y, configuraciones=6, eta=2, min_arboles=10, max_arboles=40,
+                                       procesos=2, nucleos=2)
+    rondas = resultado["busqueda"]["rondas"]
+    assert [r["configuraciones"] for r in rondas] == [6, 3, 1]
+    assert resultado["busqueda"]["arboles_entrenados"] <= presupuesto_arboles(6, 2, 10, 40)
+
+    mejores = resultado["mejores_hiperparametros"]
+    assert registro_modelos.hiperparametros_de("AAPL", 5) == {**registro_modelos.HIPERPARAMETROS_MODELO, **mejores}
+    # El próximo entrenamiento usa (y conserva) la configuración encontrada
+    _, meta = registro_modelos.obtener_o_entrenar(5, X, y)
+    assert meta["hiperparametros"]["max_depth"] == mejores["max_depth"]
+    assert meta["busqueda"]["rondas"] == rondas
@@ -0,0 +1,104 @@
+import sys
+import os
+import time
+import asyncio
+import threading
+
+# --- Configuración de Ruta (Path) ---
+script_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.abspath(os.path.join(script_dir, os.pardir))
+if parent_dir not in sys.path:
+    sys.path.append(parent_dir)
+# --- Fin de Configuración ---
+
+import pytest
+
+from datos import cache_info, fuentes
+
+
+class FuenteLenta:
+    def __init__(self):
+        self.llamadas = []
+        self.info = {"currentPrice": 10.0, "sector": "Technology"}
+        self._lock = threading.Lock()
+
+    def obtener_datos_precios(self, ticker, periodo="10y"):
+        return None
+
+    def obtener_datos_relevantes(self, ticker_symbol):
+        with self._lock:
+            self.llamadas.append(ticker_symbol)
+        time.sleep(0.2)
+        return {"info": dict(self.info)}
+
+
+@pytest.fixture
+def fuente(tmp_path, monkeypatch):
+    fuente = FuenteLenta()
+    monkeypatch.setattr(cache_info, "DIRECTORIO_CACHE_INFO", str(tmp_path))
+    monkeypatch.setattr(fuentes, "_fuente_activa", fuente)
+    cache_info.limpiar_memoria()
+    yield fuente
+    cache_info.limpiar_memoria()
+
+
+def test_ttl_por_campo(fuente, monkeypatch):
+    cache_info.obtener_info("AAPL")
+    cache_info.obtener_info("AAPL")
+    assert fuente.llamadas == ["AAPL"]
+
+    # Pasan 10 minutos: el precio venció, el sector no
+    reloj = time.time() + 600
+    monkeypatch.setattr(cache_info.time, "time", lambda: reloj)
+    cache_info.obtener_info("AAPL", campos=["sector"])
+    assert fuente.llamadas == ["AAPL"]
+    cache_info.obtener_info("AAPL", campos=["currentPrice"])
+    assert fuente.llamadas == ["AAPL", "AAPL"]
+
+    # La caché en disco sobrevive a un reinicio (memoria vacía)
+    cache_info.limpiar_memoria()
+    cache_info.obtener_info("AAPL", campos=["sector"])
+    assert len(fuente.llamadas) == 2
+
+
+def test_refresco_async_en_paralelo(fuente):
+    tickers = [f"T{i}" for i in range(10)]
+    inicio = time.monotonic()
+    resultado = asyncio.run(cache_info.refrescar_info_async(tickers, concurrencia=10))
+    assert time.monotonic() - inicio < 1.0
+    assert all(resultado.values())
+
+    cache_info.obtener_info("T3")
+    assert len(fuente.llamadas) == 10
+
+
+def test_vista_general_no_espera_y_campos_desaparecidos(fuente, monkeypatch):
+    cache_info.obtener_info("AAPL")
+    fuente.info = {"sector": "Technology"}  # La fuente deja de devolver el precio
+
+    # Pasan 10 minutos: sin 'campos' se sirve lo guardado y se refresca aparte
+    reloj = time.time() + 600
+    monkeypatch.setattr(cache_info.time, "time", lambda: reloj)
+    inicio = time.monotonic()
+    assert cache_info.obtener_info("AAPL")["info"]["currentPrice"] == 10.0
+    assert time.monotonic() - inicio < 0.1
+    cache_info.esperar_refrescos()
+    assert len(fuente.llamadas) == 2
+
+    # El refresco reemplazó el 'info': el precio viejo ya no está ni vence
+    for _ in range(3):
+        assert "currentPrice" not in cache_info.obtener_info("AAPL")["info"]
+    cache_info.esperar_refrescos()
+    assert len(fuente.llamadas) == 2
+
+
+def test_cache_separada_por_fuente(fuente, monkeypatch):
+    class OtraFuente(FuenteLenta):
+        pass
+
+    cache_info.obtener_info("AAPL")
+    otra = OtraFuente()
+    otra.info = {"sector": "Sintético"}
+    monkeypatch.setattr(fuentes, "_fuente_activa", otra)
+    assert cache_info.obtener_info("AAPL")["info"] == {"sector": "Sintético"}
+    assert otra.llamadas == ["AAPL"]
@@ -0,0 +1,93 @@
+import sys
+import os
+import io
+import json
+import threading
+from datetime import datetime, timedelta
+import pytest
+
+# --- Configuración de Ruta (Path) ---
+script_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.abspath(os.path.join(script_dir, os.pardir))
+if parent_dir not in sys.path:
+    sys.path.append(parent_dir)
+# --- Fin de Configuración ---
+
+import cli
+from datos import snapshot
+from datos.calendario_mercado import es_dia_de_mercado, proxima_ejecucion, ZONA_MERCADO
+from predicciones import almacen_predicciones
+from predicciones.demonio import ejecutar_demonio
+
+
+def test_calendario_nyse():
+    assert not es_dia_de_mercado("2025-04-18")   # Viernes Santo
+    assert not es_dia_de_mercado("2025-07-04")
+    assert not es_dia_de_mercado("2025-04-19")   # Sábado
+    assert es_dia_de_mercado("2025-11-28")       # Cierre temprano: cuenta como día normal
+    # Jueves después de la ejecución -> el viernes es feriado -> el lunes
+    ahora = datetime(2025, 4, 17, 17, 0, tzinfo=ZONA_MERCADO)
+    assert proxima_ejecucion(ahora) == datetime(2025, 4, 21, 16, 30, tzinfo=ZONA_MERCADO)
+    # Antes del cierre de un día de mercado -> ese mismo día
+    ahora = datetime(2025, 4, 17, 10, 0, tzinfo=ZONA_MERCADO)
+    assert proxima_ejecucion(ahora, minutos_tras_cierre=0) == datetime(2025, 4, 17, 16, 0, tzinfo=ZONA_MERCADO)
+
+
+class _RelojFalso(threading.Event):
+    """Un Event cuyo wait() adelanta el reloj en vez de dormir."""
+
+    def __init__(self, inicio):
+        super().__init__()
+        self.ahora = inicio
+
+    def __call__(self):
+        return self.ahora
+
+    def wait(self, segundos=None):
+        self.ahora += timedelta(seconds=segundos)
+        return self.is_set()
+
+
+def test_demonio_corre_tras_cada_cierre():
+    reloj = _RelojFalso(datetime(2025, 4, 17, 12, 0, tzinfo=ZONA_MERCADO))
+    llamadas = []
+
+    def tarea():
+        llamadas.append(reloj())
+        if len(llamadas) == 2:
+            raise RuntimeError("sin datos")
+        return {"predicciones": 3}
+
+    salida = io.StringIO()
+    fallidas = ejecutar_demonio(tarea, max_ejecuciones=2, detener=reloj, reloj=reloj, salida=salida)
+
+    registros = [json.loads(linea) for linea in salida.getvalue().splitlines()]
+    assert fallidas == 1
+    assert [r["ok"] for r in registros] == [True, False]
+    assert registros[1]["error"] == "RuntimeError: sin datos"
+    assert [r["programada"] for r in registros] == ["2025-04-17T16:30:00-04:00", "2025-04-21T16:30:00-04:00"]
+    assert llamadas[0] >= datetime(2025, 4, 17, 16, 30, tzinfo=ZONA_MERCADO)
+
+
+def test_cli_reporte_json_y_codigo_de_salida(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(almacen_predicciones, "RUTA_ALMACEN_PREDICCIONES", str(tmp_path / "p.sqlite"))
+    almacen_predicciones.guardar_predicciones([
+        {"ticker": "AAPL", "fecha_ultimo_cierre": "2025-04-17", "horizonte": h, "version_modelo": f"AAPL_{h}d_v1",
+         "prediccion": 1, "probabilidad_sube": 0.6, "confianza": 0.6}
+        for h in (1, 5, 21)
+    ])
+
+    codigo = cli.main(["reporte", "--sin-conciliar", "--dias", "0"])
+    datos = json.loads(capsys.readouterr().out)  # stdout: solo el JSON
+    assert codigo == cli.SALIDA_OK and datos["ok"]
+    assert sorted(p["horizonte"] for p in datos["predicciones"]) == [1, 5, 21]
+
+    # Sin precios: código propio, no el de una falla genérica
+    monkeypatch.setattr(snapshot, "cargar_snapshot", lambda *a, **k: None)
+    assert cli.main(["predecir"]) == cli.SALIDA_SIN_DATOS
+    assert json.loads(capsys.readouterr().out)["ok"] is False
+
+    # Argumentos inválidos: código de uso de argparse
+    with pytest.raises(SystemExit) as salida:
+        cli.main(["predecir", "--no-existe"])
+    assert salida.value.code == cli.SALIDA_USO
@@ -0,0 +1,30 @@
+import sys
+import os
+import numpy as np
+
+# --- Configuración de Ruta (Path) ---
+script_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.abspath(os.path.join(script_dir, os.pardir))
+if parent_dir not in sys.path:
+    sys.path.append(parent_dir)
+# --- Fin de Configuración ---
+
+from datos import compacto
+
+
+def test_panel_compacto_en_memmap(tmp_path, snapshot_sintetico):
+    datos = snapshot_sintetico(1, tickers=["AAPL", "SMH", "NVDA"], periodo="2y")
+    datos["NVDA"] = datos["NVDA"].iloc[5:]
+
+    panel = compacto.armar_panel_compacto(datos, columnas=("Close", "Volume"))
+    assert panel.matriz("Close").dtype == np.float32
+    assert panel.matriz("Close").shape == (len(datos["AAPL"]), 3)
+    assert np.isnan(panel.matriz("Close")[:5, 2]).all()
+
+    compacto.guardar_panel_memmap(panel, "prueba", directorio=str(tmp_path))
+    abierto = compacto.abrir_panel_memmap("prueba", directorio=str(tmp_path), columnas=["Close"])
+    assert isinstance(abierto.matriz("Close"), np.memmap)
+    np.testing.assert_allclose(
+        abierto.serie("SMH").to_numpy(), datos["SMH"]["Close"].to_numpy(), rtol=1e-6
+    )
+    assert abierto.indice.equals(datos["AAPL"].index)
@@ -0,0 +1,99 @@
+import sys
+import os
+import numpy as np
+import pandas as pd
+import pytest
+
+# --- Configuración de Ruta (Path) ---
+script_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.abspath(os.path.join(script_dir, os.pardir))
+if parent_dir not in sys.path:
+    sys.path.append(parent_dir)
+# --- Fin de Configuración ---
+
+from predicciones import almacen_predicciones, conciliacion
+
+
+def _precios(n=80, semilla=0):
+    rng = np.random.default_rng(semilla)
+    fechas = pd.bdate_range("2024-01-01", periods=n)
+    return pd.DataFrame({"Close": 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))}, index=fechas)
+
+
+def _predecir(precios, hasta, ruta, semilla=1):
+    """Una predicción por día y horizonte hasta la barra 'hasta' (como si corriera a diario)."""
+    rng = np.random.default_rng(semilla)
+    filas = []
+    for fecha in precios.index[:hasta]:
+        for h in (1, 5):
+            prob = float(rng.uniform())
+            filas.append({"ticker": "AAPL", "fecha_ultimo_cierre": fecha, "horizonte": h,
+                          "version_modelo": f"AAPL_{h}d_v1", "prediccion": int(prob > 0.5),
+                          "probabilidad_sube": prob, "confianza": max(prob, 1 - prob)})
+    almacen_predicciones.guardar_predicciones(filas, ruta)
+    return pd.DataFrame(filas)
+
+
+def test_conciliacion_incremental_igual_a_completa(tmp_path):
+    ruta = str(tmp_path / "p.sqlite")
+    precios = _precios()
+
+    # Día 40: solo hay precios hasta ahí; maduran las de 1d hasta el 39 y las de 5d hasta el 35
+    _predecir(precios, 40, ruta)
+    resumen = conciliacion.conciliar({"AAPL": precios.iloc[:40]}, ruta=ruta)
+    assert resumen["AAPL"]["conciliadas"] == 39 + 35 and resumen["AAPL"]["pendientes"] == 1 + 5
+    assert resumen["AAPL"]["marca_agua"] == precios.index[35].strftime("%Y-%m-%d")
+
+    # Corrida sin datos nuevos: no hay nada que hacer
+    assert conciliacion.conciliar({"AAPL": precios.iloc[:40]}, ruta=ruta)["AAPL"]["conciliadas"] == 0
+
+    # Día 80: solo se procesa lo nuevo
+    predichas = _predecir(precios, 80, ruta)
+    resumen = conciliacion.conciliar({"AAPL": precios}, ruta=ruta)
+    assert resumen["AAPL"]["conciliadas"] == (79 + 75) - (39 + 35)
+
+    # Las sumas incrementales coinciden con calcular todo de cero
+    cierres = precios["Close"].to_numpy()
+    esperado = []
+    for p in predichas.itertuples():
+        i = precios.index.get_loc(p.fecha_ultimo_cierre)
+        if i + p.horizonte < len(cierres):
+            real = int(cierres[i + p.horizonte] > cierres[i])
+            esperado.append((p.horizonte, real == p.prediccion, (p.probabilidad_sube - real) ** 2))
+    esperado = pd.DataFrame(esperado, columns=["horizonte", "acierto", "brier"]).groupby("horizonte").mean()
+
+    calidad = conciliacion.calidad_modelos("AAPL", ruta=ruta).set_index("horizonte")
+    assert list(calidad["n"]) == [79, 75]
+    np.testing.assert_allclose(calidad["tasa_acierto"], esperado["acierto"])
+    np.testing.assert_allclose(calidad["brier"], esperado["brier"])
+    assert (calidad["ece"] >= 0).all()
+
+    movil = conciliacion.acierto_movil(ventana=10, ticker="AAPL", ruta=ruta)
+    assert list(movil["n"]) == [10, 10]
+    curva = conciliacion.curva_calibracion("AAPL", 1, ruta=ruta)
+    assert curva["n"].sum() == 79 and curva["prob_media"].between(0, 1).all()
+
+
+def test_fecha_sin_barra_usa_la_anterior_y_reconstruir(tmp_path):
+    ruta = str(tmp_path / "p.sqlite")
+    precios = _precios(30)
+    sabado = precios.index[10] + pd.Timedelta(days=1)
+    while sabado.weekday() < 5:
+        sabado += pd.Timedelta(days=1)
+    almacen_predicciones.guardar_predicciones([
+        {"ticker": "AAPL", "fecha_ultimo_cierre": sabado, "horizonte": 1, "version_modelo": "v",
+         "prediccion": 1, "confianza": 0.6},
+    ], ruta)
+    conciliacion.conciliar({"AAPL": precios}, ruta=ruta)
+    resultado = pd.read_sql_query("SELECT * FROM resultados", conciliacion._conectar(ruta))
+    base = precios.index[precios.index <= sabado][-1]
+    assert resultado["precio_base"].iloc[0] == pytest.approx(precios.loc[base, "Close"])
+
+    # Una predicción vieja cargada tarde queda debajo de la marca de agua
+    almacen_predicciones.guardar_predicciones([
+        {"ticker": "AAPL", "fecha_ultimo_cierre": precios.index[2], "horizonte": 5, "version_modelo": "v",
+         "prediccion": 0, "confianza": 0.7},
+    ], ruta)
+    assert conciliacion.conciliar({"AAPL": precios}, ruta=ruta)["AAPL"]["conciliadas"] == 0
+    assert conciliacion.conciliar({"AAPL": precios}, ruta=ruta, reconstruir=True)["AAPL"]["conciliadas"] == 1
+    assert conciliacion.calidad_modelos(ruta=ruta)["n"].sum() == 2
@@ -0,0 +1,38 @@
+import sys
+import os
+import numpy as np
+
+# --- Configuración de Ruta (Path) ---
+script_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.abspath(os.path.join(script_dir, os.pardir))
+if parent_dir not in sys.path:
+    sys.path.append(parent_dir)
+# --- Fin de Configuración ---
+
+from modelo.procesador_features import crear_features_multihorizonte
+from modelo.features_incrementales import MotorFeaturesIncremental
+
+
+def test_paridad_con_el_calculo_por_lotes(snapshot_sintetico):
+    snapshot = snapshot_sintetico(5, periodo="5y")
+    X, _ = crear_features_multihorizonte([1], snapshot=snapshot)
+
+    motor = MotorFeaturesIncremental()
+    filas = {}
+    for fecha, a, s in zip(snapshot["AAPL"].index, snapshot["AAPL"]["Close"], snapshot["SMH"]["Close"]):
+        fila = motor.actualizar(a, s, fecha)
+        if fila is not None:
+            filas[fecha] = [fila[c] for c in motor.columnas]
+
+    assert list(filas) == list(X.index)
+    assert motor.columnas == list(X.columns)
+    np.testing.assert_allclose(np.array(list(filas.values())), X.to_numpy(), rtol=1e-9, atol=1e-12)
+
+
+def test_desde_snapshot_usa_solo_la_historia_minima(snapshot_sintetico):
+    snapshot = snapshot_sintetico(5, periodo="5y")
+    X, _ = crear_features_multihorizonte([1], snapshot=snapshot)
+    motor = MotorFeaturesIncremental.desde_snapshot(snapshot)
+    fila = motor.fila_actual()
+    assert fila.index[-1] == X.index[-1]
+    np.testing.assert_allclose(fila.to_numpy()[0], X.iloc[-1].to_numpy(), rtol=1e-9)
@@ -0,0 +1,46 @@
+import sys
+import os
+import pandas as pd
+
+# --- Configuración de Ruta (Path) ---
+script_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.abspath(os.path.join(script_dir, os.pardir))
+if parent_dir not in sys.path:
+    sys.path.append(parent_dir)
+# --- Fin de Configuración ---
+
+from datos import fuentes, fuente_yfinance
+from datos.fuente_replay import FuenteReplay, grabar_replay
+from datos.fuente_sintetica import FuenteSintetica
+
+
+def test_yfinance_cumple_la_interfaz():
+    assert isinstance(fuente_yfinance, fuentes.FuenteDatos)
+
+
+def test_fuente_sintetica_es_determinista_y_correlacionada():
+    a = FuenteSintetica(semilla=7).obtener_datos_precios("AAPL", periodo="10y")
+    b = FuenteSintetica(semilla=7).obtener_datos_precios("AAPL", periodo="10y")
+    smh = FuenteSintetica(semilla=7).obtener_datos_precios("SMH", periodo="10y")
+    pd.testing.assert_frame_equal(a, b)
+    assert (a['High'] >= a[['Open', 'Close']].max(axis=1)).all()
+    assert a['Close'].pct_change().corr(smh['Close'].pct_change()) > 0.3
+
+
+def test_replay_reproduce_lo_grabado(tmp_path):
+    sintetica = FuenteSintetica(semilla=3)
+    grabar_replay(["AAPL", "SMH"], directorio=str(tmp_path), fuente=sintetica, periodo="5y")
+
+    anterior = fuentes.establecer_fuente("replay", directorio=str(tmp_path))
+    try:
+        replay = fuentes.obtener_fuente()
+        assert isinstance(replay, FuenteReplay)
+        pd.testing.assert_frame_equal(
+            replay.obtener_datos_precios("AAPL", periodo="5y"),
+            sintetica.obtener_datos_precios("AAPL", periodo="5y"),
+            check_freq=False,
+        )
+        assert replay.obtener_datos_relevantes("SMH")["info"]["symbol"] == "SMH"
+        assert replay.obtener_datos_precios("MSFT") is None
+    finally:
+        fuentes._fuente_activa = anterior
@@ -0,0 +1,52 @@
+import sys
+import os
+import time
+import pandas as pd
+
+# --- Configuración de Ruta (Path) ---
+script_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.abspath(os.path.join(script_dir, os.pardir))
+if parent_dir not in sys.path:
+    sys.path.append(parent_dir)
+# --- Fin de Configuración ---
+
+from datos import gestor_tickers, fuentes
+
+
+def test_descarga_concurrente_aisla_fallos_y_alinea_panel(monkeypatch):
+    intentos = {}
+
+    class FuenteFalsa:
+        def obtener_datos_relevantes(self, ticker_symbol):
+            return None
+
+        def obtener_datos_precios(self, ticker, periodo="10y"):
+            return descargar(ticker, periodo)
+
+    def descargar(ticker, periodo):
+        intentos[ticker] = intentos.get(ticker, 0) + 1
+        time.sleep(0.2)
+        if ticker == "MALO":
+            raise ConnectionError("timeout")
+        if ticker == "INESTABLE" and intentos[ticker] == 1:
+            return None
+        inicio = "2024-01-01" if ticker != "NUEVO" else "2024-01-03"
+        idx = pd.bdate_range(inicio, "2024-01-10")
+        return pd.DataFrame({"Close": range(len(idx))}, index=idx, dtype=float)
+
+    monkeypatch.setattr(fuentes, "_fuente_activa", FuenteFalsa())
+
+    tickers = ["A", "B", "C", "D", "NUEVO", "INESTABLE", "MALO"]
+    inicio = time.monotonic()
+    panel, fallidos = gestor_tickers.cargar_panel(
+        tickers, max_hilos=8, solicitudes_por_segundo=0, reintentos=1, backoff=0.01
+    )
+    duracion = time.monotonic() - inicio
+
+    # En paralelo: mucho menos que 7 descargas en serie (1.4 s)
+    assert duracion < 1.0
+    assert list(fallidos) == ["MALO"]
+    assert intentos["INESTABLE"] == 2
+    assert list(panel.columns.get_level_values(0).unique()) == ["A", "B", "C", "D", "NUEVO", "INESTABLE"]
+    assert panel[("NUEVO", "Close")].isna().sum() == 2
+    assert panel.index.is_monotonic_increasing
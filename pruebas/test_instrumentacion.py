@@ -0,0 +1,73 @@
+import sys
+import os
+import json
+import numpy as np
+import pandas as pd
+
+# --- Configuración de Ruta (Path) ---
+script_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.abspath(os.path.join(script_dir, os.pardir))
+if parent_dir not in sys.path:
+    sys.path.append(parent_dir)
+# --- Fin de Configuración ---
+
+from modelo import instrumentacion
+from modelo.instrumentacion import Traza, etapa, traza_activa
+from modelo.gestor_modelo import entrenar_y_evaluar
+
+
+def test_sin_traza_no_mide_nada():
+    assert traza_activa() is None
+    with etapa("suelta", filas=3) as e:
+        e.anotar(filas=4)
+
+
+def test_etapas_anidadas_memoria_y_exportacion(tmp_path):
+    with Traza("prueba", perfilar=["interna"]) as traza:
+        with etapa("externa") as externa:
+            externa.anotar(filas=10)
+            with etapa("interna", filas=5):
+                bloque = np.ones(2**20)  # 8 MB
+                del bloque
+            pequeno = np.ones(1000)
+    assert traza_activa() is None
+
+    filas = {f["etapa"]: f for f in traza.resumen()}
+    assert filas["interna"]["padre"] == "externa" and filas["externa"]["padre"] is None
+    assert filas["externa"]["filas"] == 10 and filas["interna"]["filas"] == 5
+    # El pico de la hija (8 MB ya liberados) cuenta también para la madre
+    assert filas["interna"]["memoria_pico_mb"] >= 7.9
+    assert filas["externa"]["memoria_pico_mb"] >= filas["interna"]["memoria_pico_mb"]
+    assert filas["externa"]["segundos"] >= filas["interna"]["segundos"]
+    assert list(traza.perfiles) == ["interna#0"]
+
+    ruta = traza.exportar(str(tmp_path / "traza.json"))
+    with open(ruta, encoding="utf-8") as f:
+        exportada = json.load(f)
+    eventos = {e["name"]: e for e in exportada["traceEvents"]}
+    assert eventos["interna"]["ph"] == "X" and eventos["interna"]["args"]["padre"] == "externa"
+    assert eventos["externa"]["ts"] <= eventos["interna"]["ts"]
+    assert [e["etapa"] for e in exportada["etapas"]] == ["externa", "interna"]
+
+
+def test_entrenamiento_queda_medido():
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(500, 4)), columns=list("abcd"))
+    y = pd.Series((X["a"] > 0).astype(int))
+    with Traza("entrenamiento", memoria=False) as traza:
+        entrenar_y_evaluar(X, y, 5)
+    filas = {f["etapa"]: f for f in traza.resumen()}
+    assert set(filas) == {"division", "ajuste", "evaluacion"}
+    assert filas["ajuste"]["filas"] == 400 and filas["evaluacion"]["filas"] == 100
+    assert filas["ajuste"]["horizonte"] == 5 and "memoria_pico_mb" not in filas["ajuste"]
+
+
+def test_sin_modulo_resource(tmp_path, monkeypatch):
+    # Windows no tiene 'resource': el pico de RSS queda en None y la traza se exporta igual
+    monkeypatch.setattr(instrumentacion, "resource", None)
+    with Traza("windows", memoria=False) as traza:
+        with etapa("algo"):
+            pass
+    assert traza.resumen()[0]["rss_pico_mb"] is None
+    with open(traza.exportar(str(tmp_path / "traza.json")), encoding="utf-8") as f:
+        assert json.load(f)["etapas"][0]["rss_pico_mb"] is None
@@ -0,0 +1,81 @@
+import sys
+import os
+import time
+import numpy as np
+import pandas as pd
+
+# --- Configuración de Ruta (Path) ---
+script_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.abspath(os.path.join(script_dir, os.pardir))
+if parent_dir not in sys.path:
+    sys.path.append(parent_dir)
+# --- Fin de Configuración ---
+
+from modelo.procesador_features import _calcular_features
+from modelo.kernels_features import calcular_matriz_features, features_numpy, nombres_columnas
+
+# Tolerancias: la salida NumPy es float32
+RTOL, ATOL = 1e-5, 1e-6
+
+
+def _precios(T, K=1, semilla=0):
+    rng = np.random.default_rng(semilla)
+    mercado = rng.normal(0, 0.01, (T, 1))
+    return (
+        100 * np.exp(np.cumsum(mercado + rng.normal(0, 0.01, (T, K)), axis=0)),
+        50 * np.exp(np.cumsum(0.8 * mercado + rng.normal(0, 0.005, (T, K)), axis=0)),
+    )
+
+
+def _features_pandas(target, factor):
+    """La receta actual de 'procesador_features', tal cual."""
+    indice = pd.date_range("2000-01-03", periods=len(target), freq="min")
+    df = pd.DataFrame({'AAPL': target, 'SMH': factor}, index=indice)
+    df = _calcular_features(df, usar_almacen=False)
+    columnas = [c for c in df.columns if c not in ['AAPL', 'SMH']]
+    return df[columnas].dropna()
+
+
+def test_paridad_un_par():
+    target, factor = _precios(3000)
+    esperado = _features_pandas(target[:, 0], factor[:, 0])
+    df = pd.DataFrame({'AAPL': target[:, 0], 'SMH': factor[:, 0]}, index=pd.date_range("2000-01-03", periods=3000, freq="min"))
+    obtenido = features_numpy(df)
+
+    assert list(obtenido.columns) == list(esperado.columns)
+    assert obtenido.index.equals(esperado.index)
+    assert obtenido.dtypes.eq(np.float32).all()
+    np.testing.assert_allclose(obtenido.to_numpy(), esperado.to_numpy(), rtol=RTOL, atol=ATOL)
+
+
+def test_paridad_varios_pares_y_salida_preasignada():
+    target, factor = _precios(500, K=4, semilla=1)
+    salida = np.empty((500, 4, len(nombres_columnas())), dtype=np.float32)
+    resultado = calcular_matriz_features(target, factor, salida=salida)
+    assert resultado is salida
+
+    for k in range(4):
+        esperado = _features_pandas(target[:, k], factor[:, k])
+        filas = ~np.isnan(salida[:, k, :]).any(axis=1)
+        np.testing.assert_allclose(salida[filas, k, :], esperado.to_numpy(), rtol=RTOL, atol=ATOL)
+
+
+def reportar_aceleracion():
+    """Compara tiempos pandas vs NumPy en entradas largas y anchas."""
+    casos = [("largo (1 par, 500k barras)", 500_000, 1), ("ancho (500 pares, 2.5k barras)", 2_500, 500)]
+    for nombre, T, K in casos:
+        target, factor = _precios(T, K)
+        inicio = time.perf_counter()
+        for k in range(K):
+            _features_pandas(target[:, k], factor[:, k])
+        t_pandas = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        calcular_matriz_features(target, factor)
+        t_numpy = time.perf_counter() - inicio
+        print(f"{nombre:32s} pandas: {t_pandas * 1000:9.1f} ms | numpy: {t_numpy * 1000:8.1f} ms "
+              f"| aceleración: {t_pandas / t_numpy:5.1f}x")
+
+
+if __name__ == "__main__":
+    reportar_aceleracion()
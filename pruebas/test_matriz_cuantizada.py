@@ -0,0 +1,57 @@
+import sys
+import os
+import numpy as np
+import pandas as pd
+
+# --- Configuración de Ruta (Path) ---
+script_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.abspath(os.path.join(script_dir, os.pardir))
+if parent_dir not in sys.path:
+    sys.path.append(parent_dir)
+# --- Fin de Configuración ---
+
+from modelo.matriz_cuantizada import MatrizCuantizada
+from modelo.gestor_modelo import entrenar_y_evaluar, filas_entrenamiento
+
+
+def _features(T, F=8, semilla=0):
+    rng = np.random.default_rng(semilla)
+    X = pd.DataFrame(rng.normal(size=(T, F)), index=pd.bdate_range("2000-01-03", periods=T),
+                     columns=[f"f{i}" for i in range(F)])
+    ruido = rng.normal(size=T)
+    targets = {h: ((X["f0"].rolling(h, min_periods=1).mean() + ruido) > 0).astype(int) for h in (1, 5, 21)}
+    return X, targets
+
+
+def test_vistas_reutilizan_cortes_y_borran_el_margen():
+    X, targets = _features(600)
+    matriz = MatrizCuantizada(X, fin_cortes=300)
+    a = matriz.vista(400, etiquetas=targets[1].iloc[:400], base_margin=np.ones(400))
+    b = matriz.vista(400, etiquetas=targets[5].iloc[:400])
+    assert a is b
+    np.testing.assert_array_equal(b.get_label(), targets[5].iloc[:400].to_numpy())
+    assert b.get_base_margin().size == 0
+    matriz.vista(500)
+    matriz.vista(550, guardar=False)
+    # Los cortes salen solo de las primeras 300 filas, una vez
+    assert matriz.sketches == 1 and matriz.vistas_creadas == 3
+    assert len(matriz._vistas) == 2
+
+    assert matriz.es_prefijo(X.iloc[:-21])
+    assert not matriz.es_prefijo(X.iloc[1:])
+
+
+def test_entrenar_con_matriz_compartida():
+    X, targets = _features(600)
+    # Cortes de las filas de entrenamiento del horizonte más corto en datos (21d)
+    matriz = MatrizCuantizada(X, fin_cortes=filas_entrenamiento(len(X) - 21))
+    assert matriz._datos is None  # Las vistas leen el DataFrame: no hay copia float32
+    for h, y in targets.items():
+        modelo, metricas = entrenar_y_evaluar(X.iloc[:-h], y.iloc[:-h], h, matriz=matriz)
+        assert metricas["filas_entrenamiento"] == filas_entrenamiento(len(X) - h)
+        if h == 21:
+            # Sus cortes son los de sus propias filas: el mismo modelo que fit()
+            directo, _ = entrenar_y_evaluar(X.iloc[:-h], y.iloc[:-h], h)
+            np.testing.assert_allclose(modelo.predict_proba(X.tail(30)), directo.predict_proba(X.tail(30)), atol=1e-6)
+    # Un solo sketch para los 3 horizontes, y ninguna vista guardada
+    assert matriz.sketches == 1 and not matriz._vistas and matriz._datos is None
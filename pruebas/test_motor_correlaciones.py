@@ -0,0 +1,51 @@
+import sys
+import os
+import numpy as np
+import pandas as pd
+
+# --- Configuración de Ruta (Path) ---
+script_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.abspath(os.path.join(script_dir, os.pardir))
+if parent_dir not in sys.path:
+    sys.path.append(parent_dir)
+# --- Fin de Configuración ---
+
+from modelo.motor_correlaciones import MotorCorrelaciones, registrar_features_correlacion
+from modelo.procesador_features import crear_features_multihorizonte, FEATURES_MODELO
+
+
+def _retornos(snapshot):
+    return pd.DataFrame({t: df["Close"] for t, df in snapshot.items()}).pct_change()
+
+
+def test_correlaciones_y_betas_igual_que_pandas(snapshot_sintetico):
+    retornos = _retornos(snapshot_sintetico(4, tickers=["NVDA", "AMD", "TSM", "SMH", "SOXX"], periodo="2y"))
+    tickers, factores = ["NVDA", "AMD", "TSM"], ["SMH", "SOXX"]
+    tabla = MotorCorrelaciones(tickers, factores, ventana=30).procesar_historial(
+        retornos[tickers], retornos[factores]
+    )
+
+    for t in tickers:
+        for f in factores:
+            corr = retornos[t].rolling(30).corr(retornos[f])
+            beta = retornos[t].rolling(30).cov(retornos[f]) / retornos[f].rolling(30).var()
+            np.testing.assert_allclose(tabla[f"Correl_{t}_{f}_30d"], corr, rtol=1e-8, atol=1e-10)
+            np.testing.assert_allclose(tabla[f"Beta_{t}_{f}_30d"], beta, rtol=1e-8, atol=1e-10)
+
+
+def test_matriz_completa_de_la_ultima_ventana(snapshot_sintetico):
+    retornos = _retornos(snapshot_sintetico(4, tickers=["A", "B", "C", "D"], periodo="2y")).dropna()
+    motor = MotorCorrelaciones(["A", "B", "C", "D"], ["A"], ventana=20, matriz_completa=True)
+    for fila in retornos.to_numpy():
+        motor.actualizar(fila, fila[:1])
+    np.testing.assert_allclose(motor.matriz_correlacion(), np.corrcoef(retornos.to_numpy()[-20:].T), atol=1e-10)
+
+
+def test_features_de_correlacion_entran_en_el_procesador(snapshot_sintetico):
+    snapshot = snapshot_sintetico(4, tickers=["AAPL", "SMH", "SOXX"], periodo="2y")
+    extra = registrar_features_correlacion(["AAPL"], ["SMH", "SOXX"], ventana=30)
+    assert "Correl_AAPL_SMH_30d" in extra and "Beta_AAPL_SOXX_30d" in extra
+
+    X, _ = crear_features_multihorizonte([5], snapshot=snapshot, features=FEATURES_MODELO + extra[1:])
+    assert list(X.columns) == FEATURES_MODELO + extra[1:]
+    assert not X.isna().any().any()
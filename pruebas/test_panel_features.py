@@ -0,0 +1,50 @@
+import sys
+import os
+import numpy as np
+import pandas as pd
+
+# --- Configuración de Ruta (Path) ---
+script_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.abspath(os.path.join(script_dir, os.pardir))
+if parent_dir not in sys.path:
+    sys.path.append(parent_dir)
+# --- Fin de Configuración ---
+
+from modelo.panel_features import crear_features_panel
+from modelo.kernels_features import features_numpy
+
+
+def _cierres(snapshot):
+    return pd.DataFrame({t: df["Close"] for t, df in snapshot.items()})
+
+
+def test_panel_en_pool_igual_al_calculo_de_un_par(snapshot_sintetico):
+    tickers = ["NVDA", "AMD", "TSM", "INTC", "SMH", "SOXX"]
+    precios = _cierres(snapshot_sintetico(2, tickers=tickers, periodo="2y"))
+    pares = [(t, f) for t in tickers[:4] for f in ["SMH", "SOXX"]]
+
+    serie = crear_features_panel(precios, pares, procesos=1)
+    pool = crear_features_panel(precios, pares, procesos=2, pares_por_tarea=3)
+    pd.testing.assert_frame_equal(serie, pool)
+    assert serie.index.names == ['fecha', 'target', 'factor']
+
+    un_par = features_numpy(precios[["AMD", "SOXX"]].rename(columns={"AMD": "AAPL", "SOXX": "SMH"}))
+    np.testing.assert_array_equal(serie.xs(("AMD", "SOXX"), level=("target", "factor")).to_numpy(), un_par.to_numpy())
+
+
+def test_ticker_que_empieza_tarde_solo_recorta_sus_pares(snapshot_sintetico):
+    tickers = ["NVDA", "AMD", "ARM", "SMH"]
+    precios = _cierres(snapshot_sintetico(3, tickers=tickers, periodo="2y"))
+    precios.iloc[:200, precios.columns.get_loc("ARM")] = np.nan  # Salida a bolsa tardía
+    precios.iloc[300, precios.columns.get_loc("AMD")] = np.nan   # Un hueco suelto
+    pares = [(t, "SMH") for t in ["NVDA", "AMD", "ARM"]]
+
+    panel = crear_features_panel(precios, pares, procesos=1)
+    pd.testing.assert_frame_equal(panel, crear_features_panel(precios, pares, procesos=2, pares_por_tarea=1))
+    for target in ["NVDA", "AMD", "ARM"]:
+        un_par = features_numpy(precios[[target, "SMH"]].dropna().rename(columns={target: "AAPL"}))
+        del_panel = panel.xs((target, "SMH"), level=("target", "factor"))
+        assert (del_panel.index == un_par.index).all()
+        np.testing.assert_array_equal(del_panel.to_numpy(), un_par.to_numpy())
+    # NVDA conserva toda su historia (menos el calentamiento)
+    assert len(panel.xs(("NVDA", "SMH"), level=("target", "factor"))) > len(precios) - 40
@@ -0,0 +1,47 @@
+import sys
+import os
+import numpy as np
+import pytest
+
+# --- Configuración de Ruta (Path) ---
+script_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.abspath(os.path.join(script_dir, os.pardir))
+if parent_dir not in sys.path:
+    sys.path.append(parent_dir)
+# --- Fin de Configuración ---
+
+from modelo import registro_modelos
+from modelo.matriz_cuantizada import MatrizCuantizada
+from modelo.planificador_entrenamiento import planificar_entrenamiento, _repartir_nucleos
+from modelo.procesador_features import crear_features_multihorizonte
+
+
+@pytest.fixture
+def snapshot(snapshot_sintetico, registro_temporal):
+    return snapshot_sintetico(15, tickers=["AAPL", "NVDA", "SMH"])
+
+
+def test_reparto_de_nucleos():
+    assert _repartir_nucleos(6, procesos=4, nucleos=8) == (4, 2)
+    assert _repartir_nucleos(2, procesos=None, nucleos=8) == (2, 4)
+    assert _repartir_nucleos(6, procesos=1, nucleos=1) == (1, 1)
+
+
+def test_pool_entrena_cada_ticker_y_horizonte(snapshot):
+    resultados = planificar_entrenamiento(["AAPL", "NVDA"], [1, 5], snapshot=snapshot, procesos=2, nucleos=2)
+    assert sorted((r["ticker"], r["horizonte"]) for r in resultados) == [
+        ("AAPL", 1), ("AAPL", 5), ("NVDA", 1), ("NVDA", 5)
+    ]
+    assert all(r["ok"] and r["reentrenado"] for r in resultados)
+
+    # El modelo del pool es el mismo que se obtiene en este proceso
+    X, targets = crear_features_multihorizonte([5], snapshot=snapshot, target="NVDA")
+    modelo, _ = registro_modelos.cargar_modelo("NVDA", 5)
+    y, mascara = targets[5]
+    local, _ = registro_modelos.obtener_o_entrenar(5, X[mascara], y[mascara], ticker="NVDA", forzar=True,
+                                                  matriz=MatrizCuantizada(X))
+    np.testing.assert_allclose(modelo.predict_proba(X.tail(5)), local.predict_proba(X.tail(5)), rtol=1e-6)
+
+    # Segunda pasada: nada cambió, todo se reutiliza
+    resultados = planificar_entrenamiento(["AAPL", "NVDA"], [1, 5], snapshot=snapshot, procesos=1)
+    assert not any(r["reentrenado"] for r in resultados)
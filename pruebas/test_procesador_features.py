@@ -0,0 +1,44 @@
+import sys
+import os
+import pandas as pd
+
+# --- Configuración de Ruta (Path) ---
+script_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.abspath(os.path.join(script_dir, os.pardir))
+if parent_dir not in sys.path:
+    sys.path.append(parent_dir)
+# --- Fin de Configuración ---
+
+from modelo.procesador_features import crear_features_multihorizonte, crear_features_y_target
+
+
+def test_multihorizonte_equivale_a_un_horizonte_por_vez(snapshot_sintetico):
+    snapshot = snapshot_sintetico(11)
+    X, targets = crear_features_multihorizonte([1, 5, 21], snapshot=snapshot)
+
+    for dias in [1, 5, 21]:
+        y, mascara = targets[dias]
+        # Las últimas N filas no tienen precio futuro
+        assert not mascara.iloc[-dias:].any() and mascara.iloc[:-dias].all()
+
+        X_h, y_h = crear_features_y_target(dias_a_predecir=dias, snapshot=snapshot)
+        pd.testing.assert_frame_equal(X[mascara], X_h)
+        pd.testing.assert_series_equal(y[mascara], y_h)
+
+    # X conserva la última fila (la que se usa para predecir)
+    assert X.index[-1] == snapshot["AAPL"].index[-1]
+
+
+def test_subconjunto_de_features_y_calentamiento(snapshot_sintetico):
+    from modelo import registro_features
+
+    snapshot = snapshot_sintetico(11)
+    completo, _ = crear_features_multihorizonte([5], snapshot=snapshot)
+    subset = ['AAPL_retorno_3d', 'AAPL_vs_SMA20']
+    X, _ = crear_features_multihorizonte([5], snapshot=snapshot, features=subset)
+
+    assert list(X.columns) == subset
+    # Sin la correlación (30 barras) el calentamiento baja a las 19 de la SMA20
+    assert registro_features.historial_minimo(subset) == 20
+    assert len(X) == len(snapshot["AAPL"]) - 19
+    pd.testing.assert_frame_equal(X.loc[completo.index, subset], completo[subset])
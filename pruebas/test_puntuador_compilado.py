@@ -0,0 +1,110 @@
+import sys
+import os
+import gc
+import timeit
+import weakref
+import threading
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+
+# --- Configuración de Ruta (Path) ---
+script_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.abspath(os.path.join(script_dir, os.pardir))
+if parent_dir not in sys.path:
+    sys.path.append(parent_dir)
+# --- Fin de Configuración ---
+
+from modelo.puntuador_compilado import PuntuadorCompilado
+
+HORIZONTES = [1, 5, 21]
+
+
+def _modelos(semilla=0, n_estimators=100, profundidades=(3, 5, 6)):
+    """Un modelo por horizonte, con profundidades distintas (las hojas quedan a distinta altura)."""
+    rng = np.random.default_rng(semilla)
+    X = pd.DataFrame(rng.normal(size=(2000, 8)), columns=[f"f{i}" for i in range(8)])
+    X.iloc[rng.integers(0, 2000, 100), 2] = np.nan  # Para que haya direcciones por defecto
+    modelos = {}
+    for h, profundidad in zip(HORIZONTES, profundidades):
+        y = (X["f0"].fillna(0) + rng.normal(size=len(X)) * h / 5 > 0).astype(int)
+        modelos[h] = xgb.XGBClassifier(n_estimators=n_estimators, max_depth=profundidad).fit(X, y)
+    return X, modelos
+
+
+def test_paridad_con_xgboost():
+    X, modelos = _modelos()
+    puntuador = PuntuadorCompilado(modelos)
+    assert puntuador.features == list(X.columns)
+
+    rng = np.random.default_rng(1)
+    prueba = rng.normal(size=(200, 8)).astype(np.float32)
+    prueba[rng.random(prueba.shape) < 0.05] = np.nan
+    esperado_prob = np.stack([modelos[h].predict_proba(prueba)[:, 1] for h in HORIZONTES], axis=1)
+    esperado_clase = np.stack([modelos[h].predict(prueba) for h in HORIZONTES], axis=1)
+
+    clases, probabilidades = puntuador.puntuar(prueba)
+    np.testing.assert_allclose(probabilidades, esperado_prob, atol=1e-6)
+    np.testing.assert_array_equal(clases, esperado_clase)
+
+    # Fila por fila (el camino rápido) da lo mismo que el lote
+    for i in range(0, 200, 7):
+        clases_fila, prob_fila = puntuador.puntuar(prueba[i])
+        np.testing.assert_allclose(prob_fila, esperado_prob[i], atol=1e-6)
+        np.testing.assert_array_equal(clases_fila, esperado_clase[i])
+    assert set(puntuador.puntuar_dict(prueba[0])) == set(HORIZONTES)
+
+
+
+def test_buffers_por_hilo_se_liberan_con_el_hilo():
+    X, modelos = _modelos(n_estimators=20)
+    puntuador = PuntuadorCompilado(modelos)
+    fila = X.iloc[5].to_numpy(np.float32)
+    esperado = puntuador.puntuar(fila)[1]
+    resultados, buffers = [], []
+
+    def puntuar():
+        resultados.append(puntuador.puntuar(fila)[1])
+        buffers.append(weakref.ref(puntuador._buffers.siguiente[0]))
+
+    # Como el servicio HTTP: un hilo nuevo por conexión
+    for _ in range(20):
+        hilo = threading.Thread(target=puntuar)
+        hilo.start()
+        hilo.join()
+    gc.collect()
+    assert all(np.allclose(r, esperado) for r in resultados)
+    assert all(b() is None for b in buffers)
+
+def test_respeta_la_mejor_iteracion_del_early_stopping():
+    rng = np.random.default_rng(2)
+    X = rng.normal(size=(1000, 4)).astype(np.float32)
+    y = (X[:, 0] + rng.normal(size=1000) > 0).astype(int)
+    modelo = xgb.XGBClassifier(n_estimators=300, learning_rate=0.3, early_stopping_rounds=5)
+    modelo.fit(X[:800], y[:800], eval_set=[(X[800:], y[800:])], verbose=False)
+    assert modelo.best_iteration < 299
+
+    _, probabilidades = PuntuadorCompilado({5: modelo}).puntuar(X[:50])
+    np.testing.assert_allclose(probabilidades[:, 0], modelo.predict_proba(X[:50])[:, 1], atol=1e-6)
+
+
+def reportar_latencia():
+    """Latencia de una fila para los 3 horizontes: compilado vs predict + predict_proba."""
+    X, modelos = _modelos(profundidades=(5, 5, 5))
+    puntuador = PuntuadorCompilado(modelos)
+    fila_df = X.tail(1)
+    fila = fila_df.to_numpy(np.float32)[0]
+    n = 5000
+    t_compilado = min(timeit.repeat(lambda: puntuador.puntuar(fila), number=n, repeat=5)) / n
+    n = 200
+    t_xgb = min(timeit.repeat(
+        lambda: [(modelos[h].predict(fila_df), modelos[h].predict_proba(fila_df)) for h in HORIZONTES],
+        number=n, repeat=3,
+    )) / n
+    print(f"{puntuador.n_arboles} árboles, profundidad {puntuador.profundidad}")
+    print(f"compilado:               {t_compilado * 1e6:8.1f} µs ({t_compilado * 1e6 / 3:.1f} µs por horizonte)")
+    print(f"predict + predict_proba: {t_xgb * 1e6:8.1f} µs | aceleración: {t_xgb / t_compilado:.0f}x")
+
+
+if __name__ == "__main__":
+    reportar_latencia()
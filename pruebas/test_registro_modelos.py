@@ -0,0 +1,73 @@
+import sys
+import os
+import threading
+import numpy as np
+import xgboost as xgb
+import pytest
+
+# --- Configuración de Ruta (Path) ---
+script_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.abspath(os.path.join(script_dir, os.pardir))
+if parent_dir not in sys.path:
+    sys.path.append(parent_dir)
+# --- Fin de Configuración ---
+
+from modelo import registro_modelos
+from modelo.procesador_features import crear_features_y_target
+
+
+@pytest.fixture
+def datos(snapshot_sintetico, registro_temporal):
+    return crear_features_y_target(dias_a_predecir=5, snapshot=snapshot_sintetico(8))
+
+
+def test_reutiliza_y_reentrena_segun_la_politica(datos):
+    X, y = datos
+    viejo_X, viejo_y = X.iloc[:-10], y.iloc[:-10]
+
+    modelo, meta = registro_modelos.obtener_o_entrenar(5, viejo_X, viejo_y)
+    assert meta["fin_entrenamiento"] == viejo_X.index[-1].strftime('%Y-%m-%d')
+
+    # Mismos datos -> se carga el guardado y puntúa igual
+    cargado, meta2 = registro_modelos.obtener_o_entrenar(5, viejo_X, viejo_y)
+    assert meta2["version_modelo"] == meta["version_modelo"]
+    np.testing.assert_allclose(cargado.predict_proba(X.tail(3)), modelo.predict_proba(X.tail(3)))
+
+    # Pocas barras nuevas -> sigue vigente
+    assert registro_modelos.motivo_obsolescencia(meta, X.iloc[:-5], meta["hiperparametros"]) is None
+    # Demasiadas barras nuevas -> obsoleto
+    assert "barras nuevas" in registro_modelos.motivo_obsolescencia(meta, X, meta["hiperparametros"])
+    # Historia re-ajustada -> obsoleto
+    ajustado = viejo_X.copy()
+    ajustado.iloc[0, 0] += 0.01
+    assert "re-ajuste" in registro_modelos.motivo_obsolescencia(meta, ajustado, meta["hiperparametros"])
+
+
+def test_hiperparametros_guardados_fuerzan_reentrenamiento(datos):
+    X, y = datos
+    registro_modelos.obtener_o_entrenar(5, X, y)
+    registro_modelos.actualizar_metadatos("AAPL", 5, mejores_hiperparametros={"max_depth": 3})
+    _, meta = registro_modelos.obtener_o_entrenar(5, X, y)
+    assert meta["hiperparametros"]["max_depth"] == 3
+    assert meta["mejores_hiperparametros"] == {"max_depth": 3}
+
+
+def test_guardados_simultaneos_dejan_un_par_consistente(datos):
+    X, y = datos
+    modelos = {n: xgb.XGBClassifier(n_estimators=n, max_depth=2).fit(X.tail(200), y.tail(200)) for n in (3, 7)}
+
+    def guardar(n):
+        for i in range(10):
+            registro_modelos.guardar_modelo(modelos[n], {"ticker": "AAPL", "horizonte": 5, "arboles": n,
+                                                         "version_modelo": f"AAPL_5d_{n}_{i}"})
+    hilos = [threading.Thread(target=guardar, args=(n,)) for n in modelos]
+    for h in hilos:
+        h.start()
+    for h in hilos:
+        h.join()
+
+    cargado, meta = registro_modelos.cargar_modelo("AAPL", 5)
+    assert cargado.get_booster().num_boosted_rounds() == meta["arboles"]
+    # Ni temporales ni bloqueos sueltos
+    archivos = [a for a in os.listdir(registro_modelos.DIRECTORIO_MODELOS) if a.startswith("AAPL_5d")]
+    assert sorted(archivos) == ["AAPL_5d.json", "AAPL_5d.ubj"]
@@ -0,0 +1,147 @@
+import sys
+import os
+import json
+import time
+import tempfile
+import http.client
+import urllib.request
+import pytest
+
+# --- Configuración de Ruta (Path) ---
+script_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.abspath(os.path.join(script_dir, os.pardir))
+if parent_dir not in sys.path:
+    sys.path.append(parent_dir)
+# --- Fin de Configuración ---
+
+from datos import fuentes
+from datos.fuente_sintetica import FuenteSintetica
+from modelo import almacen_features, registro_modelos
+from modelo.procesador_features import crear_features_multihorizonte
+from predicciones.servicio_prediccion import ServicioPrediccion
+
+HORIZONTES = [1, 5]
+
+
+@pytest.fixture
+def snapshot(snapshot_sintetico, registro_temporal):
+    return snapshot_sintetico(20)
+
+
+def _entrenar(snapshot, forzar=False):
+    X, targets = crear_features_multihorizonte(HORIZONTES, snapshot=snapshot)
+    for h in HORIZONTES:
+        y, mascara = targets[h]
+        registro_modelos.obtener_o_entrenar(h, X[mascara], y[mascara], ticker="AAPL", forzar=forzar)
+    return X
+
+
+def _get(puerto, ruta):
+    with urllib.request.urlopen(f"http://127.0.0.1:{puerto}{ruta}", timeout=10) as respuesta:
+        return json.loads(respuesta.read())
+
+
+def test_servicio_responde_y_recarga_modelos(snapshot):
+    X = _entrenar(snapshot)
+    servicio = ServicioPrediccion(snapshot=snapshot, puerto=0, segundos_vigilancia=3600)
+    puerto = servicio.iniciar(bloquear=False)
+    try:
+        respuesta = _get(puerto, "/prediccion?ticker=aapl")
+        assert respuesta["fecha_ultimo_cierre"] == X.index[-1].strftime('%Y-%m-%d')
+        for p in respuesta["predicciones"]:
+            modelo, meta = registro_modelos.cargar_modelo("AAPL", p["horizonte"])
+            esperado = modelo.predict_proba(X.tail(1))[0, 1]
+            assert p["probabilidad_sube"] == pytest.approx(esperado, abs=1e-5)
+            assert p["version_modelo"] == meta["version_modelo"]
+
+        # Lote de filas propias por POST
+        pedido = urllib.request.Request(
+            f"http://127.0.0.1:{puerto}/puntuar", method="POST",
+            data=json.dumps({"ticker": "AAPL", "filas": X.tail(3).to_numpy().tolist(), "horizontes": [5]}).encode(),
+        )
+        with urllib.request.urlopen(pedido, timeout=10) as r:
+            lote = json.loads(r.read())["predicciones"]
+        assert [len(fila) for fila in lote] == [1, 1, 1]
+
+        with pytest.raises(urllib.error.HTTPError) as error:
+            _get(puerto, "/prediccion?ticker=NVDA")
+        assert error.value.code == 404
+        # Cuerpo mal formado (sin 'ticker'): 400, no 404
+        sin_ticker = urllib.request.Request(f"http://127.0.0.1:{puerto}/puntuar", method="POST",
+                                            data=json.dumps({"filas": [[0.0]]}).encode())
+        with pytest.raises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(sin_ticker, timeout=10)
+        assert error.value.code == 400 and "ticker" in json.loads(error.value.read())["error"]
+
+        # Reentrenar cambia el registro: el servicio se entera sin reiniciarse
+        for h in HORIZONTES:
+            registro_modelos.actualizar_metadatos("AAPL", h, mejores_hiperparametros={"max_depth": 2})
+        _entrenar(snapshot, forzar=True)
+        assert servicio.recargar_si_cambio()
+        assert not servicio.recargar_si_cambio()
+        nueva = _get(puerto, "/prediccion?ticker=AAPL&horizonte=1")["predicciones"]
+        modelo, meta = registro_modelos.cargar_modelo("AAPL", 1)
+        assert meta["hiperparametros"]["max_depth"] == 2 and len(nueva) == 1
+        assert nueva[0]["probabilidad_sube"] == pytest.approx(modelo.predict_proba(X.tail(1))[0, 1], abs=1e-5)
+
+        metricas = _get(puerto, "/metricas")
+        assert metricas["por_ruta"]["/prediccion"] == 3
+        assert metricas["errores"] == 2 and metricas["recargas_modelos"] == 1
+        assert metricas["latencia_us"]["p50"] > 0
+    finally:
+        servicio.detener()
+
+
+def test_servicio_carga_solo_la_historia_minima(snapshot, monkeypatch):
+    X = _entrenar(snapshot)
+    monkeypatch.setattr(fuentes, "_fuente_activa", FuenteSintetica(semilla=20))
+    servicio = ServicioPrediccion(puerto=0)  # Sin snapshot: carga sus propios precios
+    assert all(len(df) < 70 for df in servicio._snapshot.values())  # '3mo', no 10 años
+    for p in servicio.predecir("AAPL")["predicciones"]:
+        modelo, _ = registro_modelos.cargar_modelo("AAPL", p["horizonte"])
+        assert p["probabilidad_sube"] == pytest.approx(modelo.predict_proba(X.tail(1))[0, 1], abs=1e-5)
+
+
+def test_modelo_con_barras_nuevas_refresca_las_features(snapshot, monkeypatch):
+    ayer = {t: df.iloc[:-1] for t, df in snapshot.items()}
+    _entrenar(ayer)
+    servicio = ServicioPrediccion(snapshot=ayer, puerto=0)
+    assert servicio.predecir("AAPL")["fecha_ultimo_cierre"] == ayer["AAPL"].index[-1].strftime('%Y-%m-%d')
+
+    # El demonio reentrena tras el cierre de hoy: el servicio trae esa barra
+    X = _entrenar(snapshot, forzar=True)
+    monkeypatch.setattr(fuentes, "_fuente_activa", FuenteSintetica(semilla=20))
+    assert servicio.recargar_si_cambio()
+    respuesta = servicio.predecir("AAPL")
+    assert respuesta["fecha_ultimo_cierre"] == X.index[-1].strftime('%Y-%m-%d')
+    for p in respuesta["predicciones"]:
+        modelo, _ = registro_modelos.cargar_modelo("AAPL", p["horizonte"])
+        assert p["probabilidad_sube"] == pytest.approx(modelo.predict_proba(X.tail(1))[0, 1], abs=1e-5)
+
+
+def reportar_latencia(n=2000):
+    """Solicitudes por segundo y latencia de /prediccion sobre una conexión persistente."""
+    with tempfile.TemporaryDirectory() as tmp:
+        registro_modelos.DIRECTORIO_MODELOS = os.path.join(tmp, "modelos")
+        almacen_features.DIRECTORIO_ALMACEN_FEATURES = os.path.join(tmp, "features")
+        fuente = FuenteSintetica(semilla=20)
+        snapshot = {t: fuente.obtener_datos_precios(t, periodo="3y") for t in ["AAPL", "SMH"]}
+        _entrenar(snapshot)
+        servicio = ServicioPrediccion(snapshot=snapshot, puerto=0)
+        puerto = servicio.iniciar(bloquear=False)
+        try:
+            conexion = http.client.HTTPConnection("127.0.0.1", puerto)
+            inicio = time.perf_counter()
+            for _ in range(n):
+                conexion.request("GET", "/prediccion?ticker=AAPL")
+                conexion.getresponse().read()
+            segundos = time.perf_counter() - inicio
+            metricas = servicio.contadores.resumen()
+        finally:
+            servicio.detener()
+    print(f"{n} solicitudes: {n / segundos:.0f} por segundo ({segundos / n * 1e3:.2f} ms ida y vuelta)")
+    print(f"latencia dentro del servicio (µs): {metricas['latencia_us']}")
+
+
+if __name__ == "__main__":
+    reportar_latencia()